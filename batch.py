@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""Batch
+
+Headless recommendations for a whole cohort of students.
+
+Profiles are read from a CSV or JSONL file with the same fields the form in
+``scholarshipapptest.py`` collects (list fields in CSV are ``;``-separated).
+Every profile goes through the app's pipeline: the eligibility filter, then
+TF-IDF retrieval of the closest scholarships, then optionally the LLM
+matcher. Ranked matches are streamed to a JSONL or CSV file as they come
+back, in input order.
+
+The corpus snapshot is loaded once in the parent process. Worker processes
+are forked from it and read the records and indexes without copying them.
+
+Usage: python batch.py profiles.csv -o matches.jsonl [--workers 4] [--top-k 10] [--llm]
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import corpus_store
+import llm_batch
+import match_cache
+import resources
+import retrieval
+
+LIST_SEPARATOR = ";"
+# Field defaults are the form's initial values.
+PROFILE_DEFAULTS = {
+    "name": "", "email": "", "age": 18, "gender": "", "gpa": 3.0, "major": "",
+    "school_year": "High School Senior", "standardized_test_scores": 0, "financial_need": "Yes",
+    "ethnicity": "", "residence_state": "", "physical_disabilities": "Yes",
+    "scholarship_type": [], "causes": [],
+}
+PROFILE_TYPES = {"age": int, "gpa": float, "standardized_test_scores": int}
+LIST_FIELDS = ("scholarship_type", "causes")
+CSV_COLUMNS = ["profile", "rank", "url", "score", "reason"]
+
+# Set in each worker by _init_worker; inherited, not copied, when workers are forked.
+_corpus = None
+_cache = None
+
+
+def normalize_profile(row, position):
+    """A complete profile from one input row; missing or blank fields take the form's defaults."""
+    profile = dict(PROFILE_DEFAULTS)
+    for field, value in row.items():
+        if field not in PROFILE_DEFAULTS or value is None or value == "":
+            continue
+        if field in LIST_FIELDS and isinstance(value, str):
+            value = [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+        elif field in PROFILE_TYPES:
+            value = PROFILE_TYPES[field](float(value))
+        profile[field] = value
+    profile["id"] = str(row.get("id") or profile["email"] or profile["name"] or position)
+    return profile
+
+
+def read_profiles(path):
+    """Yield profiles from a ``.csv`` or ``.jsonl`` file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for position, row in enumerate(rows):
+            yield normalize_profile(row, position)
+
+
+def profile_user_query(profile):
+    """The LLM query text ``main()`` builds from the form."""
+    return (
+        f"GPA: {profile['gpa']}, Major: {profile['major']}, Financial Need: {profile['financial_need']}, "
+        f"Scholarship Type: {', '.join(profile['scholarship_type'])}, Causes: {', '.join(profile['causes'])}"
+    )
+
+
+def recommend(corpus, profile, k=retrieval.DEFAULT_TOP_K, cache=None, llm=False, **batch_options):
+    """Ranked ``{"rank", "url", "score", "reason"}`` matches for one profile against a corpus snapshot."""
+    eligible = corpus.eligibility_index.filter(
+        age=profile["age"],
+        gpa=profile["gpa"],
+        school_year=profile["school_year"],
+        residence_state=profile["residence_state"],
+        financial_need=profile["financial_need"],
+        physical_disabilities=profile["physical_disabilities"],
+    )
+    query_text = retrieval.profile_query_text(
+        profile["gpa"], profile["major"], profile["financial_need"], profile["scholarship_type"], profile["causes"]
+    )
+    doc_ids, scores = corpus.vector_index.top_k(query_text, k, mask=eligible)
+    candidates = [(corpus.by_url[corpus.vector_index.urls[i]], float(score)) for i, score in zip(doc_ids, scores)]
+    reasons = [""] * len(candidates)
+    if llm and candidates:
+        verdicts = dict(llm_batch.iter_verdicts_batched(
+            profile_user_query(profile), [record for record, _ in candidates], cache=cache,
+            query_text=query_text, **batch_options
+        ))
+        matched = [i for i in range(len(candidates)) if llm_batch.is_match(verdicts[i])]
+        candidates, reasons = [candidates[i] for i in matched], [verdicts[i] for i in matched]
+    return [
+        {"rank": rank, "url": record["url"], "score": round(score, 4), "reason": reason}
+        for rank, ((record, score), reason) in enumerate(zip(candidates, reasons), 1)
+    ]
+
+
+def _init_worker(corpus, cache_path):
+    global _corpus, _cache
+    _corpus = corpus
+    _cache = match_cache.MatchCache(cache_path) if cache_path else None
+
+
+def _recommend_in_worker(profile, k, llm):
+    return {"profile": profile["id"], "matches": recommend(_corpus, profile, k, cache=_cache, llm=llm)}
+
+
+def run_batch(profiles, corpus, workers=None, k=retrieval.DEFAULT_TOP_K, llm=False,
+              cache_path=match_cache.DEFAULT_DB_PATH, chunksize=16):
+    """Yield ``{"profile", "matches"}`` for each profile, in input order.
+
+    ``workers`` processes (default: one per CPU) share ``corpus``; with
+    ``workers=0`` everything runs in this process.
+    """
+    cache_path = cache_path if llm else None
+    corpus.by_url  # built before forking so workers share it
+    if workers == 0:
+        _init_worker(corpus, cache_path)
+        for profile in profiles:
+            yield _recommend_in_worker(profile, k, llm)
+        return
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(corpus, cache_path)) as pool:
+        profiles = list(profiles)
+        yield from pool.map(_recommend_in_worker, profiles, [k] * len(profiles), [llm] * len(profiles),
+                            chunksize=chunksize)
+
+
+def write_results(results, f, fmt="jsonl"):
+    """Stream results to ``f`` as JSONL (one line per profile) or CSV (one row per match)."""
+    writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS) if fmt == "csv" else None
+    if writer:
+        writer.writeheader()
+    count = 0
+    for result in results:
+        if writer:
+            writer.writerows({"profile": result["profile"], **match} for match in result["matches"])
+        else:
+            f.write(json.dumps(result) + "\n")
+        f.flush()
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("profiles", help="CSV or JSONL file of student profiles")
+    parser.add_argument("-o", "--output", default="-", help="output .jsonl or .csv file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes, 0 for none")
+    parser.add_argument("--top-k", type=int, default=retrieval.DEFAULT_TOP_K)
+    parser.add_argument("--llm", action="store_true", help="confirm candidates with the LLM matcher")
+    parser.add_argument("--store", default=corpus_store.DEFAULT_DB_PATH)
+    parser.add_argument("--index", default=retrieval.DEFAULT_INDEX_PATH)
+    args = parser.parse_args()
+
+    corpus = resources.build_snapshot(corpus_store.CorpusStore(args.store), index_path=args.index)
+    results = run_batch(read_profiles(args.profiles), corpus, args.workers, args.top_k, args.llm)
+    fmt = "csv" if args.output.endswith(".csv") else "jsonl"
+    if args.output == "-":
+        count = write_results(results, sys.stdout, fmt)
+    else:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            count = write_results(results, f, fmt)
+    print(f"{count} profiles scored against {len(corpus.records)} scholarships", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Batch recommendation benchmark
+
+Throughput of headless batch recommendations (eligibility filter plus TF-IDF
+retrieval) for a cohort of synthetic profiles against a synthetic corpus,
+in-process and with 1, 2, 4 and 8 worker processes sharing the corpus.
+
+Usage: python benchmarks/bench_batch.py [--profiles 2000] [--docs 20000] [--workers 0 1 2 4 8]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch
+import corpus_store
+import resources
+from bench_sessions import random_profile
+from synthetic import generate_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4, 8])
+    args = parser.parse_args()
+
+    records, _ = generate_corpus(args.docs)
+    rng = random.Random(0)
+    profiles = [batch.normalize_profile(random_profile(rng), i) for i in range(args.profiles)]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = corpus_store.CorpusStore(os.path.join(tmp, "corpus.sqlite3"))
+        store.save(records, urls=[record["url"] for record in records])
+        corpus = resources.build_snapshot(store, index_path=os.path.join(tmp, "index.npz"))
+        store.close()
+
+    print(f"profiles: {args.profiles}, docs: {args.docs}, CPUs: {os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>9} {'profiles/s':>11}")
+    baseline = None
+    for workers in args.workers:
+        out = io.StringIO()
+        start = time.perf_counter()
+        count = batch.write_results(batch.run_batch(profiles, corpus, workers=workers), out)
+        elapsed = time.perf_counter() - start
+        assert count == args.profiles
+        if baseline is None:
+            baseline = out.getvalue()
+        assert out.getvalue() == baseline, "worker count changed the results"
+        label = "in-proc" if workers == 0 else workers
+        print(f"{label:>8} {elapsed:>9.2f} {count / elapsed:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Calendar index benchmark
+
+Builds and queries the due-date event index in ``calendar_index.py`` on a
+synthetic catalog, against the original ``iterrows`` dict builder and its
+per-cell month lookup.
+
+Usage: python benchmarks/bench_calendar_index.py [--rows 100000]
+"""
+
+import argparse
+import calendar
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import calendar_index
+
+
+def make_catalog(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 730, rows)
+    return pd.DataFrame({
+        "Scholarship Name": [f"Scholarship {i}" for i in range(rows)],
+        "Date Due": pd.Timestamp("2024-01-01") + pd.to_timedelta(days, unit="D"),
+        "Summary": [f"Amount: ${500 + i % 20 * 250:,}." for i in range(rows)],
+    })
+
+
+def iterrows_events(df):
+    """The original builder: one dict entry per row, same-day rows overwrite each other."""
+    events = {}
+    for _, row in df.iterrows():
+        date = row["Date Due"]
+        events[date] = f"{row['Scholarship Name']}\n{row['Summary']}"
+    return events
+
+
+def month_by_cells(events, year, month):
+    """The original grid lookup: one dict probe per day cell."""
+    found = {}
+    for week in calendar.Calendar().monthdayscalendar(year, month):
+        for day in week:
+            if day and datetime(year, month, day) in events:
+                found[day] = events[datetime(year, month, day)]
+    return found
+
+
+def timed(fn, *args, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    df = make_catalog(args.rows)
+    months = [(2024 + m // 12, m % 12 + 1) for m in range(24)]
+
+    old_build, old_events = timed(iterrows_events, df)
+    dict_build, _ = timed(calendar_index.generate_calendar_events, df)
+    new_build, index = timed(calendar_index.EventIndex.build, df)
+    old_query, _ = timed(lambda: [month_by_cells(old_events, y, m) for y, m in months], repeat=5)
+    new_query, _ = timed(lambda: [index.month(y, m) for y, m in months], repeat=5)
+    kept = sum(len(events) for events in index.events)
+
+    print(f"rows: {args.rows}")
+    print(f"{'':<32} {'build s':>9} {'month ms':>9} {'events kept':>12}")
+    print(f"{'iterrows dict (original)':<32} {old_build:>9.3f} {old_query / len(months) * 1000:>9.3f} {len(old_events):>12}")
+    print(f"{'groupby dict':<32} {dict_build:>9.3f} {'-':>9} {args.rows:>12}")
+    print(f"{'EventIndex':<32} {new_build:>9.3f} {new_query / len(months) * 1000:>9.3f} {kept:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Calendar rerun benchmark
+
+Measures the work ``calendar_app.py`` does on every Streamlit rerun with a
+10k-scholarship catalog, before and after caching. "Before" repeats the
+original script body: build the DataFrame, parse dates, mask-filter, build
+the events dict with ``iterrows`` and probe it cell by cell. "After" is the
+cached path: catalog and per-filter index are built once (``st.cache_data`` /
+``st.cache_resource`` are emulated with ``functools`` caches here) and the
+month grid comes from the memoized HTML renderer.
+
+Usage: python benchmarks/bench_calendar_rerun.py [--rows 10000] [--reruns 50]
+"""
+
+import argparse
+import calendar
+import os
+import sys
+import time
+from datetime import datetime
+from functools import lru_cache
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import calendar_index
+
+START, END = datetime(2024, 1, 1), datetime(2025, 12, 31)
+
+
+def make_data(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, rows), unit="D")
+    return {
+        "Scholarship Name": [f"Scholarship {i}" for i in range(rows)],
+        "Date Due": days.strftime("%Y-%m-%d").tolist(),
+        "Summary": [f"Amount: ${500 + i % 20 * 250:,}." for i in range(rows)],
+    }
+
+
+def rerun_before(data, year, selected_month):
+    df = pd.DataFrame(data)
+    df["Date Due"] = pd.to_datetime(df["Date Due"])
+    filtered_df = df[(df["Date Due"] >= pd.Timestamp(START)) & (df["Date Due"] <= pd.Timestamp(END))]
+    events = {}
+    for _, row in filtered_df.iterrows():
+        events[row["Date Due"]] = f"{row['Scholarship Name']}\n{row['Summary']}"
+    lines = []
+    for week in calendar.Calendar().monthdayscalendar(year, list(calendar.month_name).index(selected_month)):
+        week_display = []
+        for day in week:
+            if day == 0:
+                week_display.append("")
+            else:
+                date_key = datetime(year, list(calendar.month_name).index(selected_month), day)
+                event = events.get(date_key, "")
+                week_display.append(f"{day}\n\n{event}" if event else day)
+        lines.append(" | ".join([str(item) if item else " " for item in week_display]))
+    return lines
+
+
+def make_cached_rerun(data):
+    @lru_cache(maxsize=None)
+    def load_catalog():
+        df = pd.DataFrame(data)
+        df["Date Due"] = pd.to_datetime(df["Date Due"])
+        return df
+
+    @lru_cache(maxsize=32)
+    def get_filtered_events(min_date, max_date):
+        df = load_catalog()
+        filtered_df = df[(df["Date Due"] >= pd.Timestamp(min_date)) & (df["Date Due"] <= pd.Timestamp(max_date))]
+        return filtered_df, calendar_index.EventIndex.build(filtered_df)
+
+    def rerun_after(year, selected_month):
+        _, index = get_filtered_events(START, END)
+        return calendar_index.render_month_html(index, year, calendar_index.MONTH_NAMES.index(selected_month) + 1)
+
+    return rerun_after
+
+
+def percentiles(samples):
+    p50, p95 = np.percentile(samples, [50, 95]) * 1000
+    return f"p50 {p50:8.2f} ms   p95 {p95:8.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--reruns", type=int, default=50)
+    args = parser.parse_args()
+
+    data = make_data(args.rows)
+    # Reruns cycle through a few months, as a user flipping the month selector would.
+    views = [(2024 + i % 2, calendar_index.MONTH_NAMES[i % 4]) for i in range(args.reruns)]
+
+    before = []
+    for year, month in views:
+        start = time.perf_counter()
+        rerun_before(data, year, month)
+        before.append(time.perf_counter() - start)
+
+    rerun_after = make_cached_rerun(data)
+    after = []
+    for year, month in views:
+        start = time.perf_counter()
+        rerun_after(year, month)
+        after.append(time.perf_counter() - start)
+
+    print(f"catalog rows: {args.rows}, reruns: {args.reruns}")
+    print(f"before: {percentiles(before)}")
+    print(f"after:  {percentiles(after)}   (first rerun {after[0] * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Cascade benchmark
+
+Trains the local cascade in ``cascade.py`` from a log of LLM verdicts and
+measures it on a separate labeled fixture set. The verdicts come from the
+mock completion server's deterministic matcher. The pairs are what the app
+sends to the LLM: each random profile with its retrieved eligible
+candidates. Training profiles are logged through ``Cascade.record`` as the
+app would log them.
+
+Reports the share of LLM calls the cascade avoids and how often its
+decisions agree with the LLM, for several required agreement levels. Also
+reports how many "No Match" replies the old ``"Match" in result`` check
+accepted. Then runs batched matching end to end against the mock server,
+with and without the cascade, and compares requests, time and matches.
+
+Usage: python benchmarks/bench_cascade.py [--docs 2000] [--train 400] [--fixture 200] [--latency 0.05]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import batch
+import cascade
+import eligibility
+import llm_batch
+import mock_llm
+import retrieval
+from bench_sessions import random_profile, rerun
+from mock_llm import MockLLM
+from synthetic import generate_corpus
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def single_prompt(user_query, scholarship):
+    """The app's one-scholarship matching prompt."""
+    return (f"Match the following scholarship description to the user's query: {user_query}. "
+            f"Scholarship: {scholarship['content']}\n\nReturn 'Match' or 'No Match' with a reason.")
+
+
+def labeled_pairs(corpus, profiles):
+    """``(user_query, scholarship, verdict)`` for every profile and retrieved candidate."""
+    pairs = []
+    for profile in profiles:
+        user_query = batch.profile_user_query(profile)
+        for scholarship in rerun(lambda: corpus, profile):
+            pairs.append((user_query, scholarship, mock_llm.complete(single_prompt(user_query, scholarship))))
+    return pairs
+
+
+def match_all(profiles, corpus, cascade_=None):
+    """Batched verdicts for every profile's candidates, in order."""
+    verdicts = []
+    for profile in profiles:
+        candidates = rerun(lambda: corpus, profile)
+        query_text = retrieval.profile_query_text(
+            profile["gpa"], profile["major"], profile["financial_need"], profile["scholarship_type"],
+            profile["causes"],
+        )
+        decided = dict(llm_batch.iter_verdicts_batched(
+            batch.profile_user_query(profile), candidates, query_text=query_text, rate=0, cascade=cascade_
+        ))
+        verdicts.extend(llm_batch.is_match(decided[i]) for i in range(len(candidates)))
+    return verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--train", type=int, default=400, help="profiles whose verdicts are logged for training")
+    parser.add_argument("--fixture", type=int, default=200, help="profiles in the labeled fixture set")
+    parser.add_argument("--agreements", type=float, nargs="+", default=[0.95, cascade.DEFAULT_AGREEMENT, 0.99])
+    parser.add_argument("--latency", type=float, default=0.05, help="mock LLM seconds per request")
+    parser.add_argument("--end-to-end", type=int, default=30, help="fixture profiles matched against the mock")
+    args = parser.parse_args()
+
+    records, _ = generate_corpus(args.docs)
+    corpus = (records, retrieval.VectorIndex.build(records), eligibility.EligibilityIndex.build(records))
+    rng = random.Random(0)
+    train_profiles = [random_profile(rng) for _ in range(args.train)]
+    fixture_profiles = [random_profile(rng) for _ in range(args.fixture)]
+    fixture = labeled_pairs(corpus, fixture_profiles)
+    x = np.array([cascade.features(user_query, scholarship["content"]) for user_query, scholarship, _ in fixture])
+    y = np.array([llm_batch.is_match(verdict) for *_, verdict in fixture])
+    substring = sum("Match" in verdict for *_, verdict in fixture if not llm_batch.is_match(verdict))
+    print(f"fixture: {len(fixture)} pairs from {args.fixture} profiles, {y.mean():.1%} matches; "
+          f"the substring check accepted {substring} of {len(y) - y.sum()} \"No Match\" replies, "
+          f"strict parsing accepts 0")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "verdicts.jsonl")
+        logger = cascade.Cascade(os.path.join(tmp, "missing.json"), log_path)
+        for user_query, scholarship, verdict in labeled_pairs(corpus, train_profiles):
+            logger.record(user_query, scholarship, verdict)
+        pairs = cascade.read_log(log_path)
+        print(f"training log: {len(pairs)} verdicts from {args.train} profiles")
+        print(f"{'agreement':>9} {'train s':>8} {'low':>6} {'high':>6} {'calls avoided':>14} "
+              f"{'local agree':>12} {'overall agree':>14}")
+        models = {}
+        for agreement in args.agreements:
+            seconds, (model, _) = timed(lambda: cascade.train(pairs, agreement))
+            settled, local, overall = cascade.evaluate(model, x, y)
+            print(f"{agreement:>9.0%} {seconds:>8.2f} {model.low:>6.3f} {model.high:>6.3f} "
+                  f"{settled:>14.1%} {local:>12.1%} {overall:>14.1%}")
+            models[agreement] = model
+
+        model_path = os.path.join(tmp, "cascade_model.json")
+        models[cascade.DEFAULT_AGREEMENT].save(model_path)
+        local = cascade.Cascade(model_path)
+        profiles = fixture_profiles[:args.end_to_end]
+        with MockLLM(latency=args.latency) as llm:
+            print(f"end to end, {len(profiles)} profiles, {args.latency * 1000:.0f} ms per request:")
+            print(f"{'mode':<12} {'time s':>7} {'requests':>9} {'matches':>8} {'agree':>7}")
+            seconds, expected = timed(lambda: match_all(profiles, corpus))
+            print(f"{'LLM only':<12} {seconds:>7.2f} {llm.requests:>9} {sum(expected):>8} {1:>7.1%}")
+            llm.reset_counters()
+            seconds, verdicts = timed(lambda: match_all(profiles, corpus, local))
+            agree = np.mean(np.array(verdicts) == np.array(expected))
+            print(f"{'cascade':<12} {seconds:>7.2f} {llm.requests:>9} {sum(verdicts):>8} {agree:>7.1%}")
+        print(f"cascade: {local.settled} pairs settled locally, {local.deferred} sent to the LLM")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Catalog benchmark
+
+Load and date-range filter times for the scholarship catalog at 1M rows:
+building it from an in-memory dict with ``pd.to_datetime`` and filtering
+with a boolean mask (the original approach), against memory-mapping the
+sorted Feather catalog and filtering with ``searchsorted``.
+
+Usage: python benchmarks/bench_catalog.py [--rows 1000000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import calendar_index
+
+RANGES = [(date(2024, 1, 1), date(2025, 12, 31)), (date(2024, 10, 1), date(2024, 10, 31)),
+          (date(2025, 3, 1), date(2025, 6, 30))]
+
+
+def make_data(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, rows), unit="D")
+    return {
+        "Scholarship Name": [f"Scholarship {i}" for i in range(rows)],
+        "Date Due": days.strftime("%Y-%m-%d").tolist(),
+        "Summary": [f"Amount: ${500 + i % 20 * 250:,}." for i in range(rows)],
+        # Columns the calendar never reads; the Feather loader skips them.
+        "URL": [f"https://scholarships.example.edu/award/{i}" for i in range(rows)],
+        "Content": ["Long scraped page text. " * 8] * rows,
+    }
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    data = make_data(args.rows)
+
+    def load_dict():
+        df = pd.DataFrame(data)
+        df["Date Due"] = pd.to_datetime(df["Date Due"])
+        return df
+
+    dict_load, df = timed(load_dict)
+    mask_filter, _ = timed(lambda: [
+        df[(df["Date Due"] >= pd.Timestamp(lo)) & (df["Date Due"] <= pd.Timestamp(hi))] for lo, hi in RANGES
+    ], repeat=5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.feather")
+        write, _ = timed(lambda: calendar_index.write_catalog(df, path))
+        feather_load, catalog = timed(lambda: calendar_index.load_catalog(path))
+        sorted_filter, slices = timed(lambda: [
+            calendar_index.filter_date_range(catalog, lo, hi) for lo, hi in RANGES
+        ], repeat=5)
+        size = os.path.getsize(path)
+
+    print(f"rows: {args.rows}, feather file: {size / 2 ** 20:.0f} MB (written in {write:.2f}s)")
+    print(f"{'':<34} {'load s':>8} {'filter ms':>10}")
+    print(f"{'dict + to_datetime, boolean mask':<34} {dict_load:>8.2f} {mask_filter / len(RANGES) * 1000:>10.2f}")
+    print(f"{'feather mmap, searchsorted':<34} {feather_load:>8.2f} {sorted_filter / len(RANGES) * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
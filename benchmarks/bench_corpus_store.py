@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Corpus store benchmark
+
+Reports cold-start latency (empty store, pages scraped from a stub server)
+against warm-start latency (corpus opened and loaded from the on-disk store).
+
+Usage: python benchmarks/bench_corpus_store.py [--pages 20] [--latency 0.05]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus_store
+from stub_server import StubServer
+
+
+def start_app(path, urls):
+    """What the app does at startup: open the store and load the corpus."""
+    store = corpus_store.CorpusStore(path)
+    try:
+        return corpus_store.load_corpus(urls, store=store)
+    finally:
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.sqlite3")
+        urls = [f"{server.base_url}/scholarship/{i}" for i in range(args.pages)]
+
+        start = time.perf_counter()
+        records = start_app(path, urls)
+        cold = time.perf_counter() - start
+        assert len(records) == args.pages
+
+        warm = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            start_app(path, urls)
+            warm.append(time.perf_counter() - start)
+
+    warm.sort()
+    print(f"pages: {args.pages}")
+    print(f"cold start: {cold * 1000:.1f} ms")
+    print(f"warm start: median {warm[len(warm) // 2] * 1000:.2f} ms, max {warm[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
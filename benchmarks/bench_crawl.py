@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Crawl benchmark
+
+Crawls a generated scholarship site served over local HTTP and checks the
+crawler's bookkeeping against the server's per-path request counts: every
+reachable page fetched exactly once, nothing under the robots.txt-disallowed
+``/private/`` area fetched, and the depth limit respected. Then interrupts a
+crawl halfway and resumes it from the checkpoint, and measures the request
+spacing a ``Crawl-delay`` imposes.
+
+Usage: python benchmarks/bench_crawl.py [--pages 10000] [--fanout 50] [--workers 16]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus_store
+import crawler
+from stub_site import StubSite
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def page_requests(site):
+    """``(pages requested, most requests for one page, requests under /private/)``."""
+    pages = {path: n for path, n in site.requests.items() if path != "/robots.txt"}
+    private = sum(n for path, n in pages.items() if path.startswith("/private/"))
+    return len(pages), max(pages.values(), default=0), private
+
+
+def crawl(site, state_path, **options):
+    instance = crawler.Crawler([site.base_url + "/"], state_path, host_rate=0, **options)
+    try:
+        return instance.run()
+    finally:
+        instance.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10_000, help="award pages on the generated site")
+    parser.add_argument("--fanout", type=int, default=50, help="awards listed per section page")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--crawl-delay", type=int, default=1, help="whole seconds, as robotparser reads it")
+    args = parser.parse_args()
+    options = {"max_workers": args.workers, "per_host": args.workers, "batch_size": 256}
+
+    with tempfile.TemporaryDirectory() as tmp, StubSite(args.pages, args.fanout) as site:
+        seconds, stats = timed(lambda: crawl(site, os.path.join(tmp, "full.sqlite3"), **options))
+        requested, most, private = page_requests(site)
+        print(f"full crawl: {stats.fetched} of {site.reachable} reachable pages in {seconds:.1f}s "
+              f"({stats.fetched / seconds:.0f} pages/s)")
+        print(f"  {stats.summary()}")
+        print(f"  server: {requested} distinct pages requested, at most {most} request(s) per page, "
+              f"{private} under /private/, robots.txt fetched {site.requests['/robots.txt']} time(s)")
+        assert stats.fetched == site.reachable and most == 1 and private == 0
+
+        store = corpus_store.CorpusStore(os.path.join(tmp, "corpus.sqlite3"))
+        state_path = os.path.join(tmp, "shallow.sqlite3")
+        shallow = crawler.Crawler([site.base_url + "/"], state_path, max_depth=1, host_rate=0, **options)
+        shallow_stats = shallow.run(store)
+        shallow.close()
+        sections = site.reachable - args.pages
+        print(f"max depth 1: {shallow_stats.fetched} pages fetched (home + {sections - 1} sections), "
+              f"{len(store.load())} saved to the corpus store, "
+              f"{len(crawler.load_crawled_urls(state_path))} URLs for the app")
+        assert shallow_stats.fetched == sections
+        store.close()
+
+    with tempfile.TemporaryDirectory() as tmp, StubSite(args.pages, args.fanout) as site:
+        state_path = os.path.join(tmp, "resume.sqlite3")
+        half = site.reachable // 2
+        first = crawl(site, state_path, max_pages=half, **options)
+        second = crawl(site, state_path, **options)
+        requested, most, _ = page_requests(site)
+        print(f"interrupted after {first.fetched} pages ({first.frontier} queued), resumed for "
+              f"{second.fetched} more: {requested} distinct pages requested, at most {most} per page")
+        assert first.fetched + second.fetched == site.reachable and most == 1
+
+    with tempfile.TemporaryDirectory() as tmp, StubSite(200, 20, crawl_delay=args.crawl_delay) as site:
+        seconds, stats = timed(lambda: crawl(site, os.path.join(tmp, "polite.sqlite3"), max_pages=5, **options))
+        print(f"Crawl-delay {args.crawl_delay}s: {stats.fetched} pages in {seconds:.2f}s "
+              f"({seconds / max(stats.fetched - 1, 1):.2f}s between requests)")
+        assert seconds >= (stats.fetched - 1) * args.crawl_delay
+
+
+if __name__ == "__main__":
+    main()
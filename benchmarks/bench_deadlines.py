@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Deadline extraction benchmark
+
+Throughput of turning scraped pages into calendar catalog rows on a 10k-page
+fixture set: a cold build extracting every page, then an incremental rebuild
+after 1% of the pages changed, which re-extracts only those. Extracted
+deadlines, amounts and names are checked against the generator's values.
+
+Usage: python benchmarks/bench_deadlines.py [--pages 10000] [--changed 0.01]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calendar_index
+import deadlines
+from corpus_store import content_hash
+from extraction import extract_main_content
+from synthetic import render_page_html
+
+TODAY = date(2024, 10, 1)
+
+
+def make_records(pages, seed=0):
+    rng = random.Random(seed)
+    records, attributes = [], []
+    for i in range(pages):
+        html, attrs = render_page_html(i, rng)
+        content = extract_main_content(html)
+        records.append({"url": f"https://scholarships.example.edu/award/{i}", "content": content,
+                        "content_hash": content_hash(content)})
+        attributes.append(attrs)
+    return records, attributes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--changed", type=float, default=0.01, help="fraction of pages changed before the rebuild")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records, attributes = make_records(args.pages)
+    print(f"fixture: {args.pages} pages rendered and extracted in {time.perf_counter() - start:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.feather")
+        cold = deadlines.update_catalog(records, path, today=TODAY)
+
+        changed = random.Random(1).sample(range(args.pages), int(args.pages * args.changed))
+        for i in changed:
+            content = records[i]["content"].replace("Deadline", "Deadline (extended)")
+            records[i] = {**records[i], "content": content, "content_hash": content_hash(content)}
+        warm = deadlines.update_catalog(records, path, today=TODAY)
+        catalog = calendar_index.load_catalog(path, columns=deadlines.COLUMNS)
+
+    by_url = catalog.set_index("URL")
+    rows = [by_url.loc[record["url"]] for record in records]
+    dates = sum(row["Date Due"].date() == attrs["deadline"] for row, attrs in zip(rows, attributes))
+    amounts = sum(row["Amount"] == attrs["amount"] for row, attrs in zip(rows, attributes))
+    names = sum(row["Scholarship Name"] == attrs["title"] for row, attrs in zip(rows, attributes))
+
+    print(f"{'':<28} {'pages':>7} {'extracted':>10} {'seconds':>8} {'pages/s':>9}")
+    for label, stats in (("cold build", cold), (f"rebuild, {len(changed)} changed", warm)):
+        print(f"{label:<28} {stats.pages:>7} {stats.extracted:>10} {stats.seconds:>8.2f} "
+              f"{stats.pages / stats.seconds:>9.0f}")
+    print(f"correct: deadline {dates / args.pages:.1%}, amount {amounts / args.pages:.1%}, "
+          f"name {names / args.pages:.1%}")
+
+
+if __name__ == "__main__":
+    main()
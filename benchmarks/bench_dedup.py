@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Near-duplicate dedup benchmark
+
+Runs the MinHash/LSH dedup stage over synthetic corpora in which a share of
+the scholarships are republished on sibling pages, and checks the clusters
+against the known ground truth. Reports the corpus size reduction, pair
+precision and recall, the time per pass, and the LLM calls saved per query:
+the duplicate candidates that top-k retrieval over the raw corpus would send
+to the matcher (one call each) and the deduplicated corpus does not.
+
+Usage: python benchmarks/bench_dedup.py [--sizes 1000 10000 100000] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dedup
+import retrieval
+from bench_sessions import random_profile
+from synthetic import generate_near_duplicates
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def pair_scores(labels, clusters):
+    """Precision and recall of the same-cluster pairs found, against the ground truth."""
+    def pairs(counts):
+        return sum(n * (n - 1) // 2 for n in counts.values())
+
+    found = pairs(Counter(labels.tolist()))
+    true = pairs(Counter(clusters))
+    correct = pairs(Counter(zip(labels.tolist(), clusters)))
+    return (correct / found if found else 1.0), (correct / true if true else 1.0)
+
+
+def calls_saved(records, kept, clusters, queries, k):
+    """Mean duplicate candidates per query in the raw corpus's top-k, and in the deduplicated one's."""
+    cluster_of = {record["url"]: cluster for record, cluster in zip(records, clusters)}
+    rng = random.Random(0)
+    profiles = [random_profile(rng) for _ in range(queries)]
+    duplicates = []
+    for corpus in (records, kept):
+        index = retrieval.VectorIndex.build(corpus)
+        total = 0
+        for profile in profiles:
+            query_text = retrieval.profile_query_text(
+                profile["gpa"], profile["major"], profile["financial_need"],
+                profile["scholarship_type"], profile["causes"],
+            )
+            doc_ids, _ = index.top_k(query_text, k)
+            total += len(doc_ids) - len({cluster_of[index.urls[i]] for i in doc_ids})
+        duplicates.append(total / queries)
+    return duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000],
+                        help="distinct scholarships; sibling pages come on top")
+    parser.add_argument("--duplicate-fraction", type=float, default=0.3)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=retrieval.DEFAULT_TOP_K)
+    parser.add_argument("--query-limit", type=int, default=10_000, help="skip the per-query check above this size")
+    args = parser.parse_args()
+
+    print(f"{'pages':>8} {'kept':>8} {'reduction':>10} {'precision':>10} {'recall':>8} {'dedup s':>8} "
+          f"{'dup calls/query':>16} {'after':>6}")
+    for size in args.sizes:
+        records, clusters = generate_near_duplicates(size, args.duplicate_fraction)
+        seconds, result = timed(lambda: dedup.deduplicate(records))
+        precision, recall = pair_scores(result.labels, clusters)
+        reduction = 1 - len(result.records) / len(records)
+        if size <= args.query_limit:
+            before, after = calls_saved(records, result.records, clusters, args.queries, args.top_k)
+            per_query = f"{before:>16.2f} {after:>6.2f}"
+        else:
+            per_query = f"{'-':>16} {'-':>6}"
+        print(f"{len(records):>8} {len(result.records):>8} {reduction:>10.1%} {precision:>10.3f} {recall:>8.3f} "
+              f"{seconds:>8.2f} {per_query}")
+    print(f"dup calls/query: candidates in the top {args.top_k} that repeat a scholarship already in the list, "
+          "each one a wasted LLM call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Eligibility benchmark
+
+Times criteria extraction, index build and per-profile filtering of the
+eligibility engine in ``eligibility.py`` on synthetic scholarships. First
+checks the age limits and state restrictions extracted from a few
+phrasings, including numbers that are not ages and states that are only
+excluded or preferred.
+
+Usage: python benchmarks/bench_eligibility.py [--size 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import eligibility
+from synthetic import generate_corpus
+
+RESTRICTIONS = [
+    "Open to {state} residents only.",
+    "Applicants must be high school seniors or college freshmen.",
+    "Juniors and seniors may apply.",
+    "Awarded on the basis of financial need.",
+    "Applicants must be at least 18 years old and under the age of 26.",
+    "Reserved for students with disabilities.",
+    "",
+]
+# (text, (min_age, max_age)) with NO_MIN_AGE / NO_MAX_AGE for no limit.
+AGE_CASES = [
+    ("Applicants must be at least 18 years old and under the age of 26.", (18, 25)),
+    ("Open to students under 25 years of age.", (eligibility.NO_MIN_AGE, 24)),
+    ("Applicants must be younger than 30.", (eligibility.NO_MIN_AGE, 29)),
+    ("Open to ages 16 to 24.", (16, 24)),
+    ("Essays should be under 10 minutes when read aloud.", (eligibility.NO_MIN_AGE, eligibility.NO_MAX_AGE)),
+    ("Submissions must be under 20 pages.", (eligibility.NO_MIN_AGE, eligibility.NO_MAX_AGE)),
+    ("Funded under 34 CFR 690 for undergraduates.", (eligibility.NO_MIN_AGE, eligibility.NO_MAX_AGE)),
+    ("Applicants must be age 24 or under.", (eligibility.NO_MIN_AGE, 24)),
+    ("Retirees can claim Medicare at age 65.", (eligibility.NO_MIN_AGE, eligibility.NO_MAX_AGE)),
+    ("Include your page count and cumulative average.", (eligibility.NO_MIN_AGE, eligibility.NO_MAX_AGE)),
+    ("Applicants must be 18 years of age or older.", (18, eligibility.NO_MAX_AGE)),
+    ("Open to students 25 or younger.", (eligibility.NO_MIN_AGE, 25)),
+    ("For students aged 21 and under.", (eligibility.NO_MIN_AGE, 21)),
+    ("Open to students under age 30.", (eligibility.NO_MIN_AGE, 29)),
+    ("Open to students aged 17-22.", (17, 22)),
+    ("Applicants must be over the age of 21.", (22, eligibility.NO_MAX_AGE)),
+]
+# (text, states) with the two-letter codes the restriction allows; empty for no restriction.
+STATE_CASES = [
+    ("Open to residents of California, Oregon and Washington.", {"CA", "OR", "WA"}),
+    ("Texas and Oklahoma residents may apply.", {"TX", "OK"}),
+    ("Non-California residents are eligible.", set()),
+    ("Students of all states may apply; Texas residents receive priority.", set()),
+    ("Preference is given to residents of Ohio.", set()),
+    ("Applicants must be legal residents of the state of New York.", {"NY"}),
+]
+
+
+def check_ages():
+    for text, expected in AGE_CASES:
+        criteria = eligibility.extract_eligibility(text)
+        assert (criteria.min_age, criteria.max_age) == expected, (text, criteria)
+    print(f"age limits: all {len(AGE_CASES)} phrasings extracted as expected")
+
+
+def check_states():
+    for text, expected in STATE_CASES:
+        states = eligibility.extract_eligibility(text).states
+        assert states == sum(eligibility.STATE_BITS[code] for code in expected), (text, states)
+    print(f"state restrictions: all {len(STATE_CASES)} phrasings extracted as expected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--profiles", type=int, default=200)
+    args = parser.parse_args()
+    check_ages()
+    check_states()
+
+    rng = random.Random(0)
+    records, _ = generate_corpus(args.size)
+    states = list(eligibility.STATES)
+    for record in records:
+        record["content"] += " " + rng.choice(RESTRICTIONS).format(state=rng.choice(states))
+
+    start = time.perf_counter()
+    criteria = [eligibility.extract_eligibility(record["content"]) for record in records]
+    extract = time.perf_counter() - start
+    start = time.perf_counter()
+    index = eligibility.EligibilityIndex(criteria)
+    build = time.perf_counter() - start
+
+    latencies, kept = [], []
+    for _ in range(args.profiles):
+        profile = dict(
+            age=rng.randint(16, 30),
+            gpa=round(rng.uniform(2.0, 4.0), 1),
+            school_year=rng.choice(eligibility.SCHOOL_YEARS),
+            residence_state=rng.choice(states),
+            financial_need=rng.choice(["Yes", "No"]),
+            physical_disabilities=rng.choice(["Yes", "No"]),
+        )
+        start = time.perf_counter()
+        mask = index.filter(**profile)
+        latencies.append(time.perf_counter() - start)
+        kept.append(mask.mean())
+
+    p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+    print(f"scholarships: {args.size}")
+    print(f"extract: {extract:.2f}s, index build: {build * 1000:.1f} ms")
+    print(f"filter: p50 {p50:.2f} ms, p95 {p95:.2f} ms, {np.mean(kept):.1%} kept on average")
+
+
+if __name__ == "__main__":
+    main()
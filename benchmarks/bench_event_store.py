@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Event store benchmark
+
+Session calendar lookups at 100k events: the original flat list rescanned
+with ``pd.Timestamp(...).date()`` on every date click, against the
+date-bucketed :class:`event_store.EventStore`. Also times bulk and single
+adds, reloading the store from SQLite, and a month range query.
+
+Usage: python benchmarks/bench_event_store.py [--events 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from event_store import EventStore
+
+CLICKS = [date(2025, 3, 14), date(2024, 7, 1), date(2025, 11, 30)]
+
+
+def make_events(count, seed=0):
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    return [
+        (f"Event {i}", base + timedelta(days=rng.randrange(730), hours=rng.randrange(24), minutes=rng.randrange(60)))
+        for i in range(count)
+    ]
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100000)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    flat = [{"title": title, "start": pd.Timestamp(start), "end": pd.Timestamp(start) + timedelta(hours=1)}
+            for title, start in events]
+    scan, expected = timed(lambda: [
+        [e for e in flat if pd.Timestamp(e["start"]).date() == pd.Timestamp(click).date()] for click in CLICKS
+    ])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.sqlite3")
+        store = EventStore(path)
+        bulk, _ = timed(lambda: store.add_many(events))
+        single, _ = timed(lambda: store.add("Late event", datetime(2025, 12, 31, 23, 30)), repeat=20)
+        lookup, got = timed(lambda: [store.day(click) for click in CLICKS], repeat=100)
+        month, in_month = timed(lambda: store.range(date(2025, 3, 1), date(2025, 3, 31)), repeat=20)
+        store.close()
+        reload, store = timed(lambda: EventStore(path))
+        assert len(store) == args.events + 20
+        store.close()
+
+    assert [[e["title"] for e in day] for day in got] == \
+        [[e["title"] for e in sorted(day, key=lambda e: e["start"])] for day in expected]
+
+    print(f"events: {args.events}")
+    print(f"{'':<40} {'ms':>10}")
+    print(f"{'date click, flat list rescan':<40} {scan / len(CLICKS) * 1000:>10.2f}")
+    print(f"{'date click, bucketed store':<40} {lookup / len(CLICKS) * 1000:>10.4f}")
+    print(f"{'month range query':<40} {month * 1000:>10.3f}   ({len(in_month)} events)")
+    print(f"{'bulk add (one transaction)':<40} {bulk * 1000:>10.1f}")
+    print(f"{'single add':<40} {single * 1000:>10.3f}")
+    print(f"{'reload from SQLite':<40} {reload * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
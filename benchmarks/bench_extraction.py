@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Extraction benchmark
+
+Compares the old "join every <p>" parsing with main-content extraction on a
+fixture set of saved HTML pages: tokens kept per page and parse time per
+page for each parser backend.
+
+Point ``--fixtures`` at a directory of saved ``*.html`` pages; without it a
+fixture set of synthetic pages with site boilerplate is generated. First
+checks that the main content survives page layouts whose wrapper classes
+look like boilerplate ("has-sidebar", "shared-layout").
+
+Usage: python benchmarks/bench_extraction.py [--fixtures DIR] [--pages 200]
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import extraction
+from llm_batch import estimate_tokens
+from synthetic import render_page_html
+
+
+MAIN_TEXT = "The Biology award gives $500 to students."
+# Wrappers around the main content; every one must keep MAIN_TEXT and drop the boilerplate.
+LAYOUTS = [
+    '<div class="layout has-sidebar">{main}</div><div class="sidebar"><p>Related links</p></div>',
+    '<div class="content shared-layout">{main}</div>',
+    '<div id="page-header-wrapper"><div class="inner">{main}</div></div>',
+    '<div class="site-header"><p>Office of Financial Aid</p></div>{main}<div class="site-footer"><p>Contact</p></div>',
+    '<div id="cookie-banner"><p>We use cookies</p></div><div class="container">{main}</div>',
+]
+
+
+def check_layouts():
+    main = f'<main><h1>Biology Award</h1><p>{MAIN_TEXT}</p><div class="share-buttons"><p>Share this</p></div></main>'
+    for layout in LAYOUTS:
+        content = extraction.extract_main_content(f"<html><body>{layout.format(main=main)}</body></html>")
+        assert MAIN_TEXT in content and "Share this" not in content, (layout, content)
+        assert not any(junk in content for junk in ("Related links", "cookies", "Contact", "Office")), (layout, content)
+    print(f"layouts: main content kept and boilerplate dropped in all {len(LAYOUTS)}")
+
+
+def join_paragraphs(html):
+    """The original parser: every <p> on the page joined by spaces."""
+    soup = BeautifulSoup(html, 'html.parser')
+    return " ".join([para.get_text() for para in soup.find_all('p')])
+
+
+def write_fixtures(directory, pages):
+    rng = random.Random(0)
+    for i in range(pages):
+        html, _ = render_page_html(i, rng)
+        with open(os.path.join(directory, f"page_{i:05d}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+
+
+def measure(label, parse, pages):
+    start = time.perf_counter()
+    tokens = sum(estimate_tokens(parse(html)) for html in pages)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {tokens / len(pages):>12.0f} {elapsed / len(pages) * 1000:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", help="directory of saved *.html pages")
+    parser.add_argument("--pages", type=int, default=200, help="synthetic pages to generate without --fixtures")
+    args = parser.parse_args()
+    check_layouts()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.fixtures or tmp
+        if not args.fixtures:
+            write_fixtures(directory, args.pages)
+        pages = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+
+    print(f"{len(pages)} pages from {args.fixtures or 'synthetic fixtures'}")
+    print(f"{'parser':<28} {'tokens/page':>12} {'ms/page':>12}")
+    measure("<p> join (html.parser)", join_paragraphs, pages)
+    backends = ["html.parser"] + (["lxml"] if extraction.PARSER == "lxml" else [])
+    for backend in backends:
+        extraction.PARSER = backend
+        measure(f"main content ({backend})", extraction.extract_main_content, pages)
+
+
+if __name__ == "__main__":
+    main()
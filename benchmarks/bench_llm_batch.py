@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Batched matching benchmark
+
+Compares the one-request-per-scholarship loop with the batched matcher in
+``llm_batch.py`` against a mock completion server that injects latency.
+Reports wall-clock time, requests issued and prompt size.
+
+Usage: python benchmarks/bench_llm_batch.py [--scholarships 50] [--latency 0.2]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openai
+
+import llm_batch
+from mock_llm import MockLLM
+from synthetic import generate_corpus
+
+USER_QUERY = "GPA: 3.4, Major: Computer Science, Financial Need: Yes, Scholarship Type: merit, Causes: STEM"
+
+
+def serial_match(user_query, scholarships):
+    """The original match_scholarships loop: one completion per scholarship."""
+    matches = []
+    for scholarship in scholarships:
+        response = openai.Completion.create(
+            engine="text-davinci-003",
+            prompt=f"Match the following scholarship description to the user's query: {user_query}. "
+                   f"Scholarship: {scholarship['content']}\n\nReturn 'Match' or 'No Match' with a reason.",
+            max_tokens=100
+        )
+        result = response["choices"][0]["text"].strip()
+        if not result.startswith("No Match"):
+            matches.append({"url": scholarship["url"], "reason": result})
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scholarships", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 5, 10])
+    args = parser.parse_args()
+
+    scholarships, _ = generate_corpus(args.scholarships)
+    with MockLLM(latency=args.latency) as llm:
+        start = time.perf_counter()
+        expected = serial_match(USER_QUERY, scholarships)
+        elapsed = time.perf_counter() - start
+        print(f"{'mode':<16} {'time s':>7} {'requests':>9} {'prompt KB':>10} {'matches':>8}")
+        print(f"{'serial':<16} {elapsed:>7.2f} {llm.requests:>9} {llm.prompt_chars / 1024:>10.1f} {len(expected):>8}")
+        for batch_size in args.batch_sizes:
+            llm.reset_counters()
+            start = time.perf_counter()
+            matches = llm_batch.match_scholarships_batched(
+                USER_QUERY, scholarships, batch_size=batch_size, rate=20.0
+            )
+            elapsed = time.perf_counter() - start
+            label = f"batched x{batch_size}"
+            print(f"{label:<16} {elapsed:>7.2f} {llm.requests:>9} {llm.prompt_chars / 1024:>10.1f} {len(matches):>8}")
+            assert [m["url"] for m in matches] == [m["url"] for m in expected]
+
+
+if __name__ == "__main__":
+    main()
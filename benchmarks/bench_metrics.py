@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Metrics overhead benchmark
+
+Per-call cost of the instrumentation in :mod:`metrics`: a bare function
+call against a ``@metrics.timed`` function, a ``metrics.span`` block and a
+``metrics.count`` call, with recording disabled and enabled.
+
+Usage: python benchmarks/bench_metrics.py [--calls 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+
+
+def work():
+    return None
+
+
+@metrics.timed("bench.timed")
+def timed_work():
+    return None
+
+
+def per_call_ns(fn, calls):
+    start = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def bare(calls):
+    for _ in range(calls):
+        work()
+
+
+def timed(calls):
+    for _ in range(calls):
+        timed_work()
+
+
+def span(calls):
+    for _ in range(calls):
+        with metrics.span("bench.span"):
+            work()
+
+
+def count(calls):
+    for _ in range(calls):
+        work()
+        metrics.count("bench_calls")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1000000)
+    args = parser.parse_args()
+
+    rows = []
+    for enabled in (False, True):
+        metrics.enable() if enabled else metrics.disable()
+        metrics.reset()
+        base = per_call_ns(bare, args.calls)
+        rows.append((enabled, base, *(per_call_ns(fn, args.calls) - base for fn in (timed, span, count))))
+    metrics.disable()
+
+    print(f"calls: {args.calls}; overhead per call over a bare call, in ns")
+    print(f"{'recording':<10} {'bare call':>10} {'@timed':>8} {'span':>8} {'count':>8}")
+    for enabled, base, timed_ns, span_ns, count_ns in rows:
+        label = "enabled" if enabled else "disabled"
+        print(f"{label:<10} {base:>10.0f} {timed_ns:>8.0f} {span_ns:>8.0f} {count_ns:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
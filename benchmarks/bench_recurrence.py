@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Recurrence benchmark
+
+Lazy expansion of recurring deadlines on a catalog of 100k monthly and
+yearly rules: time to build the rules, to expand the visible month, to list
+the rules active in a date range and to expand a whole two-year range,
+against the row count a materialized catalog would need.
+
+Expanded occurrences of a sample of rules are checked against a plain
+``datetime`` expansion, including days 29-31 that have to be clamped to the
+end of shorter months.
+
+Usage: python benchmarks/bench_recurrence.py [--rules 100000]
+"""
+
+import argparse
+import calendar
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import calendar_index
+
+RANGE = (date(2024, 1, 1), date(2025, 12, 31))
+
+
+def make_rules(rules, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2023-06-01") + pd.to_timedelta(rng.integers(0, 900, rules), unit="D")
+    return pd.DataFrame({
+        "Scholarship Name": [f"Scholarship {i}" for i in range(rules)],
+        "Date Due": start,
+        "Summary": [f"Amount: ${500 + i % 20 * 250:,}." for i in range(rules)],
+        "Recurrence": np.where(rng.random(rules) < 0.7, "monthly", "yearly"),
+    })
+
+
+def naive_occurrences(start, recurrence, lo, hi):
+    """Occurrences of one rule in ``[lo, hi]`` with plain ``datetime`` arithmetic."""
+    found = []
+    for year in range(lo.year, hi.year + 1):
+        for month in range(1, 13):
+            if recurrence == "yearly" and month != start.month:
+                continue
+            day = date(year, month, min(start.day, calendar.monthrange(year, month)[1]))
+            if start <= day and lo <= day <= hi:
+                found.append(day)
+    return found
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, default=100000)
+    parser.add_argument("--check", type=int, default=500, help="rules checked against the naive expansion")
+    args = parser.parse_args()
+
+    df = make_rules(args.rules)
+    build, (_, rules) = timed(lambda: calendar_index.split_recurring(df))
+    month, events = timed(lambda: rules.month(2025, 2, *RANGE), repeat=5)
+    active, active_df = timed(lambda: rules.active(*RANGE), repeat=5)
+    expand, (ids, dates) = timed(lambda: rules.occurrences(*RANGE))
+
+    expected = {}
+    for i in range(min(args.check, len(rules))):
+        start = df["Date Due"].iloc[i].date()
+        expected[i] = naive_occurrences(start, df["Recurrence"].iloc[i], *RANGE)
+    got = {i: [] for i in expected}
+    for i, day in zip(ids.tolist(), dates.astype(object).tolist()):
+        if i in got:
+            got[i].append(day)
+    assert got == expected, "lazy expansion disagrees with the naive expansion"
+    assert len(active_df) == len(np.unique(ids)), "active rules disagree with the expanded range"
+    assert sum(map(len, events.values())) == int(np.count_nonzero(dates.astype("datetime64[M]")
+                                                                  == np.datetime64("2025-02"))), \
+        "month view disagrees with the expanded range"
+
+    rule_mb = sum(a.nbytes for a in (rules.start, rules.day, rules.month_of_year)) / 2 ** 20
+    print(f"rules: {len(rules)}, rule arrays {rule_mb:.1f} MB; "
+          f"materialized over {RANGE[0]}..{RANGE[1]} they would be {len(ids)} rows")
+    print(f"checked {len(expected)} rules against a plain datetime expansion: ok")
+    print(f"{'':<36} {'ms':>9} {'rows':>9}")
+    print(f"{'split catalog, build rules':<36} {build * 1000:>9.1f} {len(rules):>9}")
+    print(f"{'expand visible month (Feb 2025)':<36} {month * 1000:>9.1f} {sum(map(len, events.values())):>9}")
+    print(f"{'active rules in range (details)':<36} {active * 1000:>9.1f} {len(active_df):>9}")
+    print(f"{'expand whole range':<36} {expand * 1000:>9.1f} {len(ids):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""Background refresh benchmark
+
+Measures session rerun latency while the shared corpus is refreshed. A store
+seeded with an older version of 10k scholarship pages is revalidated against
+a generated site served from a separate process, so every page is
+re-downloaded, re-parsed, deduplicated and re-indexed. Meanwhile a few
+simulated sessions keep rerunning the matching page against the current
+snapshot (eligibility filter plus retrieval, as in the concurrent sessions
+benchmark).
+
+The refresh runs inline in a thread of the server process, as the app did
+before; on the background worker thread without a worker process; and on
+the background worker with its refresh process. Reports rerun latency
+percentiles next to an idle baseline, and the refresh time.
+
+Usage: python benchmarks/bench_refresh.py [--pages 10000] [--sessions 4] [--think 0.05]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import corpus_store
+import resources
+from bench_sessions import random_profile, rerun
+from stub_site import StubSite
+from synthetic import generate_corpus
+
+
+def serve_site(pages, conn):
+    with StubSite(pages) as site:
+        conn.send(site.base_url)
+        conn.recv()  # serve until told to stop
+
+
+def seed_store(path, urls):
+    """A store holding an older version of every page, so a refresh changes them all."""
+    records, _ = generate_corpus(len(urls), seed=1)
+    store = corpus_store.CorpusStore(path)
+    store.save([{"url": url, "content": record["content"]} for url, record in zip(urls, records)], urls=urls)
+    store.close()
+
+
+def sessions_until(shared, done, sessions, think):
+    """Rerun ``sessions`` simulated sessions until ``done()``; returns the rerun latencies."""
+    latencies, lock = [], threading.Lock()
+
+    def session(seed):
+        rng = random.Random(seed)
+        while not done():
+            profile = random_profile(rng)
+            start = time.perf_counter()
+            rerun(lambda: _corpus(shared), profile)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+            time.sleep(think)
+
+    threads = [threading.Thread(target=session, args=(seed,)) for seed in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies)
+
+
+def _corpus(shared):
+    snapshot = shared.snapshot()
+    return snapshot.records, snapshot.vector_index, snapshot.eligibility_index
+
+
+def run(mode, seeded, urls, tmp, args):
+    """Rerun latencies while one forced refresh runs in ``mode``, and the refresh time."""
+    store_path = os.path.join(tmp, f"{mode}.sqlite3")
+    shutil.copy(seeded, store_path)
+    shared = resources.SharedResources(
+        urls, store_path=store_path, cache_path=os.path.join(tmp, f"{mode}-cache.sqlite3"),
+        index_path=os.path.join(tmp, f"{mode}.npz"), ttl=3600,
+    )
+    if mode == "inline":
+        shared.snapshot()
+    else:
+        shared.start(processes=mode == "background process")
+        shared.snapshot()
+    version = shared.snapshot().version
+
+    if mode == "idle":
+        deadline = time.perf_counter() + args.idle
+        latencies = sessions_until(shared, lambda: time.perf_counter() > deadline, args.sessions, args.think)
+        seconds = 0.0
+    else:
+        start = time.perf_counter()
+        if mode == "inline":
+            refresher = threading.Thread(target=shared.snapshot, kwargs={"force": True})
+            refresher.start()
+            latencies = sessions_until(shared, lambda: not refresher.is_alive(), args.sessions, args.think)
+        else:
+            shared.request_refresh(force=True)
+            latencies = sessions_until(shared, lambda: not shared.refreshing, args.sessions, args.think)
+        seconds = time.perf_counter() - start
+        snapshot = shared.snapshot()
+        assert snapshot.version > version and snapshot.records, "the refresh did not swap in a new snapshot"
+    shared.close()
+    return latencies, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10_000)
+    parser.add_argument("--sessions", type=int, default=4, help="concurrently rerunning sessions")
+    parser.add_argument("--think", type=float, default=0.05, help="seconds between a session's reruns")
+    parser.add_argument("--idle", type=float, default=5.0, help="seconds to measure without a refresh")
+    args = parser.parse_args()
+
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve_site, args=(args.pages, child), daemon=True)
+    server.start()
+    base_url = parent.recv()
+    urls = [f"{base_url}/award/{i}" for i in range(args.pages)]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            seeded = os.path.join(tmp, "seeded.sqlite3")
+            seed_store(seeded, urls)
+            print(f"pages: {args.pages}, sessions: {args.sessions}, think time: {args.think * 1000:.0f} ms")
+            print(f"{'refresh':<20} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'refresh s':>10}")
+            for mode in ("idle", "inline", "background thread", "background process"):
+                latencies, seconds = run(mode, seeded, urls, tmp, args)
+                print(f"{mode:<20} {len(latencies):>7} {np.percentile(latencies, 50) * 1000:>8.1f} "
+                      f"{np.percentile(latencies, 95) * 1000:>8.1f} {latencies.max() * 1000:>8.1f} "
+                      f"{seconds:>10.1f}")
+    finally:
+        parent.send("stop")
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Retrieval benchmark
+
+Measures index build time, query latency and recall@k of the TF-IDF
+candidate retrieval in ``retrieval.py`` on synthetic corpora.
+
+A scholarship is relevant to a query when its generated major, cause and
+type all match the profile; recall@k is the share of the top ``k`` slots
+filled by relevant scholarships (capped by how many exist).
+
+Usage: python benchmarks/bench_retrieval.py [--sizes 1000 10000 100000] [--k 10]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import retrieval
+from synthetic import CAUSES, MAJORS, TYPES, generate_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'docs':>7} {'build s':>8} {'p50 ms':>7} {'p95 ms':>7} {'recall@' + str(args.k):>10}")
+    for size in args.sizes:
+        rng = random.Random(size)
+        records, attributes = generate_corpus(size, seed=size)
+
+        start = time.perf_counter()
+        index = retrieval.VectorIndex.build(records)
+        build = time.perf_counter() - start
+
+        latencies, recalls = [], []
+        for _ in range(args.queries):
+            major, cause, kind = rng.choice(MAJORS), rng.choice(CAUSES), rng.choice(TYPES)
+            relevant = {
+                i for i, attrs in enumerate(attributes)
+                if (attrs["major"], attrs["cause"], attrs["type"]) == (major, cause, kind)
+            }
+            if not relevant:
+                continue
+            query = retrieval.profile_query_text(3.0, major, "No", [kind], [cause])
+            start = time.perf_counter()
+            doc_ids, _ = index.top_k(query, args.k)
+            latencies.append(time.perf_counter() - start)
+            recalls.append(len(relevant.intersection(doc_ids.tolist())) / min(len(relevant), args.k))
+
+        p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+        print(f"{size:>7} {build:>8.2f} {p50:>7.2f} {p95:>7.2f} {np.mean(recalls):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Revalidation benchmark
+
+Refreshes a stored corpus after a fraction of the pages changed and reports
+bytes transferred and pages re-parsed for a full re-scrape, a conditional
+refresh against a server that sends ETags, and one against a server that
+does not (so only the body hash check applies).
+
+Usage: python benchmarks/bench_revalidation.py [--pages 500] [--changed-every 10]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus_store
+import scraper
+from stub_server import StubServer
+
+
+def full_rescrape(urls):
+    stats = corpus_store.RefreshStats(pages_requested=len(urls))
+    for url, response in scraper.fetch_all(urls):
+        stats.bytes_transferred += len(response.content)
+        scraper.parse_page(response.text)
+        stats.reparsed += 1
+    return stats
+
+
+def run(label, mode, args):
+    with StubServer(etags=mode != "hash", changed_every=args.changed_every) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        urls = [f"{server.base_url}/scholarship/{i}" for i in range(args.pages)]
+        store = corpus_store.CorpusStore(os.path.join(tmp, "corpus.sqlite3"))
+        corpus_store.refresh_corpus(urls, store)
+        server.bump_revision()
+        start = time.perf_counter()
+        if mode == "full":
+            stats = full_rescrape(urls)
+        else:
+            stats = corpus_store.refresh_corpus(urls, store)
+        elapsed = time.perf_counter() - start
+        store.close()
+    print(f"{label:<22} {elapsed:>7.2f}s  {stats.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--changed-every", type=int, default=10)
+    args = parser.parse_args()
+
+    run("full re-scrape", "full", args)
+    run("conditional (ETag)", "etag", args)
+    run("conditional (hash)", "hash", args)
+
+
+if __name__ == "__main__":
+    main()
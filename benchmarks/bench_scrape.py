@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Scrape benchmark
+
+Compares the old serial ``requests.get`` loop with the concurrent fetch engine
+in ``scraper.py`` against local stub servers, as the URL list grows.
+
+Usage: python benchmarks/bench_scrape.py [--latency 0.05] [--sizes 20 200 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from contextlib import ExitStack
+
+import scraper
+from stub_server import StubServer
+
+HOSTS = 4
+
+
+def serial_scrape(urls):
+    scholarships = []
+    for url in urls:
+        response = requests.get(url)
+        if response.status_code == 200:
+            scholarships.append({"url": url, "content": scraper.parse_page(response.text)})
+    return scholarships
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds of server latency per request")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--serial-limit", type=int, default=200, help="skip the serial loop above this size")
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--per-host", type=int, default=16)
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        servers = [stack.enter_context(StubServer(latency=args.latency)) for _ in range(HOSTS)]
+        print(f"{'urls':>6} {'serial s':>10} {'concurrent s':>13} {'speedup':>8}")
+        for size in args.sizes:
+            urls = [f"{servers[i % HOSTS].base_url}/scholarship/{i}" for i in range(size)]
+            concurrent_time, records = timed(
+                scraper.scrape_scholarship_data, urls, max_workers=args.workers, per_host=args.per_host
+            )
+            assert len(records) == size
+            if size <= args.serial_limit:
+                serial_time, _ = timed(serial_scrape, urls)
+                print(f"{size:>6} {serial_time:>10.2f} {concurrent_time:>13.2f} {serial_time / concurrent_time:>7.1f}x")
+            else:
+                print(f"{size:>6} {'-':>10} {concurrent_time:>13.2f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""Segment table benchmark
+
+Builds the precomputed segment table over synthetic corpora and serves
+random form submissions from it, next to the live pipeline (eligibility
+filter over the whole corpus, then TF-IDF retrieval). Reports how long the
+table takes to build and how large it is. Also reports the share of
+submissions it answers, and serving latency for the table and the live
+path. Submissions with a major are split into the first one for a segment
+and major, which ranks the corpus, and later ones served from the table's
+LRU; the later ones are the same submissions replayed with fresh age, GPA,
+school year and state. Every answer is checked against the live pipeline:
+the same scores, best first.
+
+Usage: python benchmarks/bench_segments.py [--sizes 1000 10000 100000] [--profiles 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import eligibility
+import resources
+import retrieval
+import segments
+from synthetic import MAJORS, generate_corpus
+
+STATES = ["", "", "California", "Texas", "New York", "Oregon"]
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def random_criteria(rng, financial_need, merit):
+    """Eligibility fields, keeping the need answer and the merit band that pick the segment."""
+    gpa = round(rng.uniform(retrieval.MERIT_GPA, 4.0) if merit else rng.uniform(2.0, retrieval.MERIT_GPA - 0.1), 1)
+    return {
+        "age": rng.randint(17, 30), "gpa": gpa,
+        "school_year": rng.choice(eligibility.SCHOOL_YEARS), "residence_state": rng.choice(STATES),
+        "financial_need": financial_need, "physical_disabilities": rng.choice(["Yes", "No", "No", "No"]),
+    }
+
+
+def random_submission(rng, major_share):
+    """A form submission; up to three types and causes, so some fall outside a two-choice table."""
+    criteria = random_criteria(rng, rng.choice(["Yes", "No"]), rng.random() < 0.3)
+    types = rng.sample(segments.SCHOLARSHIP_TYPES, rng.choice([0, 1, 1, 1, 2, 2, 3]))
+    causes = rng.sample(segments.CAUSES, rng.choice([0, 1, 1, 1, 2, 2, 3]))
+    major = rng.choice(MAJORS) if rng.random() < major_share else ""
+    return criteria, major, types, causes
+
+
+def live(corpus, criteria, major, types, causes, k):
+    eligible = corpus.eligibility_index.filter(**criteria)
+    query_text = retrieval.profile_query_text(criteria["gpa"], major, criteria["financial_need"], types, causes)
+    return corpus.vector_index.top_k(query_text, k, mask=eligible)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--major-share", type=float, default=0.5, help="share of submissions with a major")
+    parser.add_argument("--depth", type=int, default=segments.DEFAULT_DEPTH)
+    parser.add_argument("--max-choices", type=int, default=segments.DEFAULT_MAX_CHOICES)
+    parser.add_argument("--top-k", type=int, default=retrieval.DEFAULT_TOP_K)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    submissions = [random_submission(rng, args.major_share) for _ in range(args.profiles)]
+    replayed = [
+        (random_criteria(rng, criteria["financial_need"], criteria["gpa"] >= retrieval.MERIT_GPA), *choices)
+        for criteria, *choices in submissions
+    ]
+    print(f"{args.profiles} submissions, {args.major_share:.0%} with a major; depth {args.depth}, "
+          f"up to {args.max_choices} types and causes per segment")
+    print(f"{'docs':>7} {'segments':>9} {'build s':>8} {'KB':>7} {'served':>7} {'exact':>6} "
+          f"{'table p50/p95 us':>17} {'major 1st p50/p95 us':>21} {'major LRU p50/p95 us':>21} "
+          f"{'live p50/p95 us':>16}")
+    for size in args.sizes:
+        records, _ = generate_corpus(size)
+        corpus = resources.CorpusSnapshot(
+            version=1, refreshed_at=0.0, records=records, vector_index=retrieval.VectorIndex.build(records),
+            eligibility_index=eligibility.EligibilityIndex.build(records),
+        )
+        build_seconds, table = timed(lambda: segments.build_table(corpus.vector_index, args.depth, args.max_choices))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "segments.npz")
+            table.save(path)
+            disk_kb = os.path.getsize(path) / 1024
+            table = segments.load_table(path, corpus.vector_index)
+
+        times = {"table": [], "first": [], "cached": [], "live": []}
+        exact, served = [], 0
+        for replay, batch in enumerate((submissions, replayed)):
+            for criteria, major, types, causes in batch:
+                seconds, found = timed(lambda: table.top_k(
+                    corpus.vector_index, corpus.eligibility_index, criteria, major, types, causes, args.top_k
+                ))
+                live_seconds, (doc_ids, scores) = timed(
+                    lambda: live(corpus, criteria, major, types, causes, args.top_k)
+                )
+                times["live"].append(live_seconds)
+                if found is None:
+                    continue
+                served += 1
+                times["table" if not major else "cached" if replay else "first"].append(seconds)
+                # Ties may be ordered differently, so the score lists are compared rather than the ids.
+                exact.append(len(found[1]) == len(scores) and np.allclose(found[1], scores, atol=1e-6))
+
+        us = {name: np.percentile(values, [50, 95]) * 1e6 for name, values in times.items()}
+        print(f"{size:>7} {len(table):>9} {build_seconds:>8.1f} {disk_kb:>7.0f} "
+              f"{served / (2 * len(submissions)):>7.1%} {np.mean(exact):>6.1%} "
+              f"{us['table'][0]:>8.0f}/{us['table'][1]:<8.0f} {us['first'][0]:>10.0f}/{us['first'][1]:<10.0f} "
+              f"{us['cached'][0]:>10.0f}/{us['cached'][1]:<10.0f} {us['live'][0]:>7.0f}/{us['live'][1]:<8.0f}")
+    print("served: submissions answered from the table (the rest fall back to the live pipeline); "
+          "exact: answers equal to the live pipeline's")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Concurrent sessions benchmark
+
+Simulates concurrent Streamlit sessions rerunning the matching page against
+a stored synthetic corpus. Each rerun gets the corpus, filters it by a
+random profile and retrieves candidates (the LLM step is left out).
+
+Per-session loading reads the corpus from the store on every rerun, as the
+app did before; shared loading hands every session the process-wide
+snapshot from :class:`resources.SharedResources`. Reports rerun latency
+percentiles and traced memory per additional concurrent session.
+
+Usage: python benchmarks/bench_sessions.py [--sessions 50] [--reruns 5] [--docs 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import corpus_store
+import eligibility
+import resources
+import retrieval
+from synthetic import CAUSES, MAJORS, generate_corpus
+
+
+def random_profile(rng):
+    return {
+        "age": rng.randint(17, 30), "gpa": round(rng.uniform(2.0, 4.0), 1), "major": rng.choice(MAJORS),
+        "school_year": rng.choice(eligibility.SCHOOL_YEARS), "residence_state": "California",
+        "financial_need": rng.choice(["Yes", "No"]), "physical_disabilities": "No",
+        "scholarship_type": ["Merit Scholarships"], "causes": [rng.choice(CAUSES)],
+    }
+
+
+def rerun(get_corpus, profile):
+    records, vector_index, eligibility_index = get_corpus()
+    eligible = eligibility_index.filter(
+        age=profile["age"], gpa=profile["gpa"], school_year=profile["school_year"],
+        residence_state=profile["residence_state"], financial_need=profile["financial_need"],
+        physical_disabilities=profile["physical_disabilities"],
+    )
+    query_text = retrieval.profile_query_text(
+        profile["gpa"], profile["major"], profile["financial_need"], profile["scholarship_type"], profile["causes"]
+    )
+    return retrieval.retrieve(vector_index, records, query_text, mask=eligible)
+
+
+def run_sessions(get_corpus, sessions, reruns, trace=False):
+    """Run ``sessions`` concurrent sessions; returns (rerun latencies, peak traced bytes above baseline)."""
+    latencies, lock = [], threading.Lock()
+    barrier = threading.Barrier(sessions)
+
+    def session(seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        for _ in range(reruns):
+            start = time.perf_counter()
+            rerun(get_corpus, random_profile(rng))
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    if trace:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(session, range(sessions)))
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+    return np.array(latencies), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--docs", type=int, default=5000)
+    args = parser.parse_args()
+
+    records, _ = generate_corpus(args.docs)
+    urls = [record["url"] for record in records]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = corpus_store.CorpusStore(os.path.join(tmp, "corpus.sqlite3"))
+        store.save(records, urls=urls)
+        shared = resources.SharedResources(
+            urls, store_path=os.path.join(tmp, "corpus.sqlite3"), cache_path=os.path.join(tmp, "cache.sqlite3"),
+            index_path=os.path.join(tmp, "index.npz"),
+        )
+        snapshot = shared.snapshot()
+
+        def per_session():
+            return corpus_store.load_corpus(urls, store=store), snapshot.vector_index, snapshot.eligibility_index
+
+        def shared_snapshot():
+            current = shared.snapshot()
+            return current.records, current.vector_index, current.eligibility_index
+
+        print(f"docs: {args.docs}, sessions: {args.sessions}, reruns per session: {args.reruns}")
+        print(f"{'':<22} {'p50 ms':>8} {'p95 ms':>8} {'KB/session':>11}")
+        for label, get_corpus in (("per-session loading", per_session), ("shared snapshot", shared_snapshot)):
+            latencies, _ = run_sessions(get_corpus, args.sessions, args.reruns)
+            _, one = run_sessions(get_corpus, 1, 1, trace=True)
+            _, many = run_sessions(get_corpus, args.sessions, 1, trace=True)
+            per_extra = (many - one) / (args.sessions - 1) / 1024
+            print(f"{label:<22} {np.percentile(latencies, 50) * 1000:>8.1f} "
+                  f"{np.percentile(latencies, 95) * 1000:>8.1f} {per_extra:>11.0f}")
+        shared.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Startup benchmark
+
+Cold start of each Streamlit entry script, each in a fresh interpreter
+started with ``python -X importtime``. Streamlit's test harness is imported
+first; everything the script imports after that is attributed to the app.
+Reports the app's own import time and heaviest imports, the time to the
+first complete run of the script (first paint), and which heavy modules
+were loaded before anything was clicked.
+
+Usage: python benchmarks/bench_startup.py [--scripts scholarshipapptest.py testing.py] [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = ["scholarshipapptest.py", "testing.py", "scholarshipapp.py", "calendar_app.py"]
+HEAVY = ["openai", "requests", "bs4", "lxml", "numpy", "pandas", "pyarrow", "aiohttp"]
+MARKER = "--- app imports ---"
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Runs in the child.
+CHILD = """
+import json, sys, time
+sys.path.append({repo!r})
+from streamlit.testing.v1 import AppTest
+print({marker!r}, file=sys.stderr, flush=True)
+start = time.perf_counter()
+at = AppTest.from_file({path!r}, default_timeout=120).run()
+first_paint = time.perf_counter() - start
+print(json.dumps({{
+    "first_paint": first_paint,
+    "exceptions": len(at.exception),
+    "heavy": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Top-level ``(module, cumulative seconds)`` imported after the marker line."""
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    imports = []
+    for line in lines:
+        match = IMPORTTIME_RE.match(line)
+        if match and len(match.group(3)) == 1:  # one space: not nested in another import
+            imports.append((match.group(4), int(match.group(2)) / 1e6))
+    return imports
+
+
+def cold_start(script, cwd):
+    path = os.path.join(REPO_ROOT, script)
+    child = CHILD.format(repo=REPO_ROOT, marker=MARKER, path=path, heavy=HEAVY)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", child], cwd=cwd, capture_output=True, text=True, check=True
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scripts", nargs="+", default=SCRIPTS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=3, help="heaviest app imports to list")
+    args = parser.parse_args()
+
+    print(f"{'script':<24} {'import ms':>10} {'first paint ms':>15}  heavy modules loaded / heaviest imports")
+    for script in args.scripts:
+        with tempfile.TemporaryDirectory() as cwd:
+            runs = [cold_start(script, cwd) for _ in range(args.runs)]
+        import_ms = statistics.median(sum(s for _, s in run["imports"]) for run in runs) * 1000
+        paint_ms = statistics.median(run["first_paint"] for run in runs) * 1000
+        heaviest = sorted(runs[-1]["imports"], key=lambda item: -item[1])[:args.top]
+        errors = " (raised)" if any(run["exceptions"] for run in runs) else ""
+        print(f"{script:<24} {import_ms:>10.0f} {paint_ms:>15.0f}{errors}  "
+              f"{', '.join(runs[-1]['heavy']) or 'none'} / "
+              + ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in heaviest))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Mock completion server
+
+Local stand-in for the OpenAI completions endpoint with injectable latency.
+Point ``openai.api_base`` at ``MockLLM.api_base`` and every
+``openai.Completion.create`` call in the app is answered deterministically:
+a scholarship is a "Match" when it shares at least ``MATCH_OVERLAP`` terms
+with the values in the user's query. Batched prompts (``[n] ...`` listings) get one
+numbered verdict line per scholarship.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from retrieval import tokenize
+
+MATCH_OVERLAP = 2
+# Field labels of the app's user_query; they say nothing about the profile.
+QUERY_LABELS = {"gpa", "major", "financial", "need", "scholarship", "type", "causes", "yes", "no"}
+QUERY_RE = re.compile(r"user's query: (.*?)\.\s*(?:\n|Scholarship:)", re.S)
+LISTING_RE = re.compile(r"^\[(\d+)\] (.*)$", re.M)
+
+
+def verdict_for(query_terms, page):
+    shared = sorted(query_terms.intersection(tokenize(page)))
+    if len(shared) >= MATCH_OVERLAP:
+        return f"Match - mentions {', '.join(shared[:3])}"
+    return "No Match - too little in common with the profile"
+
+
+def complete(prompt):
+    """Deterministic completion text for a single or batched matching prompt."""
+    query = QUERY_RE.search(prompt)
+    query_terms = set(tokenize(query.group(1) if query else "")) - QUERY_LABELS
+    listing = LISTING_RE.findall(prompt)
+    if listing:
+        return "\n".join(f"{n}: {verdict_for(query_terms, page)}" for n, page in listing)
+    page = prompt.split("Scholarship:", 1)[-1]
+    return verdict_for(query_terms, page)
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.prompt_chars += len(body.get("prompt", ""))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        payload = json.dumps({
+            "id": "cmpl-mock",
+            "object": "text_completion",
+            "model": body.get("model", "mock"),
+            "choices": [{"text": complete(body.get("prompt", "")), "index": 0, "finish_reason": "stop"}],
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockLLM:
+    """Runs the mock completion server on a background thread.
+
+    ``requests`` and ``prompt_chars`` count what the server has received.
+    """
+
+    def __init__(self, latency=0.2):
+        self.latency = latency
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def api_base(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    @property
+    def prompt_chars(self):
+        return self.httpd.prompt_chars
+
+    def reset_counters(self):
+        with self.httpd.lock:
+            self.httpd.requests = 0
+            self.httpd.prompt_chars = 0
+
+    def __enter__(self):
+        import openai
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), MockLLMHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = self.latency
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests = 0
+        self.httpd.prompt_chars = 0
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self._saved = (openai.api_base, openai.api_key)
+        openai.api_base, openai.api_key = self.api_base, "sk-mock"
+        return self
+
+    def __exit__(self, *exc):
+        import openai
+
+        openai.api_base, openai.api_key = self._saved
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""Offline benchmark suite
+
+Timed scenarios for the app's main stages, run entirely against local
+stand-ins: a stub HTTP server (with injectable latency and errors) for
+scraping, the mock completion server for LLM matching, and synthetic corpora
+and catalogs for retrieval, eligibility and the calendar.
+
+Each scenario is repeated and its median wall time recorded. Results are
+written as JSON together with the commit they were measured at, so a run can
+be compared with one from an earlier commit; ``--compare`` prints the
+deltas and exits non-zero when a scenario got slower than ``--threshold``.
+
+Usage: python benchmarks/run_suite.py [--size small|medium|large] [--only scrape match]
+                                      [-o results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+import calendar_index
+import eligibility
+import llm_batch
+import retrieval
+import scraper
+from bench_sessions import random_profile
+from mock_llm import MockLLM
+from stub_server import StubServer
+from synthetic import generate_catalog, generate_corpus
+
+HOSTS = 4
+SIZES = {
+    "small": {"pages": 200, "matches": 50, "docs": 2000, "queries": 50, "catalog": 10_000},
+    "medium": {"pages": 1000, "matches": 200, "docs": 10_000, "queries": 200, "catalog": 100_000},
+    "large": {"pages": 5000, "matches": 1000, "docs": 50_000, "queries": 500, "catalog": 1_000_000},
+}
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def timed(fn, repeat=1):
+    """Median and minimum seconds over ``repeat`` calls, and the last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), min(times), result
+
+
+def scenario_scrape(size, args):
+    """Concurrent scrape of generated pages over several stub hosts, some requests failing."""
+    with ExitStack() as stack:
+        servers = [
+            stack.enter_context(StubServer(latency=args.latency, error_rate=args.error_rate, seed=seed))
+            for seed in range(HOSTS)
+        ]
+        urls = [f"{servers[i % HOSTS].base_url}/scholarship/{i}" for i in range(size["pages"])]
+        median, best, records = timed(
+            lambda: scraper.scrape_scholarship_data(urls, backoff=0.01), args.repeat
+        )
+        errors = sum(server.errors for server in servers)
+    return median, best, {"pages": len(urls), "scraped": len(records), "errors_injected": errors}
+
+
+def scenario_match(size, args):
+    """Batched LLM matching of one profile against generated scholarships."""
+    scholarships, _ = generate_corpus(size["matches"], seed=1)
+    user_query = ("GPA: 3.8, Major: Computer Science, Financial Need: Yes, "
+                  "Scholarship Type: Merit Scholarships, Causes: Environment")
+    with MockLLM(latency=args.llm_latency) as llm:
+        median, best, matches = timed(
+            lambda: llm_batch.match_scholarships_batched(user_query, scholarships, rate=1000.0), args.repeat
+        )
+        requests = llm.requests // args.repeat
+    return median, best, {"scholarships": len(scholarships), "matches": len(matches), "llm_requests": requests}
+
+
+def scenario_retrieval(size, args):
+    """Index build plus eligibility filtering and top-k retrieval for random profiles."""
+    records, _ = generate_corpus(size["docs"], seed=2)
+    rng = random.Random(0)
+    profiles = [random_profile(rng) for _ in range(size["queries"])]
+
+    def run():
+        vector_index = retrieval.VectorIndex.build(records)
+        eligibility_index = eligibility.EligibilityIndex.build(records)
+        for profile in profiles:
+            eligible = eligibility_index.filter(
+                age=profile["age"], gpa=profile["gpa"], school_year=profile["school_year"],
+                residence_state=profile["residence_state"], financial_need=profile["financial_need"],
+                physical_disabilities=profile["physical_disabilities"],
+            )
+            query_text = retrieval.profile_query_text(
+                profile["gpa"], profile["major"], profile["financial_need"],
+                profile["scholarship_type"], profile["causes"],
+            )
+            vector_index.top_k(query_text, retrieval.DEFAULT_TOP_K, mask=eligible)
+
+    median, best, _ = timed(run, args.repeat)
+    return median, best, {"docs": len(records), "queries": len(profiles)}
+
+
+def scenario_calendar_build(size, args):
+    """Event index and recurrence rules from a catalog with some recurring deadlines."""
+    catalog = generate_catalog(size["catalog"], seed=3, recurring=0.05)
+
+    def run():
+        one_off, rules = calendar_index.split_recurring(catalog)
+        return calendar_index.EventIndex.build(one_off), rules
+
+    median, best, (index, rules) = timed(run, args.repeat)
+    return median, best, {"rows": len(catalog), "days": len(index), "rules": len(rules)}
+
+
+def scenario_calendar_render(size, args):
+    """Uncached HTML rendering of every month of a two-year catalog."""
+    catalog = generate_catalog(size["catalog"], seed=3, recurring=0.05)
+    one_off, rules = calendar_index.split_recurring(catalog)
+    index = calendar_index.EventIndex.build(one_off)
+    months = [(year, month) for year in (2024, 2025) for month in range(1, 13)]
+    render = calendar_index.render_month_html.__wrapped__  # the lru_cache under the timing wrapper
+
+    def run():
+        render.cache_clear()
+        return sum(len(render(index, year, month, rules)) for year, month in months)
+
+    median, best, chars = timed(run, args.repeat)
+    return median, best, {"months": len(months), "html_chars": chars}
+
+
+SCENARIOS = {
+    "scrape": scenario_scrape,
+    "match": scenario_match,
+    "retrieval": scenario_retrieval,
+    "calendar_build": scenario_calendar_build,
+    "calendar_render": scenario_calendar_render,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline, threshold):
+    """Print per-scenario deltas against ``baseline``; returns the names that regressed."""
+    regressions = []
+    print(f"\ncompared with {baseline['commit']} ({baseline['created']}, size {baseline['size']})")
+    print(f"{'scenario':<16} {'before s':>9} {'after s':>9} {'change':>8}")
+    for name, result in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name:<16} {'-':>9} {result['seconds']:>9.3f} {'new':>8}")
+            continue
+        change = result["seconds"] / before["seconds"] - 1 if before["seconds"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<16} {before['seconds']:>9.3f} {result['seconds']:>9.3f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, help="run only these scenarios")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.01, help="stub server seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="fraction of requests answered with 503")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="mock LLM seconds per request")
+    parser.add_argument("-o", "--output", help="results file (default: benchmarks/results/<commit>-<size>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    size = SIZES[args.size]
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "size": args.size,
+        "parameters": {**size, "repeat": args.repeat, "latency": args.latency,
+                       "error_rate": args.error_rate, "llm_latency": args.llm_latency},
+        "scenarios": {},
+    }
+    print(f"commit {commit}, size {args.size}, {args.repeat} runs per scenario")
+    print(f"{'scenario':<16} {'median s':>9} {'min s':>9}  details")
+    for name in args.only or SCENARIOS:
+        median, best, details = SCENARIOS[name](size, args)
+        results["scenarios"][name] = {"seconds": median, "min_seconds": best, **details}
+        print(f"{name:<16} {median:>9.3f} {best:>9.3f}  "
+              + ", ".join(f"{key}={value}" for key, value in details.items()))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}-{args.size}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(f"regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
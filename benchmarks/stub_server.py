@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Stub HTTP server
+
+Local HTTP server that serves generated scholarship pages with an injectable
+per-request latency, so the scraper can be benchmarked without the network.
+Pages carry an ETag and honour ``If-None-Match``; bumping ``revision`` changes
+the pages whose number is a multiple of ``changed_every``. A seeded
+``error_rate`` fraction of requests is answered with ``error_status``, to
+exercise retries.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PAGE_TEMPLATE = (
+    "<html><head><title>Scholarship {n}</title></head><body>"
+    "<nav><p>Home | Financial Aid | Contact</p></nav>"
+    "<main><h1>Scholarship {n}</h1>"
+    "<p>Award amount: ${amount}. Deadline: March {day}, 2025.</p>"
+    "<p>Applicants must hold a minimum GPA of {gpa} and demonstrate financial need.</p>"
+    "{revision}</main><footer><p>Copyright Santa Clara University</p></footer></body></html>"
+)
+
+
+def render_page(path, revision=0, changed_every=10):
+    """Return a deterministic HTML page for ``path`` at ``revision``."""
+    n = sum(path.encode()) % 10000
+    note = f"<p>Updated, revision {revision}.</p>" if revision and n % changed_every == 0 else ""
+    return PAGE_TEMPLATE.format(
+        n=n, amount=500 + n % 20 * 250, day=1 + n % 28, gpa=2.0 + n % 20 / 10, revision=note
+    )
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.error_rate:
+            with self.server.lock:
+                failed = self.server.rng.random() < self.server.error_rate
+                self.server.errors += failed
+            if failed:
+                self.send_response(self.server.error_status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        body = render_page(self.path, self.server.revision, self.server.changed_every).encode("utf-8")
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.server.etags and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.server.etags:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """Runs a :class:`ThreadingHTTPServer` on a background thread.
+
+    Use as a context manager; ``base_url`` is available once entered.
+    """
+
+    def __init__(self, latency=0.0, handler=StubHandler, etags=True, changed_every=10,
+                 error_rate=0.0, error_status=503, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+        self.etags = etags
+        self.changed_every = changed_every
+        self.handler = handler
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = self.latency
+        self.httpd.etags = self.etags
+        self.httpd.changed_every = self.changed_every
+        self.httpd.revision = 0
+        self.httpd.error_rate = self.error_rate
+        self.httpd.error_status = self.error_status
+        self.httpd.rng = random.Random(self.seed)
+        self.httpd.lock = threading.Lock()
+        self.httpd.errors = 0
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    @property
+    def errors(self):
+        """Requests answered with ``error_status`` so far."""
+        return self.httpd.errors
+
+    def bump_revision(self):
+        """Change a fraction of the served pages."""
+        self.httpd.revision += 1
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Stub scholarship site
+
+A generated site served over local HTTP for crawling: a home page linking to
+section index pages, each listing ``fanout`` award pages, and award pages
+linking back and across to each other. Links also come with fragments,
+tracking parameters, off-site targets, PDFs and a ``/private/`` area that
+``robots.txt`` disallows, so the crawler's normalization, frontier and
+politeness can be checked against the per-path request counts the server
+keeps.
+"""
+
+import random
+import threading
+from collections import Counter
+
+from stub_server import StubHandler, StubServer
+from synthetic import make_scholarship
+
+
+def site_page(path, pages, fanout):
+    """HTML for ``path`` in a site of ``pages`` award pages, or ``None`` if there is no such page."""
+    sections = (pages + fanout - 1) // fanout
+    parts = path.strip("/").split("/")
+    if path == "/":
+        links = [f"/section/{s}" for s in range(sections)]
+        return _page("Scholarships", "Browse scholarships by section.", links)
+    if len(parts) != 2 or not parts[1].isdigit():
+        return None
+    kind, n = parts[0], int(parts[1])
+    if kind == "section" and n < sections:
+        awards = range(n * fanout, min(pages, (n + 1) * fanout))
+        links = [f"/award/{i}" for i in awards]
+        links += [f"/award/{i}?utm_source=section&utm_medium=list#apply" for i in awards[:5]]
+        links += ["/", f"/section/{(n + 1) % sections}", f"/private/{n}", f"/files/guide-{n}.pdf",
+                  "https://elsewhere.example/scholarships", "mailto:aid@example.edu"]
+        return _page(f"Section {n}", f"Scholarships {awards.start} to {awards.stop - 1}.", links)
+    if kind == "award" and n < pages:
+        record, _ = make_scholarship(n, random.Random(n))
+        links = ["/", f"/section/{n // fanout}", f"/award/{(n * 7 + 3) % pages}", f"/award/{n}/../{n}"]
+        return _page(f"Award {n}", record["content"], links)
+    if kind == "private":
+        return _page("Staff only", "Internal notes.", ["/"])
+    return None
+
+
+def _page(title, text, links):
+    anchors = "".join(f'<li><a href="{link}">{link}</a></li>' for link in links)
+    return (f"<html><head><title>{title}</title></head><body><nav><a href='/'>Home</a></nav>"
+            f"<main><h1>{title}</h1><p>{text}</p><ul>{anchors}</ul></main></body></html>")
+
+
+class SiteHandler(StubHandler):
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests[self.path] += 1
+        if self.path == "/robots.txt":
+            lines = ["User-agent: *", "Disallow: /private/"]
+            if self.server.crawl_delay:
+                lines.append(f"Crawl-delay: {self.server.crawl_delay}")
+            self._send(200, "\n".join(lines) + "\n", "text/plain")
+            return
+        body = site_page(self.path, self.server.pages, self.server.fanout)
+        if body is None:
+            self._send(404, "not found", "text/plain")
+        else:
+            self._send(200, body, "text/html; charset=utf-8")
+
+    def _send(self, status, text, content_type):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubSite(StubServer):
+    """Serves a generated site of ``pages`` award pages; ``requests`` counts fetches per path."""
+
+    def __init__(self, pages=1000, fanout=50, crawl_delay=None, **options):
+        super().__init__(handler=SiteHandler, **options)
+        self.pages = pages
+        self.fanout = fanout
+        self.crawl_delay = crawl_delay
+
+    def __enter__(self):
+        super().__enter__()
+        self.httpd.pages = self.pages
+        self.httpd.fanout = self.fanout
+        self.httpd.crawl_delay = self.crawl_delay
+        self.httpd.requests = Counter()
+        self.httpd.lock = threading.Lock()
+        return self
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    @property
+    def reachable(self):
+        """Number of distinct pages reachable from ``/``."""
+        return 1 + (self.pages + self.fanout - 1) // self.fanout + self.pages
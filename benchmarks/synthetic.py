@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""Synthetic corpus
+
+Deterministic generator of scholarship-like ``{"url", "content"}`` records
+with known attributes, so retrieval and matching can be measured offline,
+of full HTML pages wrapping them in realistic site boilerplate, of corpora
+with near-duplicate sibling pages, and of calendar catalogs of any size.
+"""
+
+import random
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from corpus_store import content_hash
+
+MAJORS = [
+    "Computer Science", "Mechanical Engineering", "Biology", "Political Science", "Economics",
+    "Nursing", "Music", "History", "Psychology", "Chemistry", "Education", "Art History",
+]
+CAUSES = ["community service", "sustainability", "social justice", "diversity", "STEM", "arts"]
+TYPES = ["merit", "need-based", "federal grant", "athletic", "artistic", "graduate aid"]
+FILLER = [
+    "The award is renewable for up to four years.",
+    "Recipients are announced in the spring.",
+    "Applications are reviewed by a committee of faculty and alumni.",
+    "Submit two letters of recommendation and an official transcript.",
+    "Contact the financial aid office with questions.",
+]
+
+
+def make_scholarship(i, rng, major=None, cause=None, kind=None):
+    """Return one synthetic scholarship record and its attributes."""
+    major = major or rng.choice(MAJORS)
+    cause = cause or rng.choice(CAUSES)
+    kind = kind or rng.choice(TYPES)
+    gpa = round(rng.uniform(2.0, 3.8), 1)
+    amount = rng.choice([500, 1000, 2500, 5000, 10000])
+    sentences = [
+        f"The {major} {kind} scholarship awards ${amount:,} to students majoring in {major}.",
+        f"Applicants must have a minimum GPA of {gpa} and a commitment to {cause}.",
+        *rng.sample(FILLER, 3),
+    ]
+    content = " ".join(sentences)
+    record = {
+        "url": f"https://scholarships.example.edu/award/{i}",
+        "content": content,
+        "content_hash": content_hash(content),
+    }
+    return record, {"major": major, "cause": cause, "type": kind, "min_gpa": gpa, "amount": amount}
+
+
+def generate_corpus(size, seed=0):
+    """Return ``(records, attributes)`` for ``size`` synthetic scholarships."""
+    rng = random.Random(seed)
+    pairs = [make_scholarship(i, rng) for i in range(size)]
+    return [record for record, _ in pairs], [attrs for _, attrs in pairs]
+
+
+PAGE_HTML = """<!DOCTYPE html>
+<html><head><title>{title}</title><style>body {{ font-family: sans-serif; }}</style>
+<script>window.dataLayer = window.dataLayer || [];</script></head>
+<body>
+<div id="cookie-banner"><p>We use cookies to improve your experience. By continuing you accept our cookie policy.</p></div>
+<header class="site-header"><p>Office of Financial Aid</p>
+<nav><ul>{nav}</ul></nav></header>
+<div class="breadcrumb"><p>Home / Financial Aid / Scholarships / {title}</p></div>
+<main>
+<h1>{title}</h1>
+<p>{intro}</p>
+<h2>Eligibility</h2>
+<ul>{eligibility}</ul>
+<h2>Award details</h2>
+<table><tr><th>Amount</th><td>${amount:,}</td></tr><tr><th>Deadline</th><td>{deadline}</td></tr></table>
+<p>{filler}</p>
+</main>
+<aside class="sidebar"><p>Related links: FAFSA, Cal Grants, Work-Study, Loans, Graduate Aid.</p></aside>
+<footer><p>Santa Clara University, 500 El Camino Real, Santa Clara, CA 95053</p>
+<p>Copyright 2024. All rights reserved. Privacy policy. Accessibility. Contact us.</p></footer>
+</body></html>
+"""
+NAV_ITEMS = ["Home", "Cost of Attendance", "Types of Aid", "Deadlines", "Forms", "FAQ", "Contact Us"]
+SURNAMES = [
+    "Alvarez", "Bennett", "Chen", "Delgado", "Edwards", "Fujimoto", "Garcia", "Hughes", "Ibrahim", "Jensen",
+    "Kowalski", "Lopez", "Murphy", "Nguyen", "Okafor", "Patel", "Quinn", "Rossi", "Schmidt", "Tanaka",
+]
+SPONSORS = ["Family Foundation", "Memorial Fund", "Community Trust", "Alumni Association", "Rotary Club",
+            "Education Fund", "Charitable Trust", "Endowment"]
+CITIES = ["Sacramento", "Fresno", "San Jose", "Oakland", "Portland", "Denver", "Austin", "Phoenix",
+          "Seattle", "Boise", "Tucson", "Reno"]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+          "October", "November", "December"]
+
+
+def render_page_html(i, rng):
+    """Return ``(html, attributes)`` for one synthetic scholarship page with boilerplate."""
+    record, attrs = make_scholarship(i, rng)
+    title = f"{attrs['major']} {attrs['type'].title()} Scholarship"
+    month, day = rng.randrange(1, 13), rng.randint(1, 28)
+    html = PAGE_HTML.format(
+        title=title,
+        nav="".join(f"<li><a href='#'>{item}</a></li>" for item in NAV_ITEMS * 3),
+        intro=record["content"],
+        eligibility="".join(f"<li>{line}</li>" for line in [
+            f"Minimum GPA of {attrs['min_gpa']}",
+            f"Declared major in {attrs['major']}",
+            f"Demonstrated commitment to {attrs['cause']}",
+        ]),
+        amount=attrs["amount"],
+        deadline=f"{MONTHS[month - 1]} {day}, 2025",
+        filler=" ".join(rng.sample(FILLER, 4)),
+    )
+    attrs["title"], attrs["deadline"] = title, date(2025, month, day)
+    return html, attrs
+
+
+def generate_near_duplicates(size, duplicate_fraction=0.3, max_copies=3, seed=0):
+    """Return ``(records, clusters)``: ``size`` scholarships, a fraction of them
+    republished on 1 to ``max_copies`` sibling pages that repeat the text with an
+    "updated" line appended. ``clusters[i]`` is the scholarship record ``i`` shows.
+    """
+    rng = random.Random(seed)
+    base, _ = generate_corpus(size, seed)
+    records, clusters = [], []
+    for i, record in enumerate(base):
+        sponsor = (f"Sponsored by the {rng.choice(SURNAMES)} {rng.choice(SPONSORS)} "
+                   f"of {rng.choice(CITIES)} since {rng.randint(1950, 2020)}.")
+        content = f"{sponsor} {record['content']}"
+        records.append({**record, "content": content, "content_hash": content_hash(content)})
+        clusters.append(i)
+        if rng.random() >= duplicate_fraction:
+            continue
+        for copy in range(rng.randint(1, max_copies)):
+            mirror = f"{content} Updated {rng.choice(MONTHS)} {rng.randint(1, 28)}."
+            records.append({
+                "url": f"{record['url']}/mirror-{copy}", "content": mirror, "content_hash": content_hash(mirror),
+            })
+            clusters.append(i)
+    order = rng.sample(range(len(records)), len(records))
+    return [records[i] for i in order], [clusters[i] for i in order]
+
+
+def generate_catalog(rows, seed=0, recurring=0.0, start="2024-01-01", days=730):
+    """Calendar catalog DataFrame of ``rows`` scholarships due within ``days`` of ``start``.
+
+    A ``recurring`` fraction of the rows are monthly or yearly rules.
+    """
+    rng = np.random.default_rng(seed)
+    due = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, rows), unit="D")
+    kind = rng.random(rows)
+    return pd.DataFrame({
+        "Scholarship Name": [f"Scholarship {i}" for i in range(rows)],
+        "Date Due": due,
+        "Summary": [f"Amount: ${500 + i % 20 * 250:,}." for i in range(rows)],
+        "Recurrence": np.where(kind < recurring * 0.7, "monthly", np.where(kind < recurring, "yearly", "")),
+    })
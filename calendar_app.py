@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Calendar
+
+Automatically generated by Colab.
+
+Original file is located at
+    https://colab.research.google.com/drive/1VlGGRnsVYbNbdMLltot-v_T_SInijzjW
+"""
+
+import os
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+import calendar_index
+import metrics
+from calendar_index import MONTH_NAMES, EventIndex, render_month_html
+
+# Metrics file and endpoint from SCHOLARSHIP_METRICS_FILE / SCHOLARSHIP_METRICS_PORT, once per process
+metrics.init()
+
+# Columnar catalog file; seeded with the sample data below when it does not exist yet
+CATALOG_PATH = os.environ.get("SCHOLARSHIP_CATALOG", calendar_index.DEFAULT_CATALOG_PATH)
+
+# Sample dataframe for testing
+data = {
+    "Scholarship Name": [
+        "Kuru Footsteps to Your Future Scholarship",
+        "Alert1 Students for Seniors Scholarship",
+        "Blankstyle Scholarship Opportunity #1",
+        "Innovation In Education Scholarship",
+        "The Bert & Phyllis Lamb Prize in Political Science",
+        "New Beginnings Immigrant Scholarship",
+    ],
+    "Date Due": [
+        "2024-12-20",
+        "2025-01-10",
+        "2024-12-31",
+        "2024-10-15",
+        "2025-02-14",
+        "2024-10-18",
+    ],
+    "Summary": [
+        "Amount: $1,000. Deadline: December 20, 2024.",
+        "Amount: $500. Deadline: January 10, 2025.",
+        "Amount: $1,000. Deadline: December 31, 2024.",
+        "Amount: $500 each month. Deadline: 15th of each month.",
+        "This prize is awarded for excellence in Political Science. Deadline: February 14, 2025.",
+        "Supports immigrant students. Deadline: October 18, 2024.",
+    ],
+    # Recurring scholarships are stored once as a rule starting at their first Date Due
+    "Recurrence": ["", "", "", "monthly", "", ""],
+}
+
+# The catalog is rebuilt from the scraped pages by the Scholarship Finder (or `python deadlines.py`);
+# the sample data only seeds it when no catalog exists yet.
+def catalog_mtime():
+    if not os.path.exists(CATALOG_PATH):
+        df = pd.DataFrame(data)
+        df["Date Due"] = pd.to_datetime(df["Date Due"])
+        calendar_index.write_catalog(df, CATALOG_PATH)
+    return os.path.getmtime(CATALOG_PATH)
+
+
+# Load the catalog, sorted by due date, once per server process and catalog version
+# rather than on every rerun. Returns the one-off deadlines and the recurring rules separately.
+@st.cache_resource(max_entries=2)
+def load_catalog(mtime):
+    return calendar_index.split_recurring(calendar_index.load_catalog(CATALOG_PATH))
+
+
+# Filter the catalog with a binary search and index its events once per date range.
+# Recurring scholarships are listed once, dated by their next occurrence in the range.
+@st.cache_resource(max_entries=32)
+def get_filtered_events(min_date, max_date, mtime):
+    deadlines, rules = load_catalog(mtime)
+    filtered_df = calendar_index.filter_date_range(deadlines, min_date, max_date)
+    details_df = pd.concat([filtered_df, rules.active(min_date, max_date)])
+    details_df = details_df.sort_values("Date Due", kind="stable").reset_index(drop=True)
+    return details_df, EventIndex.build(filtered_df), rules
+
+
+# Initialize Streamlit app
+st.title("Scholarship Calendar")
+st.sidebar.header("Filter Scholarships")
+
+# Sidebar filters
+min_date = st.sidebar.date_input("Start Date", value=datetime(2024, 1, 1))
+max_date = st.sidebar.date_input("End Date", value=datetime(2025, 12, 31))
+
+# Filter DataFrame based on date; scholarships sharing a due date are all kept
+filtered_df, event_index, recurrence_rules = get_filtered_events(min_date, max_date, catalog_mtime())
+
+# Display the calendar
+st.subheader("Scholarship Due Dates")
+current_year, current_month = datetime.now().year, datetime.now().month
+
+# Allow users to change the displayed month
+selected_year = st.sidebar.selectbox("Select Year", range(2024, 2026), index=0)
+selected_month = st.sidebar.selectbox(
+    "Select Month",
+    MONTH_NAMES,
+    index=current_month - 1,
+)
+
+# Generate calendar for the selected month as one memoized HTML table;
+# recurring deadlines are expanded for this month only
+st.write(f"### {selected_month} {selected_year}")
+st.markdown(
+    render_month_html(
+        event_index,
+        selected_year,
+        MONTH_NAMES.index(selected_month) + 1,
+        recurrence_rules,
+        (min_date, max_date),
+    ),
+    unsafe_allow_html=True,
+)
+
+# Display the filtered scholarships
+st.subheader("Scholarship Details")
+if not filtered_df.empty:
+    st.write(filtered_df)
+else:
+    st.write("No scholarships available for the selected date range.")
+
+# Per-stage latency panel, shown only with ?debug=1 in the URL
+metrics.debug_panel()
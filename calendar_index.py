@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""Calendar Index
+
+Vectorized due-date index for the Scholarship Calendar.
+
+Scholarships are grouped by their normalized due date into per-day event
+lists, so several scholarships due on the same day are all kept. Days are
+stored sorted, which lets the grid renderer fetch one month's events with a
+single ``searchsorted`` slice instead of probing a dict for every cell.
+
+:func:`render_month_html` turns one month of the index into a single HTML
+table in one pass and is memoized per (index, year, month); callers keep one
+index object per filter, so the cache key covers the filter as well.
+
+The catalog itself lives in an uncompressed Feather (Arrow IPC) file kept
+sorted by ``Date Due``. It is memory-mapped and read with only the columns
+the calendar needs, and date-range filters are two binary searches that
+return a slice of the sorted frame instead of a full boolean mask.
+
+Recurring deadlines ("15th of each month") are kept as compact rules rather
+than materialized rows: a catalog row whose ``Recurrence`` is ``monthly`` or
+``yearly`` recurs on its ``Date Due`` day of month (and month, for yearly
+rules) from that date on. :class:`RecurrenceRules` stores them column-wise
+and expands occurrences only for the window being rendered, one vectorized
+pass per visible month, so the cost does not grow with the catalog's span.
+"""
+
+import calendar
+import html
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import files
+import metrics
+
+DEFAULT_CATALOG_PATH = "scholarship_catalog.feather"
+CATALOG_COLUMNS = ["Scholarship Name", "Date Due", "Summary", "Amount", "Recurrence"]
+RECURRENCES = ("monthly", "yearly")
+
+MONTH_NAMES = list(calendar.month_name)[1:]
+WEEKDAY_NAMES = list(calendar.day_abbr)
+
+
+def write_catalog(df, path=DEFAULT_CATALOG_PATH):
+    """Write ``df`` sorted by ``Date Due`` as an uncompressed, memory-mappable Feather file.
+
+    The refresh process rewrites the catalog while the calendar page may be
+    reading it, so the new file replaces the old one in one step.
+    """
+    df = df.sort_values("Date Due", kind="stable").reset_index(drop=True)
+    files.atomic_write(path, lambda partial: df.to_feather(partial, compression="uncompressed"))
+
+
+def load_catalog(path=DEFAULT_CATALOG_PATH, columns=CATALOG_COLUMNS):
+    """Memory-map the catalog at ``path``, reading only ``columns``.
+
+    Columns missing from older catalogs (such as ``Recurrence``) are skipped,
+    as are rows without a ``Date Due``, which sort to the end of the file.
+    """
+    with pa.memory_map(path) as source:
+        available = set(pa.ipc.open_file(source).schema.names)
+    table = feather.read_table(path, columns=[c for c in columns if c in available], memory_map=True)
+    df = table.to_pandas()
+    if df["Date Due"].hasnans:
+        df = df[df["Date Due"].notna()]
+    if not df["Date Due"].is_monotonic_increasing:
+        df = df.sort_values("Date Due", kind="stable").reset_index(drop=True)
+    return df
+
+
+def filter_date_range(df, start, end):
+    """Rows of a ``Date Due``-sorted catalog with ``start <= Date Due <= end``, as a slice."""
+    due = df["Date Due"].to_numpy()
+    lo = np.searchsorted(due, np.datetime64(pd.Timestamp(start)), side="left")
+    hi = np.searchsorted(due, np.datetime64(pd.Timestamp(end)), side="right")
+    return df.iloc[lo:hi]
+
+
+def _day(date):
+    return np.datetime64(pd.Timestamp(date).date(), "D")
+
+
+def _on_day(months, day):
+    """Day ``day`` of each month in ``months``, clamped to the month's last day."""
+    first = months.astype("datetime64[D]")
+    length = ((months + 1).astype("datetime64[D]") - first).astype(np.int64)
+    return first + (np.minimum(day, length) - 1)
+
+
+class RecurrenceRules:
+    """Recurring deadlines stored as rules, one entry per scholarship.
+
+    ``start`` is the first due date, ``day`` the day of month it recurs on
+    and ``month_of_year`` the month for yearly rules (0 for monthly ones).
+    Occurrences are never materialized beyond the window asked for.
+    """
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self.texts = event_texts(self.df).to_numpy(dtype=object)
+        self.start = self.df["Date Due"].to_numpy().astype("datetime64[D]")
+        months = self.start.astype("datetime64[M]")
+        self.day = (self.start - months.astype("datetime64[D]")).astype(np.int64) + 1
+        yearly = (self.df["Recurrence"].str.lower() == "yearly").to_numpy()
+        self.month_of_year = np.where(yearly, months.astype(np.int64) % 12 + 1, 0).astype(np.uint8)
+
+    def __len__(self):
+        return len(self.start)
+
+    def occurrences(self, start, end):
+        """``(rule positions, dates)`` of every occurrence with ``start <= date <= end``, by date."""
+        start, end = _day(start), _day(end)
+        ids, dates = [], []
+        for month in np.arange(start.astype("datetime64[M]"), end.astype("datetime64[M]") + 1):
+            date = _on_day(month, self.day)
+            recurs = (self.month_of_year == 0) | (self.month_of_year == month.astype(np.int64) % 12 + 1)
+            hits = np.flatnonzero(recurs & (date >= self.start) & (date >= start) & (date <= end))
+            hits = hits[np.argsort(date[hits], kind="stable")]
+            ids.append(hits)
+            dates.append(date[hits])
+        if not ids:
+            return np.array([], dtype=np.int64), np.array([], dtype="datetime64[D]")
+        return np.concatenate(ids), np.concatenate(dates)
+
+    def next_occurrence(self, after):
+        """First occurrence of every rule on or after ``after``."""
+        on_or_after = np.maximum(self.start, _day(after))
+        monthly = self.month_of_year == 0
+        months = np.where(
+            monthly,
+            on_or_after.astype("datetime64[M]"),
+            on_or_after.astype("datetime64[Y]").astype("datetime64[M]") + (self.month_of_year.astype(np.int64) - 1),
+        )
+        late = _on_day(months, self.day) < on_or_after
+        return _on_day(months + np.where(late, np.where(monthly, 1, 12), 0), self.day)
+
+    def active(self, start, end):
+        """Rules that fall due at least once in ``[start, end]``, dated by their next occurrence there."""
+        due = self.next_occurrence(start)
+        hits = np.flatnonzero(due <= _day(end))
+        df = self.df.iloc[hits].copy()
+        df["Date Due"] = pd.to_datetime(due[hits]).as_unit(df["Date Due"].dt.unit)
+        return df
+
+    def month(self, year, month, start=None, end=None):
+        """Map day-of-month to event lists for ``year``/``month``, clipped to ``[start, end]``."""
+        key = np.datetime64(f"{year:04d}-{month:02d}", "M")
+        lo, hi = key.astype("datetime64[D]"), (key + 1).astype("datetime64[D]") - 1
+        if start is not None:
+            lo = max(lo, _day(start))
+        if end is not None:
+            hi = min(hi, _day(end))
+        events = {}
+        if lo > hi:
+            return events
+        ids, dates = self.occurrences(lo, hi)
+        days = (dates - key.astype("datetime64[D]")).astype(np.int64) + 1
+        for day, i in zip(days.tolist(), ids.tolist()):
+            events.setdefault(day, []).append(self.texts[i])
+        return events
+
+
+def split_recurring(df):
+    """Split a catalog into its one-off deadlines and its :class:`RecurrenceRules`."""
+    if "Recurrence" not in df:
+        return df, RecurrenceRules(df.iloc[:0].assign(Recurrence=""))
+    recurring = df["Recurrence"].fillna("").str.lower().isin(RECURRENCES).to_numpy()
+    return df[~recurring], RecurrenceRules(df[recurring])
+
+
+def event_texts(df):
+    """One display string per scholarship: its name, then its summary."""
+    return df["Scholarship Name"] + "\n" + df["Summary"]
+
+
+@metrics.timed("calendar.build")
+def generate_calendar_events(df):
+    """Map each due date to the text of every scholarship due that day."""
+    if df.empty:
+        return {}
+    days = df["Date Due"].dt.normalize()
+    return event_texts(df).groupby(days, sort=True).agg("\n\n".join).to_dict()
+
+
+class EventIndex:
+    """Per-day event lists for a catalog, sorted by day.
+
+    ``days`` holds the distinct due dates (``datetime64[D]``) and
+    ``events[i]`` the display strings of everything due on ``days[i]``.
+    """
+
+    def __init__(self, days, events):
+        self.days = days
+        self.events = events
+        self.months = days.astype("datetime64[M]")
+
+    @classmethod
+    @metrics.timed("calendar.build")
+    def build(cls, df):
+        if df.empty:
+            return cls(np.array([], dtype="datetime64[D]"), np.array([], dtype=object))
+        grouped = event_texts(df).groupby(df["Date Due"].dt.normalize(), sort=True).agg(list)
+        return cls(grouped.index.values.astype("datetime64[D]"), grouped.to_numpy(dtype=object))
+
+    def __len__(self):
+        return len(self.days)
+
+    def day(self, date):
+        """Events due on ``date`` (anything ``np.datetime64`` accepts)."""
+        key = np.datetime64(pd.Timestamp(date).date(), "D")
+        i = np.searchsorted(self.days, key)
+        if i < len(self.days) and self.days[i] == key:
+            return self.events[i]
+        return []
+
+    def month(self, year, month):
+        """Map day-of-month to event lists for every day in ``year``/``month`` that has events."""
+        key = np.datetime64(f"{year:04d}-{month:02d}", "M")
+        lo = np.searchsorted(self.months, key, side="left")
+        hi = np.searchsorted(self.months, key, side="right")
+        days = (self.days[lo:hi] - self.months[lo:hi].astype("datetime64[D]")).astype(int) + 1
+        return dict(zip(days.tolist(), self.events[lo:hi]))
+
+
+def _event_html(event):
+    return "<div class='event'>" + html.escape(event).replace("\n", "<br>") + "</div>"
+
+
+@metrics.timed("calendar.render")
+@lru_cache(maxsize=128)
+def render_month_html(index, year, month, rules=None, window=None):
+    """HTML table for ``year``/``month`` with each day's events listed in its cell.
+
+    Occurrences of ``rules`` in that month, clipped to the ``(start, end)``
+    ``window``, are expanded here and listed after the one-off deadlines.
+    """
+    month_events = index.month(year, month)
+    if rules is not None and len(rules):
+        for day, events in rules.month(year, month, *(window or ())).items():
+            month_events[day] = [*month_events.get(day, []), *events]
+    rows = ["<tr>" + "".join(f"<th>{name}</th>" for name in WEEKDAY_NAMES) + "</tr>"]
+    for week in calendar.Calendar().monthdayscalendar(year, month):
+        cells = []
+        for day in week:
+            if day == 0:
+                cells.append("<td></td>")
+                continue
+            events = "".join(_event_html(event) for event in month_events.get(day, []))
+            cells.append(f"<td><b>{day}</b>{events}</td>")
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    return (
+        "<table class='scholarship-calendar' style='width:100%; table-layout:fixed; vertical-align:top'>"
+        + "".join(rows)
+        + "</table>"
+    )
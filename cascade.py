@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""Cascade
+
+Local first pass in front of the LLM matcher.
+
+A profile and a scholarship page are described by a few rule features. The
+profile side is read from the same query the LLM is given (the form's field
+values, without the field names). The features are:
+- how many of the profile's terms the page mentions, as a share and as a count
+- how many of them its opening sentence mentions
+- whether the page speaks to the profile's financial need or merit GPA
+- the page's length
+
+A logistic regression over those features, trained offline from logged LLM
+verdicts, estimates how likely the LLM is to say "Match". A pair is settled
+locally only when that estimate is at least ``agreement`` one way or the
+other: as a match at or above the model's ``high`` threshold (``agreement``),
+as a non-match at or below ``low`` (``1 - agreement``). The pairs in between
+go to the LLM. Training reports the share settled and their agreement with
+the logged verdicts on a held-out split.
+
+Given a log path, the cascade appends every verdict the LLM decides to a
+JSONL log: the profile's query, the page and the verdict. Unparseable replies
+are left out. Run ``python cascade.py`` to train a model from the log.
+Without a model file the cascade settles nothing and only logs.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+import files
+import llm_batch
+import metrics
+import retrieval
+from retrieval import tokenize
+
+DEFAULT_MODEL_PATH = "cascade_model.json"
+DEFAULT_LOG_PATH = "llm_verdicts.jsonl"
+DEFAULT_AGREEMENT = 0.98  # estimated chance a local decision agrees with the LLM, at least
+DEFAULT_HOLDOUT = 0.25
+TRAIN_STEPS = 500
+LEARNING_RATE = 0.5
+L2 = 1e-3
+
+FEATURES = ["shared", "shared_count", "lead", "need", "merit", "length"]
+MAX_SHARED = 8  # shared terms beyond this count no further
+# Field names of the app's user query, and the answers to its yes/no field
+QUERY_LABELS = frozenset(["gpa", "major", "financial", "need", "scholarship", "type", "causes", "yes", "no"])
+NEED_RE = re.compile(r"financial need:\s*yes", re.I)
+GPA_RE = re.compile(r"gpa:\s*(\d+(?:\.\d+)?)", re.I)
+NEED_TERMS = frozenset(["need", "financial"])
+MERIT_TERMS = frozenset(["merit", "academic"])
+LEAD_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def profile_terms(user_query):
+    """The terms of the user query's field values."""
+    return set(tokenize(user_query)) - QUERY_LABELS
+
+
+def features(user_query, content):
+    """Feature vector of one profile's user query and a page, in ``FEATURES`` order."""
+    terms = profile_terms(user_query)
+    page_tokens = tokenize(content)
+    page_terms = set(page_tokens)
+    lead_terms = set(tokenize(LEAD_RE.split(content, 1)[0]))
+    shared = len(terms & page_terms)
+    gpa = GPA_RE.search(user_query)
+    merit = gpa is not None and float(gpa.group(1)) >= retrieval.MERIT_GPA
+    return np.array([
+        shared / max(len(terms), 1),
+        min(shared, MAX_SHARED) / MAX_SHARED,
+        len(terms & lead_terms) / max(len(terms), 1),
+        float(bool(NEED_RE.search(user_query)) and bool(page_terms & NEED_TERMS)),
+        float(merit and bool(page_terms & MERIT_TERMS)),
+        math.log1p(len(page_tokens)) / 10,
+    ])
+
+
+@dataclass
+class CascadeModel:
+    """Standardized logistic regression over ``FEATURES`` with its two decision thresholds."""
+
+    weights: np.ndarray
+    bias: float
+    mean: np.ndarray
+    scale: np.ndarray
+    low: float
+    high: float
+    trained_on: int = 0
+
+    def probability(self, x):
+        """Estimated probability that the LLM says "Match", for one feature vector or a matrix of them."""
+        return 1.0 / (1.0 + np.exp(-(((x - self.mean) / self.scale) @ self.weights + self.bias)))
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        """Write the model to ``path`` as JSON, replacing any previous model in one step."""
+        def write(partial):
+            with open(partial, "w", encoding="utf-8") as f:
+                json.dump({
+                    "features": FEATURES,
+                    "weights": self.weights.tolist(),
+                    "bias": self.bias,
+                    "mean": self.mean.tolist(),
+                    "scale": self.scale.tolist(),
+                    "low": self.low,
+                    "high": self.high,
+                    "trained_on": self.trained_on,
+                }, f, indent=2)
+
+        files.atomic_write(path, write)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data["features"] != FEATURES:
+            raise ValueError(f"{path} was trained on different features")
+        return cls(
+            weights=np.asarray(data["weights"]),
+            bias=float(data["bias"]),
+            mean=np.asarray(data["mean"]),
+            scale=np.asarray(data["scale"]),
+            low=float(data["low"]),
+            high=float(data["high"]),
+            trained_on=int(data["trained_on"]),
+        )
+
+
+class Cascade:
+    """Settles confident pairs with a :class:`CascadeModel` and logs the verdicts the LLM decides.
+
+    The model is read from ``model_path`` and read again by :meth:`reload`
+    when the file changes. ``settled`` and ``deferred`` count the pairs
+    decided locally and those left to the LLM.
+    """
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, log_path=None):
+        self.model_path = model_path
+        self.log_path = log_path
+        self.model = None
+        self.settled = 0
+        self.deferred = 0
+        self._mtime = None
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Read the model file again if it changed; a missing or unreadable one disables the cascade."""
+        try:
+            mtime = os.path.getmtime(self.model_path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        try:
+            self.model = CascadeModel.load(self.model_path)
+        except (OSError, KeyError, ValueError):
+            self.model = None
+        self._mtime = mtime
+
+    def decide(self, user_query, scholarship):
+        """A local verdict for this user query and scholarship, or ``None`` to ask the LLM."""
+        model = self.model
+        if model is None:
+            return None
+        probability = model.probability(features(user_query, scholarship["content"]))
+        if probability >= model.high:
+            shared = sorted(profile_terms(user_query).intersection(tokenize(scholarship["content"])))
+            verdict = f"Match - mentions {', '.join(shared[:3])}"
+        elif probability <= model.low:
+            verdict = "No Match - too little in common with the profile"
+        else:
+            with self._lock:
+                self.deferred += 1
+            return None
+        with self._lock:
+            self.settled += 1
+        metrics.count("llm_calls_avoided")
+        return verdict
+
+    def record(self, user_query, scholarship, verdict):
+        """Append a verdict the LLM decided to the log, if there is one."""
+        if self.log_path is None or verdict == llm_batch.UNPARSEABLE:
+            return
+        line = json.dumps({
+            "user_query": user_query,
+            "url": scholarship["url"],
+            "content": scholarship["content"],
+            "verdict": verdict,
+        })
+        with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def read_log(path=DEFAULT_LOG_PATH):
+    """``(user_query, content, is_match)`` for each logged verdict, the last one per query and page."""
+    latest = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            latest[entry["user_query"], entry["url"]] = (
+                entry["user_query"], entry["content"], llm_batch.is_match(entry["verdict"])
+            )
+    return list(latest.values())
+
+
+def fit(x, y, steps=TRAIN_STEPS, learning_rate=LEARNING_RATE, l2=L2):
+    """Logistic regression by full-batch gradient descent; returns ``(weights, bias, mean, scale)``."""
+    mean = x.mean(axis=0)
+    scale = x.std(axis=0)
+    scale[scale == 0] = 1.0
+    z = (x - mean) / scale
+    weights, bias = np.zeros(x.shape[1]), 0.0
+    for _ in range(steps):
+        error = 1.0 / (1.0 + np.exp(-(z @ weights + bias))) - y
+        weights -= learning_rate * (z.T @ error / len(y) + l2 * weights)
+        bias -= learning_rate * error.mean()
+    return weights, bias, mean, scale
+
+
+def evaluate(model, x, y):
+    """``(share settled locally, agreement of local decisions, overall agreement)`` on labeled pairs."""
+    probabilities = model.probability(x)
+    settled = (probabilities >= model.high) | (probabilities <= model.low)
+    agreed = (probabilities >= model.high) == y
+    local = float(np.mean(agreed[settled])) if settled.any() else 1.0
+    # Pairs left to the LLM get the LLM's verdict, which agrees by definition.
+    return float(np.mean(settled)), local, float(np.mean(agreed | ~settled))
+
+
+def train(pairs, agreement=DEFAULT_AGREEMENT, holdout=DEFAULT_HOLDOUT, seed=0):
+    """Train on ``(user_query, content, is_match)`` pairs; returns the model and its held-out evaluation."""
+    pairs = list(pairs)
+    random.Random(seed).shuffle(pairs)
+    x = np.array([features(user_query, content) for user_query, content, _ in pairs])
+    y = np.array([matched for _, _, matched in pairs], dtype=bool)
+    split = len(pairs) - max(int(len(pairs) * holdout), 1)
+    weights, bias, mean, scale = fit(x[:split], y[:split])
+    model = CascadeModel(weights, bias, mean, scale, low=1.0 - agreement, high=agreement, trained_on=split)
+    return model, evaluate(model, x[split:], y[split:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("log", nargs="?", default=DEFAULT_LOG_PATH, help="JSONL log of LLM verdicts")
+    parser.add_argument("-o", "--output", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--agreement", type=float, default=DEFAULT_AGREEMENT,
+                        help="settle a pair locally only when the model is at least this sure either way")
+    parser.add_argument("--holdout", type=float, default=DEFAULT_HOLDOUT, help="share of pairs held out")
+    args = parser.parse_args()
+
+    pairs = read_log(args.log)
+    if len(pairs) < 2:
+        parser.error(f"{args.log} has {len(pairs)} logged verdicts; at least 2 are needed")
+    model, (settled, local, overall) = train(pairs, args.agreement, args.holdout)
+    model.save(args.output)
+    print(f"{len(pairs)} logged verdicts, {model.trained_on} for training; "
+          f"thresholds: no match <= {model.low:.3f}, match >= {model.high:.3f}")
+    print(f"held out: {settled:.1%} settled locally, {local:.1%} of those agree with the LLM, "
+          f"{overall:.1%} overall")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""Corpus Store
+
+Persistent, versioned on-disk store for scraped scholarship pages.
+
+The ``{"url", "content"}`` records produced by the scraper are kept in SQLite
+together with their fetch timestamp and a content hash, so the app can load
+the corpus in milliseconds instead of re-scraping on every Streamlit rerun.
+The corpus is refreshed only when its TTL has expired, when the URL list
+changes, or when a refresh is explicitly requested.
+
+Refreshes are incremental: each page's ETag, Last-Modified and raw body hash
+are stored and sent back as conditional requests. Pages answered with 304, or
+whose body hash is unchanged, are not re-parsed and keep their content hash,
+so nothing keyed on that hash downstream has to be recomputed. A store
+whose pages were parsed by an older extractor (see
+``extraction.EXTRACTOR_VERSION``) drops those validators when it is opened,
+so its next refresh re-parses every page.
+"""
+
+import hashlib
+import sqlite3
+import time
+from dataclasses import dataclass, field
+
+import extraction
+import metrics
+import scraper
+
+DEFAULT_DB_PATH = "scholarship_corpus.sqlite3"
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+SCHEMA_VERSION = 2
+
+# Statements that bring a store up to each schema version, applied in order.
+MIGRATIONS = {
+    2: [
+        "ALTER TABLE pages ADD COLUMN etag TEXT",
+        "ALTER TABLE pages ADD COLUMN last_modified TEXT",
+        "ALTER TABLE pages ADD COLUMN body_hash TEXT",
+    ],
+}
+
+
+def content_hash(content):
+    """Return the SHA-256 hex digest identifying a page's content."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def url_list_hash(urls):
+    """Order-independent digest of a URL list."""
+    return content_hash("\n".join(sorted(set(urls))))
+
+
+@dataclass
+class RefreshStats:
+    """What a refresh cost and what it changed."""
+
+    pages_requested: int = 0
+    bytes_transferred: int = 0
+    not_modified: int = 0
+    unchanged: int = 0
+    reparsed: int = 0
+    failed: int = 0
+    changed_urls: list = field(default_factory=list)
+
+    def summary(self):
+        return (
+            f"{self.pages_requested} pages requested, {self.bytes_transferred / 1024:.1f} KB transferred, "
+            f"{self.not_modified} not modified, {self.unchanged} unchanged, "
+            f"{self.reparsed} re-parsed, {self.failed} failed"
+        )
+
+
+class CorpusStore:
+    """SQLite-backed store of scraped pages.
+
+    Every refresh that changes at least one page bumps the corpus version,
+    which downstream caches can use to notice that the corpus changed.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        self._migrate()
+        self._check_extractor()
+        self.last_refresh = None
+
+    def _migrate(self):
+        # A fresh database starts from the version 1 tables above.
+        stored_version = int(self._get_meta("schema_version") or 1)
+        if stored_version > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"{self.path} has corpus schema version {stored_version}, expected {SCHEMA_VERSION}"
+            )
+        with self.conn:
+            for version in range(stored_version + 1, SCHEMA_VERSION + 1):
+                for statement in MIGRATIONS[version]:
+                    self.conn.execute(statement)
+            self._set_meta("schema_version", SCHEMA_VERSION)
+
+    def _check_extractor(self):
+        if self._get_meta("extractor_version") == str(extraction.EXTRACTOR_VERSION):
+            return
+        # Stored content came from another extractor: forget the validators so no page is
+        # skipped as unchanged, and mark the corpus stale so the next load refreshes it.
+        with self.conn:
+            self.conn.execute("UPDATE pages SET etag = NULL, last_modified = NULL, body_hash = NULL")
+            self.conn.execute("DELETE FROM meta WHERE key = 'refreshed_at'")
+            self._set_meta("extractor_version", extraction.EXTRACTOR_VERSION)
+
+    def _get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value))
+        )
+
+    @property
+    def version(self):
+        return int(self._get_meta("corpus_version") or 0)
+
+    @property
+    def refreshed_at(self):
+        value = self._get_meta("refreshed_at")
+        return float(value) if value is not None else None
+
+    def is_stale(self, ttl=DEFAULT_TTL, now=None):
+        """True if the corpus has never been refreshed or is older than ``ttl`` seconds."""
+        refreshed_at = self.refreshed_at
+        if refreshed_at is None:
+            return True
+        return (now or time.time()) - refreshed_at > ttl
+
+    def covers(self, urls):
+        """True if the last refresh scraped exactly this URL list."""
+        return self._get_meta("url_list_hash") == url_list_hash(urls)
+
+    def load(self, urls=None):
+        """Return stored records, in ``urls`` order when given (unknown URLs are skipped)."""
+        rows = self.conn.execute("SELECT url, content, content_hash, fetched_at FROM pages")
+        records = {
+            url: {"url": url, "content": content, "content_hash": digest, "fetched_at": fetched_at}
+            for url, content, digest, fetched_at in rows
+        }
+        if urls is None:
+            return list(records.values())
+        return [records[url] for url in urls if url in records]
+
+    def validators(self):
+        """Map each stored URL to its ``(etag, last_modified, body_hash)``."""
+        rows = self.conn.execute("SELECT url, etag, last_modified, body_hash FROM pages")
+        return {url: (etag, last_modified, body_hash) for url, etag, last_modified, body_hash in rows}
+
+    def save(self, records, fetched_at=None, urls=None):
+        """Upsert scraped records, bumping the corpus version if there are any.
+
+        ``urls`` is the list that was scraped; pages that failed to download
+        are absent from ``records`` but still count as covered. Records may
+        carry ``etag``, ``last_modified`` and ``body_hash`` for revalidation.
+        """
+        fetched_at = fetched_at or time.time()
+        with self.conn:
+            self._upsert(records, fetched_at)
+            self._mark_refreshed(fetched_at, urls)
+
+    def add(self, records, fetched_at=None):
+        """Upsert records like :meth:`save`, without counting as a refresh of the URL list.
+
+        For pages found outside a refresh, such as by the crawler; the TTL
+        still runs from the last refresh.
+        """
+        with self.conn:
+            self._upsert(records, fetched_at or time.time())
+
+    def _upsert(self, records, fetched_at):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO pages "
+            "(url, content, content_hash, fetched_at, etag, last_modified, body_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    record["url"], record["content"], content_hash(record["content"]), fetched_at,
+                    record.get("etag"), record.get("last_modified"), record.get("body_hash"),
+                )
+                for record in records
+            ],
+        )
+        if records:
+            self._set_meta("corpus_version", self.version + 1)
+
+    def touch(self, revalidated, fetched_at=None):
+        """Record that pages were revalidated without their content changing.
+
+        ``revalidated`` holds ``(url, etag, last_modified)`` tuples; missing
+        validators keep their stored value.
+        """
+        fetched_at = fetched_at or time.time()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE pages SET fetched_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                [(fetched_at, etag, last_modified, url) for url, etag, last_modified in revalidated],
+            )
+
+    def _mark_refreshed(self, fetched_at, urls):
+        self._set_meta("refreshed_at", fetched_at)
+        if urls is not None:
+            self._set_meta("url_list_hash", url_list_hash(urls))
+
+    def close(self):
+        self.conn.close()
+
+
+@metrics.timed("scrape")
+def refresh_corpus(urls, store, fetch=scraper.fetch_all, **fetch_options):
+    """Revalidate ``urls`` with conditional requests and re-parse only pages that changed."""
+    validators = store.validators()
+    stats = RefreshStats(pages_requested=len(urls))
+
+    def headers_for(url):
+        etag, last_modified, _ = validators.get(url, (None, None, None))
+        return scraper.conditional_headers(etag, last_modified)
+
+    changed, revalidated = [], []
+    for url, response in fetch(urls, headers_for=headers_for, **fetch_options):
+        if response is None or response.status_code not in (200, 304):
+            stats.failed += 1
+            continue
+        stats.bytes_transferred += len(response.content)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code == 304:
+            stats.not_modified += 1
+            revalidated.append((url, etag, last_modified))
+            continue
+        body_hash = content_hash(response.content)
+        if url in validators and validators[url][2] == body_hash:
+            stats.unchanged += 1
+            revalidated.append((url, etag, last_modified))
+            continue
+        stats.reparsed += 1
+        stats.changed_urls.append(url)
+        changed.append({
+            "url": url,
+            "content": scraper.parse_page(response.text),
+            "etag": etag,
+            "last_modified": last_modified,
+            "body_hash": body_hash,
+        })
+
+    fetched_at = time.time()
+    store.touch(revalidated, fetched_at=fetched_at)
+    store.save(changed, fetched_at=fetched_at, urls=urls)
+    store.last_refresh = stats
+    return stats
+
+
+def load_corpus(urls, store=None, ttl=DEFAULT_TTL, force=False, **fetch_options):
+    """Load the corpus for ``urls``, refreshing only when it is stale, the URL list changed or ``force`` is set."""
+    store = store or CorpusStore()
+    if force or store.is_stale(ttl) or not store.covers(urls):
+        refresh_corpus(urls, store, **fetch_options)
+    return store.load(urls)
@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+"""Crawler
+
+Polite breadth-first crawler that grows the scholarship URL list from seed
+pages, built on the fetch engine in ``scraper.py``.
+
+Discovered links are normalized (scheme and host case, default ports,
+fragments, tracking parameters, query order) and checked against a hash set
+of 64-bit URL digests before they join the frontier, so each page is queued
+once. ``robots.txt`` is honoured per host, including ``Crawl-delay``, and
+requests to a host are spaced at least ``1 / host_rate`` seconds apart on top
+of the scraper's per-host concurrency limit. Links are followed up to
+``max_depth`` hops from a seed and only within the allowed domains (by
+default, the seeds' hosts).
+
+The frontier and every visited page are checkpointed to SQLite after each
+batch, so an interrupted crawl resumes where it stopped. Fetched pages are
+parsed like scraped ones and can be added to a
+:class:`corpus_store.CorpusStore` without resetting its TTL, so the app's
+pages are still revalidated on schedule; :func:`load_crawled_urls` returns
+what a crawl found, for the app's URL list.
+
+Usage: python crawler.py SEED_URL ... [--max-depth 2] [--max-pages 50000] [--rate 1.0]
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+from bs4.exceptions import ParserRejectedMarkup
+
+import corpus_store
+import metrics
+import scraper
+
+DEFAULT_STATE_PATH = "crawl_state.sqlite3"
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_HOST_RATE = 1.0  # requests per second to any one host
+DEFAULT_BATCH_SIZE = 64  # pages fetched between checkpoints
+USER_AGENT = "ScholarshipRecommenderBot/1.0"
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAM_RE = re.compile(r"^(?:utm_\w+|fbclid|gclid|msclkid|mc_cid|mc_eid|_ga|_gl)$", re.I)
+SKIPPED_EXTENSIONS = (
+    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".zip", ".jpg", ".jpeg", ".png", ".gif",
+    ".svg", ".mp3", ".mp4", ".mov", ".css", ".js", ".ics", ".xml",
+)
+
+# pages.status for visits that did not produce an HTTP status.
+FAILED = 0
+BLOCKED = -1  # disallowed by robots.txt
+NOT_HTML = -2
+
+
+def normalize_url(url, base=None):
+    """Canonical form of ``url`` (resolved against ``base``), or ``None`` if it is not a crawlable http(s) URL."""
+    url = urljoin(base, url.strip()) if base else url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if scheme not in DEFAULT_PORTS or not host:
+        return None
+    if ":" in host:
+        host = f"[{host}]"
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAM_RE.match(key)
+    ))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def url_key(url):
+    """64-bit digest of a normalized URL, as kept in the seen set."""
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+class LinkParser(HTMLParser):
+    """Collects ``<a href>`` targets, honouring ``<base>``, ``rel=nofollow`` and ``<meta name=robots>``."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.base = None
+        self.hrefs = []
+        self.nofollow = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "a" and attrs.get("href"):
+            if "nofollow" not in (attrs.get("rel") or "").lower():
+                self.hrefs.append(attrs["href"])
+        elif tag == "base" and attrs.get("href") and self.base is None:
+            self.base = attrs["href"]
+        elif tag == "meta" and (attrs.get("name") or "").lower() == "robots":
+            self.nofollow = "nofollow" in (attrs.get("content") or "").lower()
+
+
+def extract_links(html, page_url):
+    """Normalized, de-duplicated links on a page, in document order."""
+    parser = LinkParser()
+    parser.feed(html)
+    parser.close()
+    if parser.nofollow:
+        return []
+    base = urljoin(page_url, parser.base) if parser.base else page_url
+    links = {}
+    for href in parser.hrefs:
+        link = normalize_url(href, base)
+        if link and not urlsplit(link).path.lower().endswith(SKIPPED_EXTENSIONS):
+            links.setdefault(link, None)
+    return list(links)
+
+
+class RobotsCache:
+    """Fetches and caches one ``robots.txt`` per host.
+
+    As in :meth:`RobotFileParser.read`, 401/403 disallows the whole host,
+    other 4xx allow it, and an unreachable file or a 5xx disallows it.
+    ``Crawl-delay`` is read as :class:`RobotFileParser` does, in whole seconds.
+    """
+
+    def __init__(self, session, user_agent=USER_AGENT, timeout=scraper.DEFAULT_TIMEOUT):
+        self.session = session
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self._parsers = {}
+        self._lock = threading.Lock()
+        self._host_locks = {}
+
+    def _parser(self, url):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        parser = self._parsers.get(origin)
+        if parser is not None:
+            return parser
+        with self._lock:
+            host_lock = self._host_locks.setdefault(origin, threading.Lock())
+        with host_lock:
+            if origin not in self._parsers:
+                self._parsers[origin] = self._fetch(origin)
+        return self._parsers[origin]
+
+    def _fetch(self, origin):
+        parser = RobotFileParser(origin + "/robots.txt")
+        try:
+            response = self.session.get(parser.url, timeout=self.timeout, headers={"User-Agent": self.user_agent})
+        except requests.RequestException:
+            response = None
+        if response is None or response.status_code >= 500:
+            parser.disallow_all = True
+        elif response.status_code in (401, 403):
+            parser.disallow_all = True
+        elif response.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(response.text.splitlines())
+        parser.modified()
+        return parser
+
+    def allowed(self, url):
+        return self._parser(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        return self._parser(url).crawl_delay(self.user_agent) or 0.0
+
+
+class HostPacer:
+    """Spaces requests to each host at least ``interval`` seconds apart across threads."""
+
+    def __init__(self, rate=DEFAULT_HOST_RATE):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = {}
+
+    def wait(self, url, min_interval=0.0):
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, 0.0))
+            self._next[host] = start + max(self.interval, float(min_interval))
+        if start > now:
+            time.sleep(start - now)
+
+
+@dataclass
+class CrawlStats:
+    """What one :meth:`Crawler.run` did."""
+
+    fetched: int = 0
+    failed: int = 0
+    not_html: int = 0
+    robots_blocked: int = 0
+    queued: int = 0
+    duplicate_links: int = 0
+    off_domain: int = 0
+    frontier: int = 0  # still queued when the run stopped
+
+    def summary(self):
+        return (
+            f"{self.fetched} pages fetched, {self.failed} failed, {self.not_html} not HTML, "
+            f"{self.robots_blocked} blocked by robots.txt; {self.queued} links queued, "
+            f"{self.duplicate_links} already seen, {self.off_domain} off-domain; "
+            f"{self.frontier} left in the frontier"
+        )
+
+
+class CrawlState:
+    """SQLite checkpoint of a crawl: the frontier in queue order and every visited page."""
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                depth INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                depth INTEGER NOT NULL,
+                status INTEGER NOT NULL,
+                visited_at REAL NOT NULL
+            );
+            """
+        )
+
+    def load(self):
+        """``(frontier, seen, fetched)``: the queued ``(url, depth)`` pairs, the seen URL keys and the pages fetched."""
+        frontier = deque(self.conn.execute("SELECT url, depth FROM frontier ORDER BY seq"))
+        seen = {url_key(url) for url, _ in frontier}
+        seen.update(url_key(url) for (url,) in self.conn.execute("SELECT url FROM pages"))
+        fetched = self.conn.execute("SELECT COUNT(*) FROM pages WHERE status = 200").fetchone()[0]
+        return frontier, seen, fetched
+
+    def checkpoint(self, visited, queued):
+        """Move ``visited`` ``(url, depth, status)`` from the frontier to the pages, and queue ``(url, depth)``."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany("DELETE FROM frontier WHERE url = ?", [(url,) for url, _, _ in visited])
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pages (url, depth, status, visited_at) VALUES (?, ?, ?, ?)",
+                [(url, depth, status, now) for url, depth, status in visited],
+            )
+            self.conn.executemany("INSERT OR IGNORE INTO frontier (url, depth) VALUES (?, ?)", queued)
+
+    def crawled_urls(self):
+        """URLs of the HTML pages fetched so far, in crawl order."""
+        rows = self.conn.execute("SELECT url FROM pages WHERE status = 200 ORDER BY visited_at, rowid")
+        return [url for (url,) in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+def load_crawled_urls(path=DEFAULT_STATE_PATH):
+    """URLs a crawl checkpointed at ``path`` fetched; empty if there is no such crawl."""
+    if not os.path.exists(path):
+        return []
+    state = CrawlState(path)
+    try:
+        return state.crawled_urls()
+    finally:
+        state.close()
+
+
+class Crawler:
+    """Breadth-first crawl from ``seeds``, resumable from the checkpoint at ``state_path``.
+
+    ``allowed_domains`` defaults to the seeds' hosts; subdomains of an
+    allowed domain are allowed too. ``max_pages`` caps the pages fetched
+    over the whole crawl, including earlier runs of the same checkpoint.
+    """
+
+    def __init__(self, seeds, state_path=DEFAULT_STATE_PATH, max_depth=DEFAULT_MAX_DEPTH, max_pages=None,
+                 allowed_domains=None, host_rate=DEFAULT_HOST_RATE, batch_size=DEFAULT_BATCH_SIZE,
+                 max_workers=scraper.DEFAULT_MAX_WORKERS, per_host=scraper.DEFAULT_PER_HOST,
+                 timeout=scraper.DEFAULT_TIMEOUT, retries=scraper.DEFAULT_RETRIES, backoff=scraper.DEFAULT_BACKOFF,
+                 user_agent=USER_AGENT, session=None):
+        self.seeds = [url for url in map(normalize_url, seeds) if url]
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.allowed_domains = {
+            domain.lower() for domain in (allowed_domains or [urlsplit(url).hostname for url in self.seeds])
+        }
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.headers = {"User-Agent": user_agent}
+        self.own_session = session is None
+        self.session = session or scraper.make_session(max_workers)
+        self.limiter = scraper.HostLimiter(per_host)
+        self.pacer = HostPacer(host_rate)
+        self.robots = RobotsCache(self.session, user_agent, timeout)
+        self.state = CrawlState(state_path)
+
+    def in_domain(self, url):
+        host = urlsplit(url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in self.allowed_domains)
+
+    def _visit(self, url, depth):
+        """Fetch one page; returns ``(status, record, links)``."""
+        if not self.robots.allowed(url):
+            return BLOCKED, None, []
+        self.pacer.wait(url, self.robots.crawl_delay(url))
+        try:
+            return self._read(url, depth)
+        except (requests.RequestException, ParserRejectedMarkup, ValueError):
+            # A page that cannot be fetched or parsed is recorded as failed, so it leaves
+            # the frontier instead of aborting (and on resume, re-aborting) the crawl.
+            return FAILED, None, []
+
+    def _read(self, url, depth):
+        response = scraper.fetch(self.session, url, self.limiter, self.timeout, self.retries, self.backoff,
+                                 headers=self.headers)
+        if response is None:
+            return FAILED, None, []
+        if response.status_code != 200:
+            return response.status_code, None, []
+        if "html" not in response.headers.get("Content-Type", "text/html").lower():
+            return NOT_HTML, None, []
+        html = response.text
+        record = {
+            "url": url,
+            "content": scraper.parse_page(html),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body_hash": corpus_store.content_hash(response.content),
+        }
+        # Links on pages at the depth limit would never be followed.
+        links = extract_links(html, response.url) if depth < self.max_depth else []
+        return 200, record, links
+
+    @metrics.timed("crawl")
+    def run(self, store=None):
+        """Crawl until the frontier is empty or ``max_pages`` is reached, saving pages into ``store`` if given."""
+        frontier, seen, fetched = self.state.load()
+        stats = CrawlStats()
+        seeds = [(url, 0) for url in self.seeds if url_key(url) not in seen]
+        seen.update(url_key(url) for url, _ in seeds)
+        frontier.extend(seeds)
+        self.state.checkpoint([], seeds)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while frontier and (self.max_pages is None or fetched < self.max_pages):
+                size = self.batch_size if self.max_pages is None else min(self.batch_size, self.max_pages - fetched)
+                batch = [frontier.popleft() for _ in range(min(size, len(frontier)))]
+                outcomes = pool.map(lambda item: self._visit(*item), batch)
+                visited, queued, records = [], [], []
+                for (url, depth), (status, record, links) in zip(batch, outcomes):
+                    visited.append((url, depth, status))
+                    if record is not None:
+                        records.append(record)
+                    fetched += status == 200
+                    stats.fetched += status == 200
+                    stats.robots_blocked += status == BLOCKED
+                    stats.not_html += status == NOT_HTML
+                    stats.failed += status not in (200, BLOCKED, NOT_HTML)
+                    for link in links:
+                        key = url_key(link)
+                        if key in seen:
+                            stats.duplicate_links += 1
+                        elif not self.in_domain(link):
+                            stats.off_domain += 1
+                        else:
+                            seen.add(key)
+                            queued.append((link, depth + 1))
+                frontier.extend(queued)
+                stats.queued += len(queued)
+                if store is not None and records:
+                    store.add(records)
+                self.state.checkpoint(visited, queued)
+        stats.frontier = len(frontier)
+        return stats
+
+    def close(self):
+        self.state.close()
+        if self.own_session:
+            self.session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("seeds", nargs="+", help="seed URLs, e.g. scholarship index pages")
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH)
+    parser.add_argument("--max-pages", type=int, help="stop after this many pages (across resumed runs)")
+    parser.add_argument("--domain", action="append", dest="domains",
+                        help="allowed domain, repeatable (default: the seeds' hosts)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_HOST_RATE, help="requests per second per host")
+    parser.add_argument("--workers", type=int, default=scraper.DEFAULT_MAX_WORKERS)
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="checkpoint file; rerun to resume")
+    parser.add_argument("--store", default=corpus_store.DEFAULT_DB_PATH, help="corpus store to save pages into")
+    args = parser.parse_args()
+
+    crawler = Crawler(args.seeds, args.state, args.max_depth, args.max_pages, args.domains, args.rate,
+                      max_workers=args.workers)
+    store = corpus_store.CorpusStore(args.store)
+    try:
+        print(crawler.run(store).summary())
+    finally:
+        crawler.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
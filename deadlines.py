@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""Deadlines
+
+Turns scraped scholarship pages into rows of the calendar catalog.
+
+Each page's main-content text is scanned with precompiled patterns: the
+scholarship name near the top of the page, the largest dollar amount, and
+the first date following a deadline phrase ("Deadline", "due", "apply by").
+Full dates become one-off deadlines; "15th of each month" becomes a monthly
+rule and a date without a year ("March 1") a yearly one, both starting at
+the next occurrence after the page was fetched.
+
+Extraction is incremental. Catalog rows carry the page URL and content hash,
+and rows whose page hash is unchanged are reused from the previous catalog
+instead of being extracted again. Pages without a recognisable deadline are
+kept with an empty ``Date Due`` so they are not re-extracted either; the
+calendar skips them when it loads the catalog.
+
+Run ``python deadlines.py`` to rebuild the catalog from the corpus store.
+"""
+
+import calendar
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from urllib.parse import urlsplit
+
+import pandas as pd
+import pyarrow.feather as feather
+
+import calendar_index
+from corpus_store import content_hash
+
+COLUMNS = ["Scholarship Name", "Date Due", "Summary", "Amount", "Recurrence", "URL", "Content Hash"]
+DEADLINE_WINDOW = 120  # characters after a deadline phrase searched for its date
+NAME_WINDOW = 300  # characters at the top of the page searched for the name
+
+_MONTH = (r"(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+          r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)")
+MONTH_NUMBERS = {name.lower(): number for number, name in enumerate(calendar.month_abbr) if name}
+
+DEADLINE_CONTEXT_RE = re.compile(
+    r"\bdeadlines?\b|\bdue\b|\bapply by\b|\bsubmit(?:ted)? by\b|\bcloses?\b|\baccepted (?:until|through)\b",
+    re.I,
+)
+# (kind, pattern) in priority order for matches starting at the same position.
+DATE_PATTERNS = [
+    ("mdy", re.compile(rf"\b{_MONTH}\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b", re.I)),
+    ("dmy", re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH}\.?,?\s+(\d{{4}})\b", re.I)),
+    ("iso", re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")),
+    ("numeric", re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4}|\d{2})\b")),
+    ("monthly", re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)\s+(?:day\s+)?of\s+(?:each|every|the)\s+month\b", re.I)),
+    ("md", re.compile(rf"\b{_MONTH}\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?\b", re.I)),
+]
+AMOUNT_RE = re.compile(r"\$\s?(\d{1,3}(?:,\d{3})+|\d+)(?:\.\d{2})?(?:\s?(k|million)\b)?", re.I)
+# Capitalised words, plus the short connectors names use ("Footsteps to Your Future", "Bert & Phyllis").
+NAME_RE = re.compile(
+    r"\b([A-Z][\w'-]*\s+(?:(?:[A-Z][\w'-]*|&|and|of|the|to|for|in|on)\s+){0,8}"
+    r"(?:Scholarship|Award|Grant|Prize|Fellowship)s?\b"
+    r"(?:\s+(?:in|for|of)\s+[A-Z][\w'-]*(?:\s+[A-Z][\w'-]*){0,3})?)"
+)
+
+
+@dataclass
+class ExtractionStats:
+    """How much of a catalog build was reused from the previous catalog."""
+
+    pages: int = 0
+    reused: int = 0
+    extracted: int = 0
+    dated: int = 0
+    seconds: float = 0.0
+
+    def summary(self):
+        return (
+            f"{self.pages} pages, {self.reused} reused, {self.extracted} extracted, "
+            f"{self.dated} with a deadline, {self.seconds:.2f}s"
+        )
+
+
+def _month_number(name):
+    return MONTH_NUMBERS[name[:3].lower()]
+
+
+def _on_or_after(today, month, day):
+    """Next date on ``month``/``day`` (clamped to the month's length) not before ``today``."""
+    for year in (today.year, today.year + 1):
+        candidate = date(year, month, min(day, calendar.monthrange(year, month)[1]))
+        if candidate >= today:
+            return candidate
+    return candidate
+
+
+def _parse_date(kind, match, today):
+    """``(date, recurrence)`` for a date pattern match, or ``None`` if it is not a valid date."""
+    groups = match.groups()
+    try:
+        if kind == "mdy":
+            return date(int(groups[2]), _month_number(groups[0]), int(groups[1])), ""
+        if kind == "dmy":
+            return date(int(groups[2]), _month_number(groups[1]), int(groups[0])), ""
+        if kind == "iso":
+            return date(int(groups[0]), int(groups[1]), int(groups[2])), ""
+        if kind == "numeric":
+            year = int(groups[2]) + (2000 if len(groups[2]) == 2 else 0)
+            return date(year, int(groups[0]), int(groups[1])), ""
+        if kind == "monthly":
+            day = int(groups[0])
+            if not 1 <= day <= 31:
+                return None
+            for ahead in (0, 1):
+                year, month = divmod(today.year * 12 + today.month - 1 + ahead, 12)
+                due = date(year, month + 1, min(day, calendar.monthrange(year, month + 1)[1]))
+                if due >= today:
+                    return due, "monthly"
+        if kind == "md":
+            month, day = _month_number(groups[0]), int(groups[1])
+            if not 1 <= day <= 31:
+                return None
+            return _on_or_after(today, month, day), "yearly"
+    except ValueError:
+        return None
+    return None
+
+
+def find_deadline(content, today):
+    """``(date, recurrence, text)`` of the first date after a deadline phrase, or ``None``."""
+    for context in DEADLINE_CONTEXT_RE.finditer(content):
+        window = content[context.end():context.end() + DEADLINE_WINDOW]
+        best = None
+        for priority, (kind, pattern) in enumerate(DATE_PATTERNS):
+            match = pattern.search(window)
+            if match and (best is None or (match.start(), priority) < best[0]):
+                parsed = _parse_date(kind, match, today)
+                if parsed:
+                    best = ((match.start(), priority), parsed, match.group(0))
+        if best:
+            (due, recurrence), text = best[1:]
+            return due, recurrence, text
+    return None
+
+
+def find_amount(content):
+    """Largest dollar amount mentioned in ``content``, or ``None``."""
+    amounts = []
+    for match in AMOUNT_RE.finditer(content):
+        value = float(match.group(1).replace(",", ""))
+        scale = (match.group(2) or "").lower()
+        amounts.append(value * (1000 if scale == "k" else 1_000_000 if scale == "million" else 1))
+    return max(amounts) if amounts else None
+
+
+def find_name(content, url):
+    """Scholarship name from the top of the page, else from the last meaningful URL path segment."""
+    match = NAME_RE.search(content[:NAME_WINDOW])
+    if match:
+        return match.group(1).strip()
+    segments = [s for s in urlsplit(url).path.split("/") if s and not s.isdigit()]
+    slug = segments[-1] if segments else urlsplit(url).netloc
+    return re.sub(r"[-_]+", " ", slug).strip().title()
+
+
+def extract_deadline(record, today=None):
+    """One catalog row for a ``{"url", "content"}`` record."""
+    content = record["content"]
+    if today is None:
+        fetched_at = record.get("fetched_at")
+        today = datetime.fromtimestamp(fetched_at).date() if fetched_at else date.today()
+    deadline = find_deadline(content, today)
+    amount = find_amount(content)
+    summary = []
+    if amount is not None:
+        summary.append(f"Amount: ${amount:,.0f}.")
+    if deadline is not None:
+        summary.append(f"Deadline: {deadline[2]}.")
+    return {
+        "Scholarship Name": find_name(content, record["url"]),
+        "Date Due": pd.Timestamp(deadline[0]) if deadline else pd.NaT,
+        "Summary": " ".join(summary),
+        "Amount": amount if amount is not None else float("nan"),
+        "Recurrence": deadline[1] if deadline else "",
+        "URL": record["url"],
+        "Content Hash": record.get("content_hash") or content_hash(content),
+    }
+
+
+def build_catalog(records, previous=None, today=None):
+    """Catalog rows for ``records``, reusing rows of ``previous`` whose page hash is unchanged.
+
+    Returns ``(DataFrame, ExtractionStats)``.
+    """
+    start = time.perf_counter()
+    known = {}
+    if previous is not None and set(COLUMNS) <= set(previous.columns):
+        for row in previous[COLUMNS].to_dict("records"):
+            known[(row["URL"], row["Content Hash"])] = row
+    stats = ExtractionStats(pages=len(records))
+    rows = []
+    for record in records:
+        row = known.get((record["url"], record.get("content_hash") or content_hash(record["content"])))
+        if row is None:
+            row = extract_deadline(record, today)
+            stats.extracted += 1
+        else:
+            stats.reused += 1
+        rows.append(row)
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df["Date Due"] = pd.to_datetime(df["Date Due"])
+    df["Amount"] = df["Amount"].astype(float)
+    stats.dated = int(df["Date Due"].notna().sum())
+    stats.seconds = time.perf_counter() - start
+    return df, stats
+
+
+def update_catalog(records, path=calendar_index.DEFAULT_CATALOG_PATH, today=None):
+    """Rebuild the catalog at ``path`` from ``records``, extracting only changed pages."""
+    previous = feather.read_table(path, memory_map=True).to_pandas() if os.path.exists(path) else None
+    df, stats = build_catalog(records, previous, today)
+    calendar_index.write_catalog(df, path)
+    return stats
+
+
+if __name__ == "__main__":
+    import corpus_store
+
+    store = corpus_store.CorpusStore()
+    path = os.environ.get("SCHOLARSHIP_CATALOG", calendar_index.DEFAULT_CATALOG_PATH)
+    print(update_catalog(store.load(), path).summary())
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Dedup
+
+Near-duplicate detection for scraped scholarship pages.
+
+Sibling pages of one site (the SCU financial-aid pages, for instance) often
+repeat most of each other's text. Each page's content is reduced to the set
+of its word 5-grams (shingles) and summarised by a MinHash signature, whose
+agreement rate between two pages estimates the Jaccard similarity of their
+shingle sets. Signatures are cut into bands and hashed into buckets
+(locality-sensitive hashing), so only pages sharing a bucket are ever
+compared and the whole pass stays close to linear in the number of pages.
+Candidate pairs above the similarity threshold are merged into clusters, and
+the first record of each cluster in input order is kept as its canonical
+record.
+"""
+
+from dataclasses import dataclass, field
+from itertools import chain
+
+import numpy as np
+
+import metrics
+from retrieval import tokenize
+
+DEFAULT_THRESHOLD = 0.8  # estimated Jaccard similarity above which pages are duplicates
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 16  # 16 bands of 8 rows: pairs near 0.8 similarity collide in some band ~90% of the time
+DEFAULT_SHINGLE = 5  # words per shingle
+CHUNK_SHINGLES = 1 << 15  # shingles hashed per numpy step while computing signatures
+
+SHINGLE_MULT = np.uint64(0x9E3779B97F4A7C15)
+MAX_HASH = np.uint32(0xFFFFFFFF)
+
+
+@dataclass
+class DedupResult:
+    """Canonical records and the near-duplicates folded into each of them."""
+
+    records: list
+    duplicates: dict = field(default_factory=dict)  # canonical url -> duplicate urls, in input order
+    labels: np.ndarray = None  # per input record, the index of its canonical record
+
+    @property
+    def removed(self):
+        return sum(len(urls) for urls in self.duplicates.values())
+
+
+def shingle_hashes(texts, k=DEFAULT_SHINGLE):
+    """Distinct 64-bit hashes of the ``k``-word shingles of every text.
+
+    Returns ``(hashes, counts)``: the hashes of all texts concatenated in
+    order, sorted within each text, and how many belong to each text. A text
+    shorter than ``k`` words is one shingle; an empty text has none.
+    """
+    vocab = {}
+    # Token ids start at 1 so the zero padding past a text's end never matches a token.
+    token_ids = [[vocab.setdefault(token, len(vocab) + 1) for token in tokenize(text)] for text in texts]
+    lengths = np.fromiter(map(len, token_ids), dtype=np.int64, count=len(token_ids))
+    ids = np.fromiter(chain.from_iterable(token_ids), dtype=np.uint64, count=int(lengths.sum()))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    doc = np.repeat(np.arange(len(lengths)), lengths)
+    positions = np.arange(len(ids))
+    end = ends[doc]
+    padded = np.concatenate([ids, np.zeros(k, dtype=np.uint64)])
+    hashes = np.zeros(len(ids), dtype=np.uint64)
+    for offset in range(k):
+        tokens = np.where(positions + offset < end, padded[positions + offset], np.uint64(0))
+        hashes = hashes * SHINGLE_MULT + tokens
+    valid = (positions + k <= end) | ((positions == starts[doc]) & (lengths[doc] < k))
+    doc, hashes = doc[valid], hashes[valid]
+    order = np.lexsort((hashes, doc))
+    doc, hashes = doc[order], hashes[order]
+    distinct = np.ones(len(hashes), dtype=bool)
+    distinct[1:] = (doc[1:] != doc[:-1]) | (hashes[1:] != hashes[:-1])
+    return hashes[distinct], np.bincount(doc[distinct], minlength=len(lengths))
+
+
+class MinHasher:
+    """``num_perm`` seeded multiply-shift hash functions, ``((a * x + b) mod 2**64) >> 32``."""
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = (rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) | np.uint64(1))[:, None]  # odd
+        self.b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)[:, None]
+        self.num_perm = num_perm
+
+    def signatures(self, hashes, counts):
+        """``(len(counts), num_perm)`` uint32 signatures of the shingle sets laid out as
+        :func:`shingle_hashes` returns them; texts without shingles get all-``MAX_HASH`` rows.
+        """
+        out = np.full((len(counts), self.num_perm), MAX_HASH, dtype=np.uint32)
+        docs = np.flatnonzero(counts)
+        ends = np.cumsum(counts[docs])
+        start = 0
+        while start < len(docs):
+            first = ends[start - 1] if start else 0
+            # At least one text per step, then as many as fit in CHUNK_SHINGLES.
+            end = max(start + 1, int(np.searchsorted(ends, first + CHUNK_SHINGLES, side="right")))
+            values = hashes[first:ends[end - 1]]
+            offsets = np.concatenate([[0], ends[start:end - 1] - first])
+            # The shift is monotonic, so it can be applied after taking the minimum.
+            minima = np.minimum.reduceat(self.a * values + self.b, offsets, axis=1)
+            out[docs[start:end]] = (minima >> np.uint64(32)).T
+            start = end
+        return out
+
+
+def _band_buckets(signatures, bands):
+    """Yield arrays of row indices that share a bucket in some band."""
+    rows = signatures.shape[1] // bands
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = np.zeros(len(block), dtype=np.uint64)
+        for column in block.T:
+            keys = keys * SHINGLE_MULT + column
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        same = sorted_keys[1:] == sorted_keys[:-1]
+        shared = np.zeros(len(keys), dtype=bool)
+        shared[1:] |= same
+        shared[:-1] |= same
+        if not shared.any():
+            continue
+        order, sorted_keys = order[shared], sorted_keys[shared]
+        for members in np.split(order, np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1):
+            yield np.sort(members)
+
+
+@metrics.timed("dedup")
+def deduplicate(records, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS,
+                shingle=DEFAULT_SHINGLE):
+    """Cluster near-duplicate ``{"url", "content"}`` records and keep one per cluster."""
+    hashes, counts = shingle_hashes([record["content"] for record in records], shingle)
+    signatures = MinHasher(num_perm).signatures(hashes, counts)
+    has_text = counts > 0
+
+    parent = list(range(len(records)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    min_agreeing = threshold * num_perm
+    for members in _band_buckets(signatures, bands):
+        representatives = []
+        for i in members.tolist():
+            if not has_text[i]:
+                continue
+            root = find(i)
+            for rep in representatives:
+                rep_root = find(rep)
+                if rep_root == root:
+                    break
+                if np.count_nonzero(signatures[i] == signatures[rep]) >= min_agreeing:
+                    # The lower index becomes the root, so the canonical record is the first one.
+                    parent[max(root, rep_root)] = min(root, rep_root)
+                    break
+            else:
+                representatives.append(i)
+
+    labels = np.array(parent, dtype=np.int64)
+    while True:  # point every record straight at its root
+        roots = labels[labels]
+        if np.array_equal(roots, labels):
+            break
+        labels = roots
+    duplicates = {}
+    for i in np.flatnonzero(labels != np.arange(len(records))):
+        duplicates.setdefault(records[labels[i]]["url"], []).append(records[i]["url"])
+    kept = [record for i, record in enumerate(records) if labels[i] == i]
+    return DedupResult(records=kept, duplicates=duplicates, labels=labels)
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""Eligibility
+
+Deterministic eligibility filter that runs before ranking or LLM matching.
+
+Each scholarship's hard criteria (minimum GPA, allowed school years, state
+restrictions, need-based flag, disability requirement and age bounds) are
+pulled out of its text with regular expressions. The criteria are then laid
+out column-wise: minimum GPAs as a sorted array searched with
+``np.searchsorted``, school years and states as bitsets, ages as bound
+arrays. Filtering a profile is a handful of vectorized comparisons, a few
+milliseconds for 100k scholarships.
+"""
+
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+SCHOOL_YEARS = [
+    "High School Senior", "College Freshman", "Sophomore", "Junior", "Senior", "Graduate Student",
+]
+# (keywords, pattern) per school year; the regex only runs when a keyword is in the text.
+SCHOOL_YEAR_PATTERNS = [
+    (("senior",), re.compile(r"\bhigh[- ]school seniors?\b", re.I)),
+    (("fresh", "first"), re.compile(
+        r"\b(?:college |incoming |first[- ]year )?freshm[ae]n\b|\bfirst[- ]year students?\b", re.I
+    )),
+    (("sophomore",), re.compile(r"\bsophomores?\b", re.I)),
+    (("junior",), re.compile(r"\bjuniors?\b", re.I)),
+    (("senior",), re.compile(r"(?<!high school )(?<!high-school )\b(?:college |university )?seniors\b", re.I)),
+    (("graduate",), re.compile(r"\bgraduate (?:students?|programs?|studies)\b", re.I)),
+]
+
+STATES = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
+    "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "District of Columbia": "DC",
+    "Florida": "FL", "Georgia": "GA", "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL", "Indiana": "IN",
+    "Iowa": "IA", "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
+    "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS", "Missouri": "MO",
+    "Montana": "MT", "Nebraska": "NE", "Nevada": "NV", "New Hampshire": "NH", "New Jersey": "NJ",
+    "New Mexico": "NM", "New York": "NY", "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH",
+    "Oklahoma": "OK", "Oregon": "OR", "Pennsylvania": "PA", "Rhode Island": "RI",
+    "South Carolina": "SC", "South Dakota": "SD", "Tennessee": "TN", "Texas": "TX", "Utah": "UT",
+    "Vermont": "VT", "Virginia": "VA", "Washington": "WA", "West Virginia": "WV", "Wisconsin": "WI",
+    "Wyoming": "WY",
+}
+STATE_LOOKUP = {**{name.lower(): code for name, code in STATES.items()},
+                **{code.lower(): code for code in STATES.values()}}
+STATE_CODES = sorted(set(STATES.values()))
+STATE_BITS = {code: 1 << i for i, code in enumerate(STATE_CODES)}
+
+_STATE_NAMES = "|".join(sorted(map(re.escape, STATES), key=len, reverse=True))
+_STATE_LIST = rf"(?:{_STATE_NAMES})(?:\s*,\s*(?:and\s+|or\s+)?(?:{_STATE_NAMES})|\s+(?:and|or)\s+(?:{_STATE_NAMES}))*"
+# "Non-California residents" and "not residents of Texas" are not restrictions.
+STATE_RESTRICTION_RE = re.compile(
+    rf"(?<![Nn]on)(?<![Nn]on-)(?<!not )"
+    rf"(?:residents? of|resid(?:e|ing) in|live in|legal residents? of) (?:the states? of )?({_STATE_LIST})"
+    rf"|(?<![Nn]on-)(?<![Nn]on )\b({_STATE_LIST}) residents?\b",
+)
+STATE_NAME_RE = re.compile(_STATE_NAMES)
+# A clause that only prefers some states, or opens the award to all of them, restricts nothing.
+STATE_PREFERENCE_RE = re.compile(r"\bpriority\b|\bprefer(?:red|ence)?\b|\ball (?:50 )?states\b|\bany state\b", re.I)
+CLAUSE_END_RE = re.compile(r"[.;!?]")
+MIN_GPA_RE = re.compile(
+    r"(?:minimum|cumulative|at least an?|at least)\s+(?:cumulative\s+)?(?:unweighted\s+)?GPA\s+(?:of\s+)?"
+    r"(?:at least\s+)?([0-4]\.\d{1,2})"
+    r"|GPA\s+of\s+(?:at least\s+)?([0-4]\.\d{1,2})"
+    r"|([0-4]\.\d{1,2})\s+(?:cumulative\s+)?GPA\s+or\s+(?:higher|above|better)",
+    re.I,
+)
+NEED_RE = re.compile(r"\bfinancial need\b|\bneed[- ]based\b|\bdemonstrated? need\b|\bPell[- ]eligible\b", re.I)
+DISABILITY_RE = re.compile(r"\bstudents? with (?:a )?(?:physical )?disabilit(?:y|ies)\b", re.I)
+# An age is a limit only with a direction word: "at age 65" or "age 24" alone bounds nothing, and a bare
+# "under NN" is not an age ("under 20 pages", "under 34 CFR 690"). Each pattern is one kind of bound.
+MIN_AGE_RE = re.compile(
+    r"\bat least\s+(\d{2})\s+years?\s+(?:of age|old)\b"
+    r"|\b(?:at least age|minimum age (?:of|is)|no younger than)\s+(\d{2})\b"
+    r"|\b(?:aged?\s+(\d{2})|(\d{2})\s+years?\s+(?:of age|old))\s+(?:or|and)\s+(?:older|over|above)\b(?!\s+(?:the\s+)?age|\s+\d)"
+    r"|\b(\d{2})\s+or\s+older\b",
+    re.I,
+)
+OVER_AGE_RE = re.compile(r"\b(?:over the age of|older than)\s+(\d{2})\b", re.I)
+MAX_AGE_RE = re.compile(
+    r"\b(?:no older than|maximum age (?:of|is))\s+(\d{2})\b"
+    r"|\b(?:aged?\s+(\d{2})|(\d{2})\s+years?\s+(?:of age|old))\s+(?:or|and)\s+(?:younger|under|below)\b(?!\s+(?:the\s+)?age|\s+\d)"
+    r"|\b(\d{2})\s+(?:or|and)\s+younger\b",
+    re.I,
+)
+UNDER_AGE_RE = re.compile(
+    r"\b(?:under the age of|under age|younger than)\s+(\d{2})\b"
+    r"|\bunder\s+(\d{2})\s+years?\s+(?:of age|old)\b"
+    r"|\bage[ds]?\s+under\s+(\d{2})\b",
+    re.I,
+)
+AGE_RANGE_RE = re.compile(r"\b(?:ages?|aged)\s+(\d{2})\s*(?:-|–|to|through)\s*(\d{2})\b", re.I)
+
+NO_MIN_GPA = 0.0
+NO_MIN_AGE = 0
+NO_MAX_AGE = 255
+
+
+@dataclass
+class Eligibility:
+    """Hard criteria for one scholarship; defaults mean "no restriction"."""
+
+    min_gpa: float = NO_MIN_GPA
+    school_years: int = 0  # bitset over SCHOOL_YEARS, 0 = any year
+    states: int = 0  # bitset over STATE_CODES, 0 = any state
+    need_based: bool = False
+    requires_disability: bool = False
+    min_age: int = NO_MIN_AGE
+    max_age: int = NO_MAX_AGE
+
+
+def extract_eligibility(content):
+    """Pull an :class:`Eligibility` out of a scholarship's text.
+
+    Cheap substring checks on the lower-cased text gate each regex, since most
+    pages mention only a few of the criteria.
+    """
+    criteria = Eligibility()
+    lower = content.lower()
+    if "gpa" in lower:
+        gpas = [float(next(g for g in match.groups() if g)) for match in MIN_GPA_RE.finditer(content)]
+        if gpas:
+            criteria.min_gpa = min(gpas)
+    for bit, (keywords, pattern) in enumerate(SCHOOL_YEAR_PATTERNS):
+        if any(keyword in lower for keyword in keywords) and pattern.search(content):
+            criteria.school_years |= 1 << bit
+    if "resid" in lower or "live in" in lower:
+        for match in STATE_RESTRICTION_RE.finditer(content):
+            if not STATE_PREFERENCE_RE.search(_clause(content, match)):
+                for name in STATE_NAME_RE.findall(match.group(1) or match.group(2)):
+                    criteria.states |= STATE_BITS[STATES[name]]
+    criteria.need_based = ("need" in lower or "pell" in lower) and bool(NEED_RE.search(content))
+    criteria.requires_disability = "disabilit" in lower and bool(DISABILITY_RE.search(content))
+    # Only a prefilter: "page" or "average" passes it, and the patterns below then find no limit.
+    if not ("age" in lower or "old" in lower or "under" in lower or "younger" in lower):
+        return criteria
+    age_range = AGE_RANGE_RE.search(content)
+    if age_range:
+        criteria.min_age, criteria.max_age = int(age_range.group(1)), int(age_range.group(2))
+        return criteria
+    min_age, over = MIN_AGE_RE.search(content), OVER_AGE_RE.search(content)
+    if min_age:
+        criteria.min_age = _bound(min_age)
+    elif over:
+        criteria.min_age = _bound(over) + 1
+    max_age, under = MAX_AGE_RE.search(content), UNDER_AGE_RE.search(content)
+    if max_age:
+        criteria.max_age = _bound(max_age)
+    elif under:
+        criteria.max_age = _bound(under) - 1
+    return criteria
+
+
+def _bound(match):
+    return int(next(group for group in match.groups() if group))
+
+
+def _clause(content, match):
+    """The sentence or ``;``-separated clause around ``match``."""
+    start = max(content.rfind(mark, 0, match.start()) for mark in ".;!?") + 1
+    end = CLAUSE_END_RE.search(content, match.end())
+    return content[start:end.start() if end else len(content)]
+
+
+def state_bit(residence_state):
+    """Bit for a free-text state ("California", "ca"), or 0 if unrecognised."""
+    code = STATE_LOOKUP.get(re.sub(r"\s+", " ", residence_state).strip().lower())
+    return STATE_BITS.get(code, 0)
+
+
+class EligibilityIndex:
+    """Column-wise eligibility criteria for a list of scholarships.
+
+    :meth:`filter` returns a boolean mask aligned with the list the index
+    was built from.
+    """
+
+    def __init__(self, criteria):
+        n = len(criteria)
+        self.min_gpa = np.fromiter((c.min_gpa for c in criteria), dtype=np.float32, count=n)
+        min_gpa = self.min_gpa
+        # Sorted GPA floors: every scholarship a student's GPA clears is a prefix of gpa_order.
+        self.gpa_order = np.argsort(min_gpa, kind="stable")
+        self.sorted_min_gpa = min_gpa[self.gpa_order]
+        self.school_years = np.fromiter((c.school_years for c in criteria), dtype=np.uint8, count=n)
+        self.states = np.fromiter((c.states for c in criteria), dtype=np.uint64, count=n)
+        self.need_based = np.fromiter((c.need_based for c in criteria), dtype=bool, count=n)
+        self.requires_disability = np.fromiter((c.requires_disability for c in criteria), dtype=bool, count=n)
+        self.min_age = np.fromiter((c.min_age for c in criteria), dtype=np.uint8, count=n)
+        self.max_age = np.fromiter((c.max_age for c in criteria), dtype=np.uint8, count=n)
+
+    def __len__(self):
+        return len(self.gpa_order)
+
+    @classmethod
+    def build(cls, scholarships):
+        return cls([extract_eligibility(scholarship["content"]) for scholarship in scholarships])
+
+    def filter(self, age, gpa, school_year, residence_state, financial_need, physical_disabilities,
+               doc_ids=None):
+        """Mask of scholarships whose hard criteria this profile satisfies.
+
+        Arguments are the raw values collected by the profile form. With
+        ``doc_ids``, only those scholarships are checked and the mask is
+        aligned with ``doc_ids``.
+        """
+        # Small epsilon so a 3.0 slider value clears a "3.0" floor despite float32 rounding.
+        gpa_bound = np.float32(gpa + 1e-4)
+        if doc_ids is None:
+            rows = slice(None)
+            eligible = np.zeros(len(self), dtype=bool)
+            eligible[self.gpa_order[:np.searchsorted(self.sorted_min_gpa, gpa_bound, side="right")]] = True
+        else:
+            rows = np.asarray(doc_ids)
+            eligible = self.min_gpa[rows] <= gpa_bound
+
+        school_years = self.school_years[rows]
+        year_bit = np.uint8(1 << SCHOOL_YEARS.index(school_year)) if school_year in SCHOOL_YEARS else 0
+        eligible &= (school_years == 0) | ((school_years & year_bit) != 0)
+
+        # An unrecognised or blank state can't be checked, so state restrictions are not applied.
+        state = state_bit(residence_state or "")
+        if state:
+            states = self.states[rows]
+            eligible &= (states == 0) | ((states & np.uint64(state)) != 0)
+
+        if financial_need != "Yes":
+            eligible &= ~self.need_based[rows]
+        if physical_disabilities != "Yes":
+            eligible &= ~self.requires_disability[rows]
+
+        age = min(max(int(age), 0), NO_MAX_AGE)
+        eligible &= (self.min_age[rows] <= age) & (self.max_age[rows] >= age)
+        return eligible
+
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Event Store
+
+Date-bucketed, SQLite-backed store for the session calendar.
+
+Events are kept in memory in one bucket per day, each bucket sorted by start
+time, with the days themselves in a sorted list. Looking up a day is a dict
+access and a date-range query is two binary searches over the days, so a
+date click no longer rescans every event. Every event is also a row in
+SQLite, so events survive session and server restarts; adding events only
+inserts their own rows, in a single transaction for a bulk add.
+
+Each store holds one owner's events: the app opens one per visitor, so
+visitors sharing the database file never see each other's calendars.
+"""
+
+import bisect
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+DEFAULT_DB_PATH = "calendar_events.sqlite3"
+DEFAULT_DURATION = timedelta(hours=1)
+DEFAULT_OWNER = ""  # events saved before stores had owners belong to this one
+
+
+def _start_key(event):
+    return event["start"]
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+class EventStore:
+    """One owner's calendar events bucketed by day, persisted to SQLite.
+
+    Events are dicts with ``id``, ``title``, ``start`` and ``end``
+    (``datetime``); :meth:`calendar_events` gives the ISO-string form the
+    calendar component expects.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, owner=DEFAULT_OWNER):
+        self.owner = owner
+        self._lock = threading.Lock()
+        self._by_day = {}
+        self._days = []
+        self._day_of = {}  # event id -> day bucket
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY,
+                    owner TEXT NOT NULL DEFAULT '',
+                    title TEXT NOT NULL,
+                    start TEXT NOT NULL,
+                    "end" TEXT NOT NULL
+                );
+                """
+            )
+            # Files from before stores had owners get the column, their events the default owner.
+            if "owner" not in {row[1] for row in self.conn.execute("PRAGMA table_info(events)")}:
+                self.conn.execute("ALTER TABLE events ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS events_owner ON events (owner, start)")
+        rows = self.conn.execute(
+            'SELECT id, title, start, "end" FROM events WHERE owner = ? ORDER BY start', (owner,)
+        ).fetchall()
+        for event_id, title, start, end in rows:
+            event = {"id": event_id, "title": title, "start": datetime.fromisoformat(start),
+                     "end": datetime.fromisoformat(end)}
+            self._bucket(event["start"].date()).append(event)
+            self._day_of[event_id] = event["start"].date()
+
+    def __len__(self):
+        return len(self._day_of)
+
+    def _bucket(self, day):
+        events = self._by_day.get(day)
+        if events is None:
+            events = self._by_day[day] = []
+            bisect.insort(self._days, day)
+        return events
+
+    def add(self, title, start, end=None):
+        """Add one event; ``end`` defaults to an hour after ``start``, even across midnight."""
+        return self.add_many([(title, start, end)])[0]
+
+    def add_many(self, events):
+        """Add ``(title, start[, end])`` events in one transaction and return them."""
+        with self._lock:
+            added = []
+            # SQLite assigns the ids, so stores in other threads or processes sharing the file never collide.
+            with self.conn:
+                for title, start, *end in events:
+                    end = end[0] if end and end[0] is not None else start + DEFAULT_DURATION
+                    cursor = self.conn.execute(
+                        'INSERT INTO events (owner, title, start, "end") VALUES (?, ?, ?, ?)',
+                        (self.owner, title, start.isoformat(), end.isoformat()),
+                    )
+                    added.append({"id": cursor.lastrowid, "title": title, "start": start, "end": end})
+            touched = {}
+            for event in added:
+                day = self._day_of[event["id"]] = event["start"].date()
+                touched.setdefault(day, []).append(event)
+            for day, new_events in touched.items():
+                bucket = self._bucket(day)
+                bucket.extend(new_events)
+                bucket.sort(key=_start_key)
+        return added
+
+    def remove(self, event_id):
+        """Delete an event by id; returns whether it existed."""
+        with self._lock:
+            day = self._day_of.pop(event_id, None)
+            if day is None:
+                return False
+            with self.conn:
+                self.conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+            events = self._by_day[day]
+            events[:] = [event for event in events if event["id"] != event_id]
+            if not events:
+                del self._by_day[day]
+                del self._days[bisect.bisect_left(self._days, day)]
+            return True
+
+    def day(self, day):
+        """Events starting on ``day`` (a ``date`` or ``datetime``), by start time."""
+        return list(self._by_day.get(_as_date(day), []))
+
+    def range(self, start=None, end=None):
+        """Events starting on days ``start`` through ``end`` inclusive, by start time.
+
+        Either bound may be ``None`` for an open-ended range.
+        """
+        with self._lock:
+            lo = 0 if start is None else bisect.bisect_left(self._days, _as_date(start))
+            hi = len(self._days) if end is None else bisect.bisect_right(self._days, _as_date(end))
+            return [event for day in self._days[lo:hi] for event in self._by_day[day]]
+
+    def calendar_events(self, start=None, end=None):
+        """:meth:`range` with ISO-formatted times, as the calendar component expects."""
+        return [
+            {"title": event["title"], "start": event["start"].isoformat(), "end": event["end"].isoformat()}
+            for event in self.range(start, end)
+        ]
+
+    def close(self):
+        self.conn.close()
+
+
+def event_start(event_date, event_time):
+    """Combine the sidebar's date and time inputs into a start ``datetime``."""
+    return datetime.combine(event_date, event_time.replace(second=0, microsecond=0))
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Extraction
+
+Main-content extraction for scraped scholarship pages.
+
+Instead of joining every ``<p>`` on the page, boilerplate (navigation,
+headers, footers, cookie banners, scripts, forms) is removed first, the main
+content container is located, and text is collected from paragraphs, list
+items and table rows. Each heading leads the text of its section.
+
+Stored pages record the ``EXTRACTOR_VERSION`` they were parsed with; bump it
+whenever the extracted text changes, so existing corpus stores re-parse
+their pages on the next refresh.
+
+``lxml`` is used as the parser backend when it is installed, falling back to
+the standard library ``html.parser``.
+"""
+
+import re
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+EXTRACTOR_VERSION = 2  # 1 was joining every <p>
+
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside", "form",
+                    "iframe", "button"]
+# Matched against each class, the id and the role on their own: a token is boilerplate when it
+# is one of these words, starts with one ("nav-links") or ends with one ("site-footer").
+# Modifier tokens such as "has-sidebar" describe a layout, not boilerplate.
+BOILERPLATE_WORDS = (r"cookies?|consent|banner|breadcrumbs?|nav|navbar|navigation|menu|footer|header|sidebar"
+                     r"|social|share|sharing|newsletter|skip(?:link)?")
+BOILERPLATE_TOKEN_RE = re.compile(
+    rf"^(?!(?:has|with|no|is)[-_])(?:(?:{BOILERPLATE_WORDS})(?:[-_][a-z0-9]+)*|[a-z0-9]+(?:[-_][a-z0-9]+)*[-_](?:{BOILERPLATE_WORDS}))$",
+    re.I,
+)
+MAIN_SELECTORS = ["main", "article", "[role=main]", "#main-content", "#content", ".content"]
+# Table rows are read whole so a "Deadline" header cell stays next to its date.
+TEXT_TAGS = ["h1", "h2", "h3", "h4", "p", "li", "tr", "td", "th", "dd", "dt"]
+HEADING_TAGS = {"h1", "h2", "h3", "h4"}
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _is_boilerplate(tag):
+    if tag.attrs is None:
+        return False
+    tokens = [tag.get("id") or "", *(tag.get("class") or []), tag.get("role") or ""]
+    return any(BOILERPLATE_TOKEN_RE.match(token) for token in tokens if token)
+
+
+def _main_container(soup):
+    for selector in MAIN_SELECTORS:
+        container = soup.select_one(selector)
+        if container is not None and container.get_text(strip=True):
+            return container
+    return soup.body or soup
+
+
+def extract_main_content(html):
+    """Main-content text of ``html``, the replacement for joining every ``<p>``."""
+    soup = BeautifulSoup(html, PARSER)
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    container = _main_container(soup)
+    # The main container and the wrappers around it are kept whatever their classes say.
+    keep = {id(container), *(id(parent) for parent in container.parents)}
+    for tag in soup.find_all(_is_boilerplate):
+        if tag.decomposed or id(tag) in keep or tag.name in ("html", "body", "main", "article"):
+            continue
+        tag.decompose()
+
+    section = {"heading": "", "text": []}
+    sections = [section]
+    seen = set()
+    for tag in container.find_all(TEXT_TAGS):
+        # Nested text tags (a <p> inside an <li>) would otherwise be read twice.
+        if tag.find_parent(TEXT_TAGS) is not None:
+            continue
+        text = WHITESPACE_RE.sub(" ", tag.get_text(" ")).strip()
+        if not text or text in seen:
+            continue
+        seen.add(text)
+        if tag.name in HEADING_TAGS:
+            section = {"heading": text, "text": []}
+            sections.append(section)
+            continue
+        section["text"].append(text)
+
+    return " ".join(
+        f"{s['heading']}. {' '.join(s['text'])}" if s["heading"] else " ".join(s["text"])
+        for s in sections if s["text"]
+    )
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Files
+
+Atomic file replacement for the artifacts one process writes and another
+reads: the calendar catalog, the segment table and the cascade model.
+
+:func:`atomic_write` writes beside the target and renames the result over
+it, so a reader (possibly in another process) opens either the old file or
+the new one, never a half-written one.
+"""
+
+import os
+
+
+def atomic_write(path, write):
+    """Call ``write(partial)`` with a temporary path beside ``path``, then rename it over ``path``.
+
+    If ``write`` fails, the temporary file is removed and ``path`` is left as it was.
+    """
+    partial = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(partial)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    os.replace(partial, path)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""LLM Batch
+
+Batched scholarship matching: several scholarships share one completion
+request instead of one request each.
+
+Each page is first trimmed to the sentences most relevant to the profile,
+then pages are packed into batches under a token budget. Batches are sent
+concurrently behind a rate limiter, and the reply is parsed back into one
+verdict per scholarship. Scholarships the reply does not cover are retried
+on their own. A verdict is a match only when it starts with the "Match"
+label; anything else, including a reply that cannot be parsed, is not.
+
+An optional :class:`cascade.Cascade` settles the pairs its local model is
+confident about before any request is made, and logs the verdicts the LLM
+decides for the rest.
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import openai
+
+import metrics
+from retrieval import tokenize
+
+DEFAULT_BATCH_SIZE = 5
+DEFAULT_TOKEN_BUDGET = 3000  # prompt tokens per request
+DEFAULT_PAGE_TOKENS = 400  # trimmed tokens per scholarship
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 5.0  # requests per second
+TOKENS_PER_VERDICT = 60
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+VERDICT_RE = re.compile(r"^\s*\[?(\d+)\]?\s*[:.)]\s*(No Match|Match)\b\s*[-:–—]?\s*(.*)$", re.I | re.M)
+LABEL_RE = re.compile(r"\s*(No Match|Match)\b\s*[-:–—.]?\s*(.*)", re.I | re.S)
+UNPARSEABLE = "No Match - unparseable reply"
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English)."""
+    return len(text) // 4 + 1
+
+
+def trim_to_relevant(content, query_text, max_tokens=DEFAULT_PAGE_TOKENS):
+    """Keep the sentences sharing the most terms with ``query_text``, in page order, within ``max_tokens``."""
+    if estimate_tokens(content) <= max_tokens:
+        return content
+    query_terms = set(tokenize(query_text))
+    sentences = SENTENCE_RE.split(content)
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: (-len(query_terms.intersection(tokenize(sentences[i]))), i),
+    )
+    kept, used = [], 0
+    for i in ranked:
+        cost = estimate_tokens(sentences[i])
+        if used + cost > max_tokens:
+            continue
+        kept.append(i)
+        used += cost
+    return " ".join(sentences[i] for i in sorted(kept))
+
+
+def build_prompt(user_query, pages):
+    """Prompt asking for one numbered verdict line per page."""
+    listing = "\n\n".join(f"[{n}] {page}" for n, page in enumerate(pages, 1))
+    return (
+        f"Match each of the following scholarship descriptions to the user's query: {user_query}.\n\n"
+        f"{listing}\n\n"
+        f"For every scholarship answer on its own line as '<number>: Match - <reason>' "
+        f"or '<number>: No Match - <reason>'."
+    )
+
+
+def parse_verdicts(text, count):
+    """Map 0-based scholarship positions to verdict strings parsed from a batched reply."""
+    verdicts = {}
+    for match in VERDICT_RE.finditer(text):
+        position = int(match.group(1)) - 1
+        if 0 <= position < count and position not in verdicts:
+            label = "No Match" if match.group(2).lower() == "no match" else "Match"
+            verdicts[position] = f"{label} - {match.group(3).strip()}".rstrip(" -")
+    if count == 1 and not verdicts:
+        # A single-scholarship reply may skip the numbering.
+        verdict = parse_verdict(text)
+        if verdict is not None:
+            verdicts[0] = verdict
+    return verdicts
+
+
+def parse_verdict(text):
+    """Normalized verdict of a single-scholarship reply, or ``None`` unless it starts with a label."""
+    label = LABEL_RE.match(text)
+    if label is None:
+        return None
+    name = "No Match" if label.group(1).lower() == "no match" else "Match"
+    return f"{name} - {label.group(2).strip()}".rstrip(" -")
+
+
+def pack_batches(pages, user_query, batch_size=DEFAULT_BATCH_SIZE, token_budget=DEFAULT_TOKEN_BUDGET):
+    """Group page indices into batches of at most ``batch_size`` that fit ``token_budget``."""
+    overhead = estimate_tokens(build_prompt(user_query, []))
+    batches, current, used = [], [], overhead
+    for i, page in enumerate(pages):
+        cost = estimate_tokens(page) + 4
+        if current and (len(current) == batch_size or used + cost > token_budget):
+            batches.append(current)
+            current, used = [], overhead
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across threads."""
+
+    def __init__(self, rate=DEFAULT_RATE):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def is_match(verdict):
+    label = LABEL_RE.match(verdict)
+    return label is not None and label.group(1).lower() == "match"
+
+
+def openai_complete(prompt, max_tokens):
+    response = openai.Completion.create(engine="text-davinci-003", prompt=prompt, max_tokens=max_tokens)
+    return response["choices"][0]["text"].strip()
+
+
+def iter_verdicts_batched(user_query, scholarships, cache=None, query_text=None,
+                          batch_size=DEFAULT_BATCH_SIZE, token_budget=DEFAULT_TOKEN_BUDGET,
+                          page_tokens=DEFAULT_PAGE_TOKENS, concurrency=DEFAULT_CONCURRENCY,
+                          rate=DEFAULT_RATE, complete=openai_complete, cascade=None):
+    """Yield ``(index, verdict)`` for each scholarship as soon as its verdict is known.
+
+    Cached verdicts come first, then those ``cascade`` settles locally, then
+    each batch as its request completes. ``query_text`` (defaults to
+    ``user_query``) selects which sentences survive trimming.
+    ``complete(prompt, max_tokens)`` returns the completion text. Closing the
+    generator early cancels batches that have not started; the verdicts of
+    those already in flight are still cached and logged when they finish.
+    """
+    pending = []
+    for i, scholarship in enumerate(scholarships):
+        verdict = cache.get(user_query, scholarship) if cache is not None else None
+        if verdict is None and cascade is not None:
+            verdict = cascade.decide(user_query, scholarship)
+        if verdict is None:
+            pending.append(i)
+        else:
+            yield i, verdict
+    pages = [trim_to_relevant(scholarships[i]["content"], query_text or user_query, page_tokens) for i in pending]
+    limiter = RateLimiter(rate)
+
+    def run_batch(batch):
+        limiter.wait()
+        metrics.count("llm_calls")
+        with metrics.span("llm.request"):
+            text = complete(build_prompt(user_query, [pages[i] for i in batch]), TOKENS_PER_VERDICT * len(batch))
+        parsed = parse_verdicts(text, len(batch))
+        if len(batch) > 1:
+            for position in range(len(batch)):
+                if position not in parsed:
+                    parsed[position] = run_batch([batch[position]])[0]
+        return [parsed.get(position, UNPARSEABLE) for position in range(len(batch))]
+
+    def record(batch, verdicts):
+        for page_index, verdict in zip(batch, verdicts):
+            i = pending[page_index]
+            # An unparseable reply says nothing about the pair; caching it would pin a false negative
+            if cache is not None and verdict != UNPARSEABLE:
+                cache.put(user_query, scholarships[i], verdict)
+            if cascade is not None:
+                cascade.record(user_query, scholarships[i], verdict)
+
+    def record_late(future):
+        # A batch still in flight when the caller stopped reading: keep the verdicts it paid for.
+        if not future.cancelled() and future.exception() is None:
+            record(futures[future], future.result())
+
+    batches = pack_batches(pages, user_query, batch_size, token_budget)
+    if not batches:
+        return
+    pool = ThreadPoolExecutor(max_workers=min(concurrency, len(batches)))
+    futures = {}
+    try:
+        futures = {pool.submit(run_batch, batch): batch for batch in batches}
+        for future in as_completed(futures):
+            batch = futures.pop(future)
+            verdicts = future.result()
+            record(batch, verdicts)
+            for page_index, verdict in zip(batch, verdicts):
+                yield pending[page_index], verdict
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        for future in list(futures):
+            future.add_done_callback(record_late)
+
+
+def match_scholarships_batched(user_query, scholarships, cache=None, **batch_options):
+    """Batched counterpart of ``match_scholarships``; returns ``{"url", "reason"}`` matches in input order."""
+    verdicts = dict(iter_verdicts_batched(user_query, scholarships, cache=cache, **batch_options))
+    return [
+        {"url": scholarship["url"], "reason": verdicts[i]}
+        for i, scholarship in enumerate(scholarships)
+        if is_match(verdicts[i])
+    ]
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Match Cache
+
+Two-tier cache for LLM match verdicts: an in-memory LRU in front of a
+persistent SQLite table.
+
+Entries are keyed by the normalized user query plus the scholarship's content
+hash, so a rerun with the same profile is served without calling the model,
+and a page whose content changed simply misses. Both tiers expire entries
+after a TTL and evict the oldest ones beyond a size limit.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+DEFAULT_DB_PATH = "match_cache.sqlite3"
+DEFAULT_TTL = 7 * 24 * 60 * 60  # seconds
+DEFAULT_MEMORY_SIZE = 1024
+DEFAULT_DISK_SIZE = 100_000
+EVICT_EVERY = 256  # writes between disk eviction passes
+
+
+def normalize_query(user_query):
+    """Lower-case and collapse whitespace so cosmetic differences share a cache entry."""
+    return re.sub(r"\s+", " ", user_query).strip().lower()
+
+
+def cache_key(user_query, content_hash):
+    digest = hashlib.sha256(normalize_query(user_query).encode("utf-8"))
+    digest.update(b"\0" + content_hash.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class MatchCache:
+    """In-memory LRU plus SQLite store of ``verdict`` strings.
+
+    ``hits_memory``, ``hits_disk`` and ``misses`` count lookups since the
+    cache was created; :meth:`stats` returns them as a dict.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, ttl=DEFAULT_TTL,
+                 memory_size=DEFAULT_MEMORY_SIZE, disk_size=DEFAULT_DISK_SIZE):
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self._writes = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS verdicts (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    verdict TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS verdicts_url ON verdicts (url);
+                CREATE INDEX IF NOT EXISTS verdicts_created_at ON verdicts (created_at);
+                """
+            )
+
+    def get(self, user_query, scholarship):
+        """Return the cached verdict for this query and scholarship, or ``None``."""
+        key = cache_key(user_query, scholarship["content_hash"])
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                metrics.count("match_cache_hits")
+                return entry[0]
+            self._memory.pop(key, None)
+            row = self.conn.execute(
+                "SELECT verdict, created_at FROM verdicts WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                metrics.count("match_cache_misses")
+                return None
+            self.hits_disk += 1
+            metrics.count("match_cache_hits")
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def put(self, user_query, scholarship, verdict):
+        key = cache_key(user_query, scholarship["content_hash"])
+        now = time.time()
+        with self._lock:
+            self._remember(key, verdict, now)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO verdicts (key, url, content_hash, verdict, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, scholarship["url"], scholarship["content_hash"], verdict, now),
+                )
+            self._writes += 1
+            due = self._writes % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def _remember(self, key, verdict, created_at):
+        self._memory[key] = (verdict, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def invalidate(self, scholarships):
+        """Drop verdicts for these pages that were computed against older content."""
+        with self._lock:
+            # Memory entries are keyed by content hash and can never be served
+            # for changed content; they age out of the LRU on their own.
+            with self.conn:
+                self.conn.executemany(
+                    "DELETE FROM verdicts WHERE url = ? AND content_hash != ?",
+                    [(s["url"], s["content_hash"]) for s in scholarships],
+                )
+
+    def evict(self):
+        """Remove expired rows and trim the table to ``disk_size`` newest rows."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM verdicts WHERE created_at < ?", (time.time() - self.ttl,))
+            self.conn.execute(
+                "DELETE FROM verdicts WHERE key IN ("
+                "SELECT key FROM verdicts ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.disk_size,),
+            )
+
+    def stats(self):
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""Metrics
+
+Lightweight per-stage timing and counters.
+
+``with metrics.span("scrape"):`` or the ``@metrics.timed("scrape")``
+decorator records how long a stage took, and ``metrics.count("llm_calls")``
+bumps a counter. Each stage keeps a Prometheus-style bucket histogram plus
+a window of recent samples for p50/p95/p99.
+
+Recording is off unless enabled with :func:`enable` or the
+``SCHOLARSHIP_METRICS=1`` environment variable. While disabled, a span is a
+shared no-op context manager and a timed function adds a single flag check,
+so instrumentation can stay in hot paths.
+
+Work done in another process records into that process's own metrics;
+:func:`export` there and :func:`merge` here bring it back.
+
+Metrics can be written to a local file with :func:`write` (Prometheus text,
+or JSON for a ``.json`` path), written at exit by setting
+``SCHOLARSHIP_METRICS_FILE``, or served as a Prometheus text endpoint with
+:func:`serve` (started by :func:`init` when ``SCHOLARSHIP_METRICS_PORT`` is
+set).
+"""
+
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+WINDOW = 4096  # recent samples kept per stage for percentiles
+PERCENTILES = (50, 95, 99)
+PREFIX = "scholarship"
+
+_enabled = os.environ.get("SCHOLARSHIP_METRICS", "") not in ("", "0")
+_lock = threading.Lock()
+_initialized = False
+_NOOP = nullcontext()
+
+
+class Histogram:
+    """Bucketed latency histogram with a window of recent samples."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+
+    def percentiles(self):
+        samples = sorted(self.recent)
+        if not samples:
+            return {f"p{p}": 0.0 for p in PERCENTILES}
+        return {f"p{p}": samples[min(len(samples) - 1, len(samples) * p // 100)] for p in PERCENTILES}
+
+
+_stages = {}
+_counters = {}
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def observe(stage, seconds):
+    """Record one ``seconds`` sample for ``stage``."""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _stages.get(stage)
+        if histogram is None:
+            histogram = _stages[stage] = Histogram()
+        histogram.observe(seconds)
+
+
+def count(name, value=1):
+    """Add ``value`` to the counter ``name``."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+def span(stage):
+    """Context manager timing the enclosed block as ``stage``."""
+    return _Span(stage) if _enabled else _NOOP
+
+
+def timed(stage):
+    """Decorator timing every call of the function as ``stage``."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def summary():
+    """``{"stages": {stage: {count, sum, p50, p95, p99}}, "counters": {...}}`` in seconds."""
+    with _lock:
+        stages = {
+            stage: {"count": h.count, "sum": h.sum, **h.percentiles()} for stage, h in sorted(_stages.items())
+        }
+        return {"stages": stages, "counters": dict(sorted(_counters.items()))}
+
+
+def export():
+    """Raw state of every stage and counter, for :func:`merge` in another process."""
+    with _lock:
+        return {
+            "stages": {
+                stage: {"buckets": list(h.buckets), "count": h.count, "sum": h.sum, "recent": list(h.recent)}
+                for stage, h in _stages.items()
+            },
+            "counters": dict(_counters),
+        }
+
+
+def merge(exported):
+    """Add metrics recorded elsewhere (the output of :func:`export`) to this process's."""
+    if not _enabled:
+        return
+    with _lock:
+        for stage, data in exported["stages"].items():
+            histogram = _stages.get(stage)
+            if histogram is None:
+                histogram = _stages[stage] = Histogram()
+            histogram.buckets = [a + b for a, b in zip(histogram.buckets, data["buckets"])]
+            histogram.count += data["count"]
+            histogram.sum += data["sum"]
+            histogram.recent.extend(data["recent"])
+        for name, value in exported["counters"].items():
+            _counters[name] = _counters.get(name, 0) + value
+
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format."""
+    lines = [f"# TYPE {PREFIX}_stage_seconds histogram"]
+    with _lock:
+        for stage, h in sorted(_stages.items()):
+            cumulative = 0
+            for bound, n in zip((*BUCKETS, "+Inf"), h.buckets):
+                cumulative += n
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {h.sum:.6f}')
+            lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {h.count}')
+        for name, value in sorted(_counters.items()):
+            lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+            lines.append(f"{PREFIX}_{name}_total {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write(path):
+    """Write metrics to ``path``: JSON for ``.json`` files, Prometheus text otherwise."""
+    text = json.dumps(summary(), indent=2) if path.endswith(".json") else prometheus_text()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve :func:`prometheus_text` on ``http://host:port/`` from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def init():
+    """Start the exporters the environment asks for; later calls do nothing.
+
+    Writes metrics at exit to ``SCHOLARSHIP_METRICS_FILE`` and serves them on
+    ``SCHOLARSHIP_METRICS_PORT``. Only the app's server process calls this:
+    worker processes import the module too and must not bind the port.
+    """
+    global _initialized
+    with _lock:
+        if _initialized:
+            return
+        _initialized = True
+    if os.environ.get("SCHOLARSHIP_METRICS_FILE"):
+        atexit.register(write, os.environ["SCHOLARSHIP_METRICS_FILE"])
+    if os.environ.get("SCHOLARSHIP_METRICS_PORT"):
+        serve(int(os.environ["SCHOLARSHIP_METRICS_PORT"]))
+
+
+def debug_panel():
+    """Streamlit sidebar panel with p50/p95/p99 per stage and the counters.
+
+    Hidden unless the page is opened with ``?debug=1``, which also turns
+    recording on for the rest of the process.
+    """
+    import streamlit as st
+
+    if st.query_params.get("debug") != "1":
+        return
+    enable()
+    with st.sidebar.expander("Debug: stage latency", expanded=True):
+        data = summary()
+        st.table([
+            {"stage": stage, "count": s["count"],
+             **{f"p{p} ms": round(s[f"p{p}"] * 1000, 2) for p in PERCENTILES}}
+            for stage, s in data["stages"].items()
+        ])
+        st.table([{"counter": name, "value": value} for name, value in data["counters"].items()])
+        if st.button("Reset metrics"):
+            reset()
+
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""Resources
+
+Process-wide resources shared by every session of the app.
+
+One :class:`SharedResources` per server process owns the corpus store, the
+match cache, the local cascade in front of the LLM matcher and a pooled
+session the OpenAI client reuses for its connections. Scraping is not among
+them: each refresh fetches pages through its own pooled HTTP session, which
+the worker process owns when the refresh runs there. The corpus and the
+indexes built from it are held in an immutable :class:`CorpusSnapshot`, loaded
+once per corpus version and handed to every session as-is, so sessions only
+keep their own profile. Near-duplicate pages are folded into one canonical
+record when a snapshot is built; the store keeps every page so each URL is
+still revalidated on its own.
+
+The snapshot is replaced when the corpus goes stale, when a refresh is
+forced, or when :meth:`SharedResources.invalidate` is called. Callbacks
+registered with :meth:`SharedResources.on_change` run for every new snapshot;
+the app uses them to drop outdated match verdicts. While one thread rebuilds
+the snapshot, other sessions keep being served the previous one.
+
+After :meth:`SharedResources.start`, refreshes move off the request path
+entirely. A background thread takes refresh requests from a queue (and checks
+the TTL on its own every ``interval`` seconds). It hands the scraping, parsing
+and index building to one spawned worker process running at a lower priority,
+so the work does not compete with sessions for the GIL. Jobs added with
+:meth:`SharedResources.add_refresh_job`, such as re-extracting calendar
+deadlines, run there too. What the process records in :mod:`metrics` comes
+back with its result and is merged into the server's metrics. Before the new
+snapshot is swapped in, the thread decides the match verdicts of recently seen
+profiles against it, so those profiles are answered from the match cache as
+soon as it is served. Sessions only ever read a finished snapshot and never
+wait on a refresh, except for the very first load.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+
+import openai
+
+import cascade
+import corpus_store
+import dedup
+import eligibility
+import llm_batch
+import match_cache
+import metrics
+import retrieval
+import scraper
+
+DEFAULT_REFRESH_INTERVAL = 300  # seconds between the background worker's TTL checks
+DEFAULT_WARM_PROFILES = 8  # recent profiles whose verdicts are decided before a snapshot is served
+REFRESH_NICENESS = 10
+
+
+@dataclass(frozen=True)
+class CorpusSnapshot:
+    """One corpus version and the indexes built from it; never mutated."""
+
+    version: int
+    refreshed_at: float
+    records: list
+    vector_index: retrieval.VectorIndex
+    eligibility_index: eligibility.EligibilityIndex
+    duplicates: dict = field(default_factory=dict)  # canonical url -> near-duplicate urls dropped
+
+    @cached_property
+    def by_url(self):
+        """Records keyed by URL, built on first use."""
+        return {record["url"]: record for record in self.records}
+
+
+def build_snapshot(store, urls=None, index_path=retrieval.DEFAULT_INDEX_PATH):
+    """Load the stored corpus (restricted to ``urls`` when given), minus near-duplicates, and its indexes."""
+    deduplicated = dedup.deduplicate(store.load(urls))
+    records = deduplicated.records
+    return CorpusSnapshot(
+        version=store.version,
+        refreshed_at=store.refreshed_at or time.time(),
+        records=records,
+        vector_index=retrieval.load_or_build_index(records, store.version, index_path),
+        eligibility_index=eligibility.EligibilityIndex.build(records),
+        duplicates=deduplicated.duplicates,
+    )
+
+
+def refresh_snapshot(store, urls, index_path=retrieval.DEFAULT_INDEX_PATH, ttl=corpus_store.DEFAULT_TTL,
+                     force=False, revalidate=True, known_version=None, jobs=(), **fetch_options):
+    """Revalidate the corpus if it is stale (or ``force``) and build its snapshot.
+
+    Returns ``(result, last_refresh)``. ``result`` is the new
+    :class:`CorpusSnapshot`, or only the store's refresh time when the corpus
+    is still at ``known_version``. ``jobs`` are called with the records of a
+    new snapshot. With ``revalidate`` off, a stale store is used as-is as
+    long as it holds the pages of ``urls``.
+    """
+    if force or not store.covers(urls) or revalidate and store.is_stale(ttl):
+        corpus_store.refresh_corpus(urls, store, **fetch_options)
+    if store.version == known_version:
+        return store.refreshed_at or time.time(), store.last_refresh
+    snapshot = build_snapshot(store, urls, index_path)
+    for job in jobs:
+        job(snapshot.records)
+    return snapshot, store.last_refresh
+
+
+def _refresh_from_path(store_path, *args, record_metrics=False, **options):
+    # Runs in the refresh process, which opens its own connection to the store. What it
+    # records (scrape, fetch, parse, dedup, refresh jobs) is returned for the server to merge.
+    metrics.reset()
+    if record_metrics:
+        metrics.enable()
+    else:
+        metrics.disable()
+    store = corpus_store.CorpusStore(store_path)
+    try:
+        return (*refresh_snapshot(store, *args, **options), metrics.export())
+    finally:
+        store.close()
+
+
+def _lower_priority():
+    if hasattr(os, "nice"):
+        os.nice(REFRESH_NICENESS)
+
+
+def _start_refresh_process():
+    """A one-process pool for refreshes, started from a fresh interpreter rather than forked.
+
+    Forking a server full of threads can copy locks that are held.
+    """
+    return ProcessPoolExecutor(1, multiprocessing.get_context("spawn"), initializer=_lower_priority)
+
+
+class SharedResources:
+    """Corpus snapshot, caches and pooled connections shared across sessions."""
+
+    def __init__(self, urls, store_path=corpus_store.DEFAULT_DB_PATH, cache_path=match_cache.DEFAULT_DB_PATH,
+                 index_path=retrieval.DEFAULT_INDEX_PATH, ttl=corpus_store.DEFAULT_TTL,
+                 warm_profiles=DEFAULT_WARM_PROFILES, cascade_path=cascade.DEFAULT_MODEL_PATH, verdict_log=None):
+        self.urls = list(urls)
+        self.ttl = ttl
+        self.index_path = index_path
+        self.store = corpus_store.CorpusStore(store_path)
+        self.match_cache = match_cache.MatchCache(cache_path)
+        self.cascade = cascade.Cascade(cascade_path, verdict_log)
+        self.llm_session = scraper.make_session(llm_batch.DEFAULT_CONCURRENCY)
+        # The OpenAI client sends every request through this session, keeping connections alive.
+        openai.requestssession = self.llm_session
+        self._snapshot = None
+        self._stale = False
+        self._hooks = []
+        self._jobs = []
+        self._profiles = deque(maxlen=warm_profiles)
+        self._lock = threading.Lock()
+        self._profiles_lock = threading.Lock()
+        self._requests = None
+        self._worker = None
+        self._pool = None
+        self._requested = False
+        self._ready = threading.Event()
+        self._error = None
+
+    def on_change(self, hook):
+        """Call ``hook(snapshot)`` whenever a new corpus snapshot is built."""
+        self._hooks.append(hook)
+        return hook
+
+    def add_refresh_job(self, job):
+        """Call ``job(records)`` for every new corpus version, before its snapshot is served.
+
+        With the background worker running, jobs run in the refresh process,
+        so ``job`` must be picklable: a module-level function or a
+        ``functools.partial`` of one.
+        """
+        self._jobs.append(job)
+        return job
+
+    def remember_profile(self, user_query, query_text, profile):
+        """Record a searched profile so the next snapshot comes with its verdicts already decided.
+
+        ``profile`` holds the keyword arguments of
+        :meth:`eligibility.EligibilityIndex.filter`.
+        """
+        entry = (user_query, query_text, dict(profile))
+        with self._profiles_lock:
+            if entry in self._profiles:
+                self._profiles.remove(entry)
+            self._profiles.append(entry)
+
+    def invalidate(self):
+        """Rebuild the snapshot from the store on the next :meth:`snapshot` call."""
+        self._stale = True
+        if self._worker is not None:
+            self.request_refresh()
+
+    @property
+    def refreshing(self):
+        """Whether the background worker has a refresh queued or under way."""
+        return self._requested
+
+    def start(self, interval=DEFAULT_REFRESH_INTERVAL, processes=True):
+        """Refresh in a background thread from now on, in a worker process unless ``processes`` is off.
+
+        The first snapshot is built from whatever the store holds, and
+        revalidated right after if it is stale.
+        """
+        if self._worker is not None:
+            return
+        if processes:
+            self._pool = _start_refresh_process()
+        self._requests = queue.Queue()
+        self._worker = threading.Thread(target=self._run, args=(interval,), name="corpus-refresh", daemon=True)
+        self._worker.start()
+        self.request_refresh()
+
+    def request_refresh(self, force=False):
+        """Queue a refresh for the background worker; requests queued before it gets to them are merged."""
+        self._requested = True
+        self._requests.put(force)
+
+    def _run(self, interval):
+        while True:
+            try:
+                force = self._requests.get(timeout=interval)
+            except queue.Empty:
+                force = False
+            while force is not None and not self._requests.empty():
+                request = self._requests.get_nowait()
+                force = None if request is None else force or request
+            if force is None:
+                return
+            first = self._snapshot is None
+            try:
+                with self._lock:
+                    if force or self._needs_refresh(self._snapshot):
+                        # The first snapshot comes straight from the store; a stale one is revalidated next.
+                        self._rebuild(force, revalidate=not first)
+                self._error = None
+            except Exception as exc:
+                # Keep serving the current snapshot; the next request or TTL check retries.
+                metrics.count("refresh_failures")
+                traceback.print_exc()
+                self._error = exc
+            self._requested = False
+            self._ready.set()
+            if first and self._error is None and self._needs_refresh(self._snapshot):
+                self.request_refresh()
+
+    def _needs_refresh(self, snapshot):
+        return snapshot is None or self._stale or time.time() - snapshot.refreshed_at > self.ttl
+
+    def snapshot(self, force=False):
+        """The current :class:`CorpusSnapshot`, refreshing the corpus first if needed.
+
+        If another thread is already rebuilding it, the previous snapshot is
+        returned instead of waiting. With the background worker running, a
+        needed refresh is only queued and the current snapshot returned; the
+        call waits only while there is no snapshot at all yet.
+        """
+        snapshot = self._snapshot
+        if self._worker is not None:
+            return self._background_snapshot(snapshot, force)
+        if not force and not self._needs_refresh(snapshot):
+            return snapshot
+        if not self._lock.acquire(blocking=snapshot is None or force):
+            return snapshot
+        try:
+            if force or self._needs_refresh(self._snapshot):
+                self._rebuild(force)
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def _background_snapshot(self, snapshot, force):
+        if force or self._needs_refresh(snapshot) and not self._requested:
+            if snapshot is None:
+                self._ready.clear()  # wait for this attempt, not the outcome of a failed one
+            self.request_refresh(force)
+        if snapshot is None:
+            self._ready.wait()
+            if self._snapshot is None:
+                raise RuntimeError("the scholarship corpus could not be loaded") from self._error
+            return self._snapshot
+        return snapshot
+
+    def _rebuild(self, force, revalidate=True):
+        previous = self._snapshot
+        args = (self.urls, self.index_path, self.ttl)
+        options = {"force": force, "revalidate": revalidate, "jobs": tuple(self._jobs),
+                   "known_version": previous.version if previous is not None else None}
+        if self._pool is not None:
+            try:
+                result, last_refresh, recorded = self._refresh_in_pool(args, options)
+            except BrokenProcessPool:
+                # The refresh process died; a pool never recovers from that, so start a new one.
+                metrics.count("refresh_process_restarts")
+                self._pool.shutdown(wait=False)
+                self._pool = _start_refresh_process()
+                result, last_refresh, recorded = self._refresh_in_pool(args, options)
+            self.store.last_refresh = last_refresh
+            metrics.merge(recorded)
+        else:
+            result, _ = refresh_snapshot(self.store, *args, **options)
+        self._stale = False
+        if not isinstance(result, CorpusSnapshot):
+            self._snapshot = replace(previous, refreshed_at=result)
+            return
+        # A model retrained since the last snapshot takes over from here
+        self.cascade.reload()
+        if self._worker is not None:
+            self._warm(result)
+        # Sessions read self._snapshot without locking; they see either the old snapshot or this one.
+        self._snapshot = result
+        for hook in self._hooks:
+            hook(result)
+
+    def _refresh_in_pool(self, args, options):
+        return self._pool.submit(
+            _refresh_from_path, self.store.path, *args, record_metrics=metrics.enabled(), **options
+        ).result()
+
+    def _warm(self, snapshot):
+        """Decide the verdicts of the remembered profiles against ``snapshot`` into the match cache."""
+        with self._profiles_lock:
+            profiles = list(self._profiles)
+        for user_query, query_text, profile in profiles:
+            eligible = snapshot.eligibility_index.filter(**profile)
+            candidates = retrieval.retrieve(snapshot.vector_index, snapshot.records, query_text, mask=eligible)
+            try:
+                for _ in llm_batch.iter_verdicts_batched(
+                    user_query, candidates, cache=self.match_cache, query_text=query_text, cascade=self.cascade
+                ):
+                    pass
+            except openai.error.OpenAIError:
+                metrics.count("warm_failures")
+
+    def close(self):
+        if self._worker is not None:
+            self._requests.put(None)
+            self._worker.join()
+        if self._pool is not None:
+            self._pool.shutdown()
+        self.store.close()
+        self.match_cache.close()
+        self.llm_session.close()
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""Retrieval
+
+Offline TF-IDF index over scholarship ``content`` used to pick a handful of
+candidates before anything is sent to the LLM.
+
+The index is built once per corpus version and persisted as NumPy arrays. It
+is stored term-major (an inverted index in CSC layout), so scoring a query
+only touches the postings of the query's own terms: the per-document scores
+come out of a single ``np.bincount`` and the top ``k`` out of
+``np.argpartition``, which keeps query time low at 100k documents.
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+
+DEFAULT_INDEX_PATH = "scholarship_index.npz"
+DEFAULT_TOP_K = 10
+MERIT_GPA = 3.5  # profiles from this GPA up also ask for merit scholarships
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with "
+    "you your our we".split()
+)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+def profile_query_text(gpa, major, financial_need, scholarship_type, causes):
+    """Turn the profile fields collected in ``main()`` into retrieval query text."""
+    parts = [major, *scholarship_type, *causes]
+    if financial_need == "Yes":
+        parts.append("financial need need-based grant")
+    if gpa >= MERIT_GPA:
+        parts.append("merit academic excellence")
+    parts.append(f"gpa {gpa:.1f}")
+    return " ".join(part for part in parts if part)
+
+
+class VectorIndex:
+    """TF-IDF inverted index over a list of scholarship records.
+
+    Postings for term ``t`` are ``doc_ids[indptr[t]:indptr[t + 1]]`` with
+    matching L2-normalised ``weights``.
+    """
+
+    def __init__(self, vocab, idf, indptr, doc_ids, weights, urls, content_hashes, corpus_version=0):
+        self.vocab = vocab
+        self.idf = idf
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.urls = urls
+        self.content_hashes = content_hashes
+        self.corpus_version = corpus_version
+
+    def __len__(self):
+        return len(self.urls)
+
+    @classmethod
+    def build(cls, scholarships, corpus_version=0):
+        vocab = {}
+        rows, cols, tfs = [], [], []
+        for doc_id, scholarship in enumerate(scholarships):
+            for token, count in Counter(tokenize(scholarship["content"])).items():
+                rows.append(doc_id)
+                cols.append(vocab.setdefault(token, len(vocab)))
+                tfs.append(count)
+        n_docs = len(scholarships)
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        tf = 1.0 + np.log(np.asarray(tfs, dtype=np.float32))
+
+        df = np.bincount(cols, minlength=len(vocab)).astype(np.float32)
+        idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+        weights = tf * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n_docs))
+        weights = (weights / np.maximum(norms[rows], 1e-12)).astype(np.float32)
+
+        order = np.argsort(cols, kind="stable")
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=len(vocab)), out=indptr[1:])
+        return cls(
+            vocab=vocab,
+            idf=idf.astype(np.float32),
+            indptr=indptr,
+            doc_ids=rows[order],
+            weights=weights[order],
+            urls=[s["url"] for s in scholarships],
+            content_hashes=[s.get("content_hash", "") for s in scholarships],
+            corpus_version=corpus_version,
+        )
+
+    def scores(self, query_text):
+        """Cosine similarity of ``query_text`` against every document."""
+        counts = Counter(token for token in tokenize(query_text) if token in self.vocab)
+        if not counts:
+            return np.zeros(len(self), dtype=np.float32)
+        terms = np.fromiter((self.vocab[token] for token in counts), dtype=np.int64, count=len(counts))
+        q = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * self.idf[terms]
+        q /= np.linalg.norm(q)
+        starts, ends = self.indptr[terms], self.indptr[terms + 1]
+        lengths = ends - starts
+        postings = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+        contributions = self.weights[postings] * np.repeat(q, lengths)
+        return np.bincount(self.doc_ids[postings], weights=contributions, minlength=len(self))
+
+    def top_k(self, query_text, k=DEFAULT_TOP_K, mask=None):
+        """Return ``(doc_ids, scores)`` of the ``k`` best documents, best first.
+
+        ``mask`` optionally restricts the search to documents where it is true.
+        """
+        scores = self.scores(query_text)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+            k = min(k, int(np.count_nonzero(mask)))
+        k = min(k, len(scores))
+        if k == 0:
+            return np.array([], dtype=np.int64), scores[:0]
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return candidates, scores[candidates]
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        terms = np.empty(len(self.vocab), dtype=object)
+        for term, term_id in self.vocab.items():
+            terms[term_id] = term
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                terms=terms.astype(str),
+                idf=self.idf,
+                indptr=self.indptr,
+                doc_ids=self.doc_ids,
+                weights=self.weights,
+                urls=np.asarray(self.urls, dtype=str),
+                content_hashes=np.asarray(self.content_hashes, dtype=str),
+                corpus_version=np.int64(self.corpus_version),
+            )
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        with np.load(path) as data:
+            return cls(
+                vocab={term: i for i, term in enumerate(data["terms"].tolist())},
+                idf=data["idf"],
+                indptr=data["indptr"],
+                doc_ids=data["doc_ids"],
+                weights=data["weights"],
+                urls=data["urls"].tolist(),
+                content_hashes=data["content_hashes"].tolist(),
+                corpus_version=int(data["corpus_version"]),
+            )
+
+
+def load_or_build_index(scholarships, corpus_version, path=DEFAULT_INDEX_PATH):
+    """Load the persisted index if it matches ``corpus_version``, otherwise rebuild and save it."""
+    try:
+        index = VectorIndex.load(path)
+        if index.corpus_version == corpus_version and len(index) == len(scholarships):
+            return index
+    except (OSError, KeyError, ValueError):
+        pass
+    index = VectorIndex.build(scholarships, corpus_version)
+    index.save(path)
+    return index
+
+
+def retrieve(index, scholarships, query_text, k=DEFAULT_TOP_K, mask=None):
+    """Return the ``k`` scholarships most similar to ``query_text``, best first.
+
+    ``mask`` must be aligned with the documents the index was built from.
+    """
+    by_url = {scholarship["url"]: scholarship for scholarship in scholarships}
+    doc_ids, _ = index.top_k(query_text, k, mask)
+    return [by_url[index.urls[i]] for i in doc_ids if index.urls[i] in by_url]
@@ -7,40 +7,81 @@ Original file is located at
     https://colab.research.google.com/drive/1Y7LWhObJYHNsSaFBI8eRL9iaclv1Rxxz
 """
 
-import requests
-from bs4 import BeautifulSoup
-import openai
+import os
+import time
+
 import streamlit as st
 
+import metrics
+
 # Set OpenAI API Key
 
+# The scraping and matching stack (openai, requests, lxml, numpy, pandas) is imported
+# inside the functions that use it, so the form paints without loading any of it;
+# it is first loaded when "Find Scholarships" or "Refresh scholarship data" is pressed.
+
 
-# Function to scrape scholarship data
+# Function to scrape scholarship data (concurrent, pooled, with timeouts and retries)
 def scrape_scholarship_data(urls):
-    scholarships = []
-    for url in urls:
-        response = requests.get(url)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            paragraphs = soup.find_all('p')
-            scholarship_text = " ".join([para.get_text() for para in paragraphs])
-            scholarships.append({"url": url, "content": scholarship_text})
-    return scholarships
+    import scraper
 
-# Function to match scholarships using OpenAI
-def match_scholarships(user_query, scholarships):
-    matching_scholarships = []
+    return scraper.scrape_scholarship_data(urls)
+
+# Yield (scholarship, verdict, is_match) as each verdict is decided; verdicts are
+# reused from `cache` when given, and pairs `cascade` is confident about are settled
+# locally. With batch_size > 1, several scholarships share one trimmed, rate-limited
+# request and batches resolve in completion order.
+def iter_match_scholarships(user_query, scholarships, cache=None, batch_size=1, cascade=None, **batch_options):
+    import llm_batch
+    import openai
+
+    if batch_size > 1:
+        verdicts = llm_batch.iter_verdicts_batched(
+            user_query, scholarships, cache=cache, batch_size=batch_size, cascade=cascade, **batch_options
+        )
+        for i, verdict in verdicts:
+            yield scholarships[i], verdict, llm_batch.is_match(verdict)
+        return
     for scholarship in scholarships:
-        response = openai.Completion.create(
-            engine="text-davinci-003",
-            prompt=f"Match the following scholarship description to the user's query: {user_query}. "
-                   f"Scholarship: {scholarship['content']}\n\nReturn 'Match' or 'No Match' with a reason.",
-            max_tokens=100
+        result = cache.get(user_query, scholarship) if cache is not None else None
+        if result is None and cascade is not None:
+            result = cascade.decide(user_query, scholarship)
+            if result is not None:
+                yield scholarship, result, llm_batch.is_match(result)
+                continue
+        if result is None:
+            metrics.count("llm_calls")
+            with metrics.span("llm.request"):
+                response = openai.Completion.create(
+                    engine="text-davinci-003",
+                    prompt=f"Match the following scholarship description to the user's query: {user_query}. "
+                           f"Scholarship: {scholarship['content']}\n\nReturn 'Match' or 'No Match' with a reason.",
+                    max_tokens=100
+                )
+            # Only a reply that starts with its label counts; "No Match" contains "Match" too
+            result = llm_batch.parse_verdict(response["choices"][0]["text"]) or llm_batch.UNPARSEABLE
+            if cache is not None and result != llm_batch.UNPARSEABLE:
+                cache.put(user_query, scholarship, result)
+            if cascade is not None:
+                cascade.record(user_query, scholarship, result)
+        yield scholarship, result, llm_batch.is_match(result)
+
+
+# Function to match scholarships using OpenAI
+@metrics.timed("match")
+def match_scholarships(user_query, scholarships, cache=None, batch_size=1, **batch_options):
+    if batch_size > 1:
+        import llm_batch
+
+        return llm_batch.match_scholarships_batched(
+            user_query, scholarships, cache=cache, batch_size=batch_size, **batch_options
         )
-        result = response["choices"][0]["text"].strip()
-        if "Match" in result:
-            matching_scholarships.append({"url": scholarship["url"], "reason": result})
-    return matching_scholarships
+    return [
+        {"url": scholarship["url"], "reason": result}
+        for scholarship, result, matched in iter_match_scholarships(user_query, scholarships, cache=cache,
+                                                                     **batch_options)
+        if matched
+    ]
 
 # URLs for scraping
 urls = [
@@ -66,11 +107,89 @@ urls = [
     "https://lambprize.org/eligibility-selection-criteria-application-guidance/"
 ]
 
-# Scrape scholarship data
-scholarship_data = scrape_scholarship_data(urls)
+# Deadlines and amounts extracted from the pages feed the Scholarship Calendar's catalog.
+# Unset means calendar_index.DEFAULT_CATALOG_PATH.
+CATALOG_PATH = os.environ.get("SCHOLARSHIP_CATALOG")
+# Pages found by `python crawler.py` from the URLs above are matched too. Unset means
+# crawler.DEFAULT_STATE_PATH.
+CRAWL_STATE_PATH = os.environ.get("SCHOLARSHIP_CRAWL_STATE")
+# Candidate lists precomputed per profile segment (see segments.py), rebuilt with every
+# corpus version. Unset means segments.DEFAULT_TABLE_PATH.
+SEGMENTS_PATH = os.environ.get("SCHOLARSHIP_SEGMENTS")
+# Local model that settles confident matches before the LLM is asked (see cascade.py).
+# Unset means cascade.DEFAULT_MODEL_PATH; without the file every pair goes to the LLM.
+CASCADE_MODEL_PATH = os.environ.get("SCHOLARSHIP_CASCADE_MODEL")
+# JSONL log of the verdicts the LLM decides, to train that model from. Unset means no log.
+VERDICT_LOG_PATH = os.environ.get("SCHOLARSHIP_VERDICT_LOG")
+
+
+# Corpus, indexes, caches and HTTP/OpenAI connections are shared by every session of
+# this server process. A background worker revalidates the corpus when the store's TTL
+# expires, the URL list changes, or a refresh is requested, re-extracts changed calendar
+# rows and decides verdicts for recently searched profiles, then swaps the new snapshot
+# in; verdicts computed against old page content are dropped after the swap.
+@st.cache_resource
+def get_resources():
+    import functools
+
+    import calendar_index
+    import cascade
+    import crawler
+    import deadlines
+    import resources
+    import segments
+
+    catalog_path = CATALOG_PATH or calendar_index.DEFAULT_CATALOG_PATH
+    crawled = crawler.load_crawled_urls(CRAWL_STATE_PATH or crawler.DEFAULT_STATE_PATH)
+    shared = resources.SharedResources(
+        list(dict.fromkeys(urls + crawled)),
+        cascade_path=CASCADE_MODEL_PATH or cascade.DEFAULT_MODEL_PATH,
+        verdict_log=VERDICT_LOG_PATH,
+    )
+    shared.on_change(lambda snapshot: shared.match_cache.invalidate(snapshot.records))
+    # These run in the refresh worker process, so they have to be picklable
+    shared.add_refresh_job(functools.partial(deadlines.update_catalog, path=catalog_path))
+    shared.add_refresh_job(functools.partial(
+        segments.update_table, path=SEGMENTS_PATH or segments.DEFAULT_TABLE_PATH, index_path=shared.index_path
+    ))
+    shared.start()
+    return shared
+
+
+def get_corpus_store():
+    return get_resources().store
+
+
+def get_match_cache():
+    return get_resources().match_cache
+
+
+def load_scholarship_data(force=False):
+    return get_resources().snapshot(force=force)
+
+
+# Reloaded when the table file is rewritten or the corpus changes; None when there is no
+# table for the current corpus yet
+@st.cache_resource(max_entries=2)
+def load_segment_table(path, mtime, corpus_version, _index):
+    import segments
+
+    return segments.load_table(path, _index)
+
+
+def get_segment_table(corpus):
+    import segments
+
+    path = SEGMENTS_PATH or segments.DEFAULT_TABLE_PATH
+    if not os.path.exists(path):
+        return None
+    return load_segment_table(path, os.path.getmtime(path), corpus.version, corpus.vector_index)
 
 # Streamlit App
 def main():
+    # Metrics file and endpoint from SCHOLARSHIP_METRICS_FILE / SCHOLARSHIP_METRICS_PORT, once per process
+    metrics.init()
+
     # App Title
     st.title("Scholarship Finder Bot 🎓")
     st.markdown(
@@ -79,6 +198,22 @@ def main():
         Enter your details below, and we'll help you find scholarships that match your profile and preferences.
         """
     )
+    # The corpus is loaded on the first search (or refresh), not on first paint. A refresh
+    # runs in the background; searches keep using the current data until it is done.
+    if st.sidebar.button("Refresh scholarship data"):
+        with st.spinner("Loading scholarship data..."):
+            load_scholarship_data(force=True)
+        st.session_state["corpus_loaded"] = True
+    if st.session_state.get("corpus_loaded"):
+        if get_resources().refreshing:
+            st.sidebar.caption("Refreshing scholarship data in the background...")
+        if get_corpus_store().last_refresh is not None:
+            st.sidebar.caption(f"Last refresh: {get_corpus_store().last_refresh.summary()}")
+        cache_stats = get_match_cache().stats()
+        st.sidebar.caption(
+            f"Match cache: {cache_stats['hits_memory'] + cache_stats['hits_disk']} hits, "
+            f"{cache_stats['misses']} misses"
+        )
 
     # Section 1: Basic Information
     st.header("📝 Basic Information")
@@ -127,22 +262,98 @@ def main():
         ["Community Service", "Sustainability", "Social Justice", "Diversity", "STEM", "Arts"]
     )
 
+    max_matches = st.number_input(
+        "Stop after this many matches (0 shows all):", min_value=0, max_value=100, value=0
+    )
+
+    # Session state holds only this user's profile; the corpus and indexes are process-wide
+    st.session_state["profile"] = {
+        "age": age, "gpa": gpa, "major": major, "school_year": school_year,
+        "financial_need": financial_need, "residence_state": residence_state,
+        "physical_disabilities": physical_disabilities, "scholarship_type": scholarship_type, "causes": causes,
+    }
+
     # Section 5: Submit Button
     if st.button("Find Scholarships"):
+        import llm_batch
+        import retrieval
+        import segments
+
+        with st.spinner("Loading scholarship data..."):
+            corpus = load_scholarship_data()
+        st.session_state["corpus_loaded"] = True
+
         # Combine user preferences into a query
         user_query = f"GPA: {gpa}, Major: {major}, Financial Need: {financial_need}, " \
                      f"Scholarship Type: {', '.join(scholarship_type)}, Causes: {', '.join(causes)}"
 
-        # Match scholarships using OpenAI
-        matches = match_scholarships(user_query, scholarship_data)
+        criteria = {
+            "age": age,
+            "gpa": gpa,
+            "school_year": school_year,
+            "residence_state": residence_state,
+            "financial_need": financial_need,
+            "physical_disabilities": physical_disabilities,
+        }
+        query_text = retrieval.profile_query_text(gpa, major, financial_need, scholarship_type, causes)
+
+        # Most profiles are served from the candidates precomputed for their segment (with
+        # a major, ranked on its first use in the segment and then cached)
+        table = get_segment_table(corpus)
+        candidates = None
+        if table is not None:
+            candidates = segments.retrieve(table, corpus, criteria, major, scholarship_type, causes)
+        if candidates is None:
+            # Drop scholarships whose hard criteria the profile fails
+            with metrics.span("eligibility"):
+                eligible = corpus.eligibility_index.filter(**criteria)
 
-        # Display matching scholarships
-        if matches:
-            st.success("We found matching scholarships for you!")
-            for match in matches:
-                st.write(f"- [Scholarship Link]({match['url']}): {match['reason']}")
-        else:
+            # Retrieve the closest eligible candidates locally; only those are sent to OpenAI
+            with metrics.span("retrieval"):
+                candidates = retrieval.retrieve(corpus.vector_index, corpus.records, query_text, mask=eligible)
+
+        # The next corpus refresh decides this profile's verdicts before it is served
+        get_resources().remember_profile(user_query, query_text, criteria)
+
+        # Match scholarships using OpenAI, showing each match as soon as it is decided
+        progress = st.progress(0.0, text="Matching scholarships...")
+        results = st.container()
+        verdicts = iter_match_scholarships(
+            user_query,
+            candidates,
+            cache=get_match_cache(),
+            batch_size=llm_batch.DEFAULT_BATCH_SIZE,
+            cascade=get_resources().cascade,
+            query_text=query_text,
+        )
+        found = 0
+        first_result = None
+        start = time.perf_counter()
+        for checked, (scholarship, reason, matched) in enumerate(verdicts, 1):
+            progress.progress(checked / len(candidates), text=f"Checked {checked} of {len(candidates)} scholarships")
+            if not matched:
+                continue
+            if found == 0:
+                first_result = time.perf_counter() - start
+                results.success("We found matching scholarships for you!")
+            results.write(f"- [Scholarship Link]({scholarship['url']}): {reason}")
+            found += 1
+            if found == max_matches:
+                verdicts.close()
+                break
+        total = time.perf_counter() - start
+        metrics.observe("match", total)
+        if first_result is not None:
+            metrics.observe("match.first_result", first_result)
+        progress.empty()
+
+        if not found:
             st.error("No matching scholarships found. Please try adjusting your preferences.")
+        first = f"{first_result:.2f}s" if first_result is not None else "n/a"
+        st.caption(f"Time to first result: {first}, total: {total:.2f}s")
+
+    # Per-stage latency panel, shown only with ?debug=1 in the URL
+    metrics.debug_panel()
 
 # Run the app
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Scraper
+
+Concurrent fetch engine for scholarship pages.
+
+Pages are fetched on a bounded thread pool that shares one pooled
+``requests.Session``. Each host gets its own concurrency limit, every request
+has a timeout, and transient failures (connection errors, timeouts, 429/5xx)
+are retried with exponential backoff.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import extraction
+import metrics
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PER_HOST = 4
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def make_session(pool_size=DEFAULT_MAX_WORKERS):
+    """Return a ``requests.Session`` whose connection pool fits ``pool_size`` workers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HostLimiter:
+    """Hands out one semaphore per host so no host sees more than ``per_host`` requests."""
+
+    def __init__(self, per_host=DEFAULT_PER_HOST):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def for_url(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host)
+                self._semaphores[host] = semaphore
+        return semaphore
+
+
+def fetch(session, url, limiter, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+          backoff=DEFAULT_BACKOFF, headers=None):
+    """Fetch ``url``, retrying transient failures. Returns the response or ``None``.
+
+    Other request errors, such as a redirect loop or an invalid URL, fail the
+    page at once; they never propagate to the caller.
+    """
+    for attempt in range(retries + 1):
+        try:
+            with limiter.for_url(url), metrics.span("scrape.fetch"):
+                response = session.get(url, timeout=timeout, headers=headers)
+        except (requests.ConnectionError, requests.Timeout):
+            response = None
+        except requests.RequestException:
+            metrics.count("http_requests")
+            return None
+        metrics.count("http_requests")
+        if response is not None:
+            metrics.count("bytes_fetched", len(response.content))
+        if response is not None and response.status_code not in RETRY_STATUSES:
+            return response
+        if attempt < retries:
+            time.sleep(backoff * (2 ** attempt))
+    return response
+
+
+def conditional_headers(etag=None, last_modified=None):
+    """Build revalidation headers from a page's stored validators."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def fetch_all(urls, session=None, max_workers=DEFAULT_MAX_WORKERS, per_host=DEFAULT_PER_HOST,
+              timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+              headers_for=None):
+    """Fetch every URL concurrently. Returns ``(url, response)`` pairs in input order.
+
+    ``headers_for`` optionally maps a URL to extra request headers, e.g.
+    :func:`conditional_headers` for revalidation.
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+    own_session = session is None
+    if own_session:
+        session = make_session(max_workers)
+    limiter = HostLimiter(per_host)
+    try:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+            responses = pool.map(
+                lambda url: fetch(
+                    session, url, limiter, timeout, retries, backoff,
+                    headers=headers_for(url) if headers_for else None,
+                ),
+                urls,
+            )
+            return list(zip(urls, responses))
+    finally:
+        if own_session:
+            session.close()
+
+
+@metrics.timed("scrape.parse")
+def parse_page(html):
+    """Extract the scholarship text from a page's main content, without boilerplate."""
+    return extraction.extract_main_content(html)
+
+
+@metrics.timed("scrape")
+def scrape_scholarship_data(urls, **fetch_options):
+    """Scrape ``urls`` concurrently into ``{"url", "content"}`` records, skipping failed pages."""
+    scholarships = []
+    for url, response in fetch_all(urls, **fetch_options):
+        if response is not None and response.status_code == 200:
+            scholarships.append({"url": url, "content": parse_page(response.text)})
+    return scholarships
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""Segments
+
+Precomputed candidate lists for the categorical part of a student profile.
+
+Apart from the major, the retrieval query built from the form depends only
+on categorical choices: the scholarship types and causes picked, financial
+need, and whether the GPA is in the merit band. (The "gpa 3.4" term keeps
+only the word "gpa" once tokenized, so the exact GPA does not matter.) A
+segment is one combination of those, with at most ``max_choices`` types and
+at most ``max_choices`` causes. For every segment the table keeps the
+``depth`` best-scoring scholarships of the whole corpus, before any
+eligibility filtering.
+
+Serving a profile is a lookup in a flat slot array indexed by the segment's
+bits, then the eligibility check on those ``depth`` candidates only. That
+check covers the profile's age, GPA, school year, state, need and disability
+(:meth:`eligibility.EligibilityIndex.filter` with ``doc_ids``). Without a
+major, the eligible head of the list is what retrieval over the full corpus
+returns.
+
+The major is the one free-text field the query uses, so its lists cannot be
+enumerated ahead of time. The first submission with a given major in a
+segment ranks the corpus once for that query. The list is kept in a
+bounded LRU on the table, keyed by the segment and the major's indexed
+terms, and later submissions with that pair are served like any other
+segment. When a profile falls outside the table, or fewer than ``k`` of its
+candidates are eligible, the table declines and the caller falls back to
+full retrieval.
+
+A table is tied to the index it was built from by a digest of its URLs and
+content hashes. The app's refresh worker rebuilds it for every new corpus
+version. Run ``python segments.py`` to build one offline from the corpus
+store.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from itertools import combinations
+
+import numpy as np
+
+import files
+import metrics
+import retrieval
+
+DEFAULT_TABLE_PATH = "scholarship_segments.npz"
+DEFAULT_DEPTH = 100  # candidates kept per segment
+DEFAULT_MAX_CHOICES = 2  # types and causes per segment, each
+DEFAULT_MAJOR_LISTS = 4096  # (segment, major) candidate lists kept in memory
+
+# The choices the profile form offers, in the form's order.
+SCHOLARSHIP_TYPES = [
+    "Merit Scholarships", "Need-Based Scholarships", "Federal Grants", "Athletic Scholarships",
+    "Artistic Scholarships", "Graduate Aid", "Other",
+]
+CAUSES = ["Community Service", "Sustainability", "Social Justice", "Diversity", "STEM", "Arts"]
+# Slot number: type bits, cause bits, then one bit each for financial need and the merit band.
+SLOTS = 1 << (len(SCHOLARSHIP_TYPES) + len(CAUSES) + 2)
+
+
+def _choice_bits(choices, options):
+    bits = 0
+    for choice in choices:
+        if choice not in options:
+            return None
+        bits |= 1 << options.index(choice)
+    return bits
+
+
+def segment_key(financial_need, gpa, scholarship_type, causes):
+    """Slot number of a profile's segment, or ``None`` for choices the form does not offer."""
+    types = _choice_bits(scholarship_type, SCHOLARSHIP_TYPES)
+    values = _choice_bits(causes, CAUSES)
+    if types is None or values is None:
+        return None
+    key = types | values << len(SCHOLARSHIP_TYPES)
+    return (key << 1 | (financial_need == "Yes")) << 1 | (gpa >= retrieval.MERIT_GPA)
+
+
+def iter_segments(max_choices=DEFAULT_MAX_CHOICES):
+    """Yield ``(financial_need, gpa, scholarship_type, causes)`` for every segment, one GPA per band."""
+    type_sets = [list(c) for n in range(max_choices + 1) for c in combinations(SCHOLARSHIP_TYPES, n)]
+    cause_sets = [list(c) for n in range(max_choices + 1) for c in combinations(CAUSES, n)]
+    for scholarship_type in type_sets:
+        for causes in cause_sets:
+            for financial_need in ("Yes", "No"):
+                for gpa in (0.0, retrieval.MERIT_GPA):
+                    yield financial_need, gpa, scholarship_type, causes
+
+
+def index_digest(index):
+    """Digest of the documents a :class:`retrieval.VectorIndex` was built from, in order."""
+    digest = hashlib.blake2b(digest_size=16)
+    for url, content_hash in zip(index.urls, index.content_hashes):
+        digest.update(f"{url}\t{content_hash}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SegmentTable:
+    """Top-``depth`` candidate lists per segment for one :class:`retrieval.VectorIndex`.
+
+    Row ``slots[segment_key(...)]`` of ``doc_ids`` and ``scores`` holds a
+    segment's candidates, best first; slots of segments outside the table
+    hold -1. Lists for a segment plus a major are ranked on first use and
+    kept in an LRU of ``major_lists`` entries; ``major_hits`` and
+    ``major_misses`` count its lookups.
+    """
+
+    def __init__(self, slots, doc_ids, scores, digest, max_choices=DEFAULT_MAX_CHOICES,
+                 major_lists=DEFAULT_MAJOR_LISTS):
+        self.slots = slots
+        self.doc_ids = doc_ids
+        self.scores = scores
+        self.digest = digest
+        self.max_choices = max_choices
+        self.major_lists = major_lists
+        self.major_hits = 0
+        self.major_misses = 0
+        self._major_lists = OrderedDict()  # (segment key, major terms) -> (doc_ids, scores)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    @property
+    def depth(self):
+        return self.doc_ids.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.slots.nbytes + self.doc_ids.nbytes + self.scores.nbytes
+
+    def candidates(self, financial_need, gpa, scholarship_type, causes):
+        """``(doc_ids, scores)`` of the profile's segment, or ``None`` if the table does not have it."""
+        key = segment_key(financial_need, gpa, scholarship_type, causes)
+        row = self.slots[key] if key is not None else -1
+        if row < 0:
+            return None
+        return self.doc_ids[row], self.scores[row]
+
+    def top_k(self, index, eligibility_index, criteria, major="", scholarship_type=(), causes=(),
+              k=retrieval.DEFAULT_TOP_K):
+        """``(doc_ids, scores)`` of the profile's ``k`` best eligible scholarships, or ``None``.
+
+        ``criteria`` holds the keyword arguments of
+        :meth:`eligibility.EligibilityIndex.filter`. ``None`` means the table
+        cannot answer for this profile and full retrieval is needed.
+        """
+        gpa, financial_need = criteria["gpa"], criteria["financial_need"]
+        found = self.candidates(financial_need, gpa, scholarship_type, causes)
+        if found is None:
+            return None
+        # The query depends on the major only through its terms the index knows, with repeats
+        major_terms = tuple(sorted(token for token in retrieval.tokenize(major) if token in index.vocab))
+        if major_terms:
+            key = (segment_key(financial_need, gpa, scholarship_type, causes), major_terms)
+            with self._lock:
+                found = self._major_lists.get(key)
+                if found is not None:
+                    self._major_lists.move_to_end(key)
+                    self.major_hits += 1
+            if found is None:
+                query_text = retrieval.profile_query_text(gpa, major, financial_need, scholarship_type, causes)
+                found = index.top_k(query_text, self.depth)
+                with self._lock:
+                    self.major_misses += 1
+                    self._major_lists[key] = found
+                    while len(self._major_lists) > self.major_lists:
+                        self._major_lists.popitem(last=False)
+        doc_ids, scores = found
+        eligible = eligibility_index.filter(**criteria, doc_ids=doc_ids)
+        if np.count_nonzero(eligible) < k and self.depth < len(index):
+            return None  # too few eligible candidates; only the full corpus can fill the list
+        return doc_ids[eligible][:k], scores[eligible][:k]
+
+    def save(self, path=DEFAULT_TABLE_PATH):
+        """Write the table to ``path`` as ``.npz``, replacing any previous table in one step."""
+        def write(partial):
+            with open(partial, "wb") as f:
+                np.savez(
+                    f,
+                    slots=self.slots,
+                    doc_ids=self.doc_ids,
+                    scores=self.scores,
+                    digest=np.str_(self.digest),
+                    max_choices=np.int64(self.max_choices),
+                    types=np.asarray(SCHOLARSHIP_TYPES, dtype=str),
+                    causes=np.asarray(CAUSES, dtype=str),
+                )
+
+        files.atomic_write(path, write)
+
+    @classmethod
+    def load(cls, path=DEFAULT_TABLE_PATH):
+        with np.load(path) as data:
+            if data["types"].tolist() != SCHOLARSHIP_TYPES or data["causes"].tolist() != CAUSES:
+                raise ValueError(f"{path} was built for different form choices")
+            return cls(
+                slots=data["slots"],
+                doc_ids=data["doc_ids"],
+                scores=data["scores"],
+                digest=str(data["digest"]),
+                max_choices=int(data["max_choices"]),
+            )
+
+
+@metrics.timed("segments.build")
+def build_table(index, depth=DEFAULT_DEPTH, max_choices=DEFAULT_MAX_CHOICES):
+    """Rank the whole of ``index`` for every segment and keep the ``depth`` best of each."""
+    segments = list(iter_segments(max_choices))
+    depth = min(depth, len(index))
+    slots = np.full(SLOTS, -1, dtype=np.int32)
+    doc_ids = np.zeros((len(segments), depth), dtype=np.int32)
+    scores = np.zeros((len(segments), depth), dtype=np.float32)
+    for row, (financial_need, gpa, scholarship_type, causes) in enumerate(segments):
+        slots[segment_key(financial_need, gpa, scholarship_type, causes)] = row
+        query_text = retrieval.profile_query_text(gpa, "", financial_need, scholarship_type, causes)
+        doc_ids[row], scores[row] = index.top_k(query_text, depth)
+    return SegmentTable(slots, doc_ids, scores, index_digest(index), max_choices)
+
+
+def load_table(path=DEFAULT_TABLE_PATH, index=None):
+    """The table at ``path``, or ``None`` if it is missing, unreadable or was built for another index."""
+    try:
+        table = SegmentTable.load(path)
+    except (OSError, KeyError, ValueError):
+        return None
+    if index is not None and table.digest != index_digest(index):
+        return None
+    return table
+
+
+def update_table(records, path=DEFAULT_TABLE_PATH, index_path=retrieval.DEFAULT_INDEX_PATH,
+                 depth=DEFAULT_DEPTH, max_choices=DEFAULT_MAX_CHOICES):
+    """Rebuild the table at ``path`` for ``records``, reusing their index saved at ``index_path``."""
+    try:
+        index = retrieval.VectorIndex.load(index_path)
+    except (OSError, KeyError, ValueError):
+        index = None
+    if index is None or index.urls != [record["url"] for record in records]:
+        index = retrieval.VectorIndex.build(records)
+    table = build_table(index, depth, max_choices)
+    table.save(path)
+    return table
+
+
+@metrics.timed("segments")
+def retrieve(table, corpus, criteria, major="", scholarship_type=(), causes=(), k=retrieval.DEFAULT_TOP_K):
+    """The ``k`` best eligible scholarships of a corpus snapshot from ``table``, best first.
+
+    Returns ``None`` when the table cannot answer for this profile.
+    """
+    found = table.top_k(corpus.vector_index, corpus.eligibility_index, criteria, major, scholarship_type, causes, k)
+    metrics.count("segment_misses" if found is None else "segment_hits")
+    if found is None:
+        return None
+    return [corpus.by_url[corpus.vector_index.urls[i]] for i in found[0]]
+
+
+def main():
+    import corpus_store
+    import resources
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("-o", "--output", default=os.environ.get("SCHOLARSHIP_SEGMENTS", DEFAULT_TABLE_PATH))
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="candidates kept per segment")
+    parser.add_argument("--max-choices", type=int, default=DEFAULT_MAX_CHOICES,
+                        help="most scholarship types, and most causes, a segment can have")
+    parser.add_argument("--store", default=corpus_store.DEFAULT_DB_PATH)
+    parser.add_argument("--index", default=retrieval.DEFAULT_INDEX_PATH)
+    args = parser.parse_args()
+
+    corpus = resources.build_snapshot(corpus_store.CorpusStore(args.store), index_path=args.index)
+    start = time.perf_counter()
+    table = build_table(corpus.vector_index, args.depth, args.max_choices)
+    seconds = time.perf_counter() - start
+    table.save(args.output)
+    print(f"{len(table)} segments x {table.depth} candidates over {len(corpus.records)} scholarships "
+          f"built in {seconds:.1f}s; {table.nbytes / 1024:.0f} KB in memory, "
+          f"{os.path.getsize(args.output) / 1024:.0f} KB on disk", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
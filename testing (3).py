@@ -7,10 +7,28 @@ Original file is located at
     https://colab.research.google.com/drive/1CWP-z75Q3XaFbPs0Wwhrp5tmNWC4RmVo
 """
 
+import uuid
+from datetime import timedelta
+
 import streamlit as st
 from streamlit_calendar import calendar_component
 import pandas as pd
 
+from event_store import EventStore, event_start
+
+
+# Each visitor has their own calendar, keyed by an id kept in the page URL: reloading or
+# bookmarking the page brings the same events back, and other visitors never see them
+def get_event_store():
+    if "calendar" not in st.query_params:
+        st.query_params["calendar"] = uuid.uuid4().hex
+    owner = st.query_params["calendar"]
+    store = st.session_state.get("event_store")
+    if store is None or store.owner != owner:
+        store = st.session_state["event_store"] = EventStore(owner=owner)
+    return store
+
+
 # Title of the app
 st.title("Streamlit Calendar App")
 
@@ -21,29 +39,35 @@ event_date = st.sidebar.date_input("Event Date")
 event_time = st.sidebar.time_input("Event Time")
 add_event = st.sidebar.button("Add Event")
 
-# Placeholder for storing events
-if "events" not in st.session_state:
-    st.session_state["events"] = []
+# Events are stored by day and persisted to SQLite
+store = get_event_store()
 
-# Add new event
+# Add new event; it ends an hour later, on the next day for events at 23:xx
 if add_event:
-    new_event = {
-        "title": event_name,
-        "start": pd.Timestamp(event_date).replace(hour=event_time.hour, minute=event_time.minute),
-        "end": pd.Timestamp(event_date).replace(hour=event_time.hour + 1, minute=event_time.minute),
-    }
-    st.session_state["events"].append(new_event)
+    store.add(event_name, event_start(event_date, event_time))
     st.sidebar.success("Event added successfully!")
 
-# Display the calendar
+# Display the calendar. It reports the dates it shows through its datesSet callback and
+# from then on gets only their events; until it has, it gets every event.
 st.header("Your Calendar")
-events = st.session_state["events"]
-selected_date = calendar_component(events=events)
+visible = st.session_state.get("calendar_range")
+events = store.calendar_events(*visible) if visible else store.calendar_events()
+state = calendar_component(events=events, callbacks=["dateClick", "datesSet"])
+selected_date = state
+if isinstance(state, dict):
+    selected_date = state.get("dateClick", {}).get("date")
+    if "datesSet" in state:
+        # The end it reports is exclusive; the range query's is inclusive
+        shown = (pd.Timestamp(state["datesSet"]["start"]).date(),
+                 pd.Timestamp(state["datesSet"]["end"]).date() - timedelta(days=1))
+        if shown != visible:
+            st.session_state["calendar_range"] = shown
+            st.rerun()
 
 # Show selected date details
 if selected_date:
     st.subheader("Selected Date Details")
-    selected_date_events = [event for event in events if pd.Timestamp(event["start"]).date() == pd.Timestamp(selected_date).date()]
+    selected_date_events = store.day(pd.Timestamp(selected_date).date())
     if selected_date_events:
         for event in selected_date_events:
             st.write(f"**{event['title']}** - {event['start'].strftime('%Y-%m-%d %H:%M')} to {event['end'].strftime('%H:%M')}")
@@ -4,11 +4,23 @@
 Enhanced Scholarship Finder application with improved design and user experience.
 """
 
+import os
+
 import streamlit as st
 
+# Bundled with the app instead of fetched from a placeholder service on every render
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "scholarship_finder.svg")
+
 # Set page configuration
 st.set_page_config(page_title="Scholarship Finder Bot", page_icon="🎓", layout="wide")
 
+
+@st.cache_data
+def load_logo():
+    with open(LOGO_PATH, encoding="utf-8") as f:
+        return f.read()
+
+
 def main():
     # App Title and Introduction
     st.title("🎓 Scholarship Finder Bot")
@@ -19,7 +31,7 @@ def main():
         Let's make your scholarship search easier and more effective!
         """
     )
-    st.sidebar.image("https://via.placeholder.com/150", caption="Scholarship Finder", use_column_width=True)
+    st.sidebar.image(load_logo(), caption="Scholarship Finder", use_column_width=True)
 
     # Section 1: Basic Information
     st.header("📝 Basic Information")